@@ -0,0 +1,256 @@
+"""
+Headless autoplayer: plays complete 5-floor runs with the game loop's rules.
+
+Each run walks (BFS) to every reachable chest and then to the exit, one
+step at a time, and every step goes through tiles.resolve_step and the
+built-in tile handlers exactly as main.game_loop does: chest first, then
+the floor's encounter policy, then the exit. Battles (the Mimic's too)
+use combat.resolve_battle with a pluggable policy, and chests use a
+pluggable choice (heal or gamble), through TileContext.fight/choose_chest.
+
+Runs are sharded over a process pool. Each worker writes fixed-size
+int32 records straight into one shared-memory block, and the parent
+aggregates from there, so no results travel back through pickling.
+
+Usage:
+    python autoplay.py --runs 5000 [--workers 4] [--seed 0] [--profile]
+"""
+
+import argparse
+import os
+import random
+import time
+from collections import deque
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from combat import resolve_battle, default_policy
+from entities import tile_at
+from models import Player
+from tiles import TileContext, resolve_step, configure_encounters, EXIT_TILE, FINAL_FLOOR
+from world import load_floor, choose_spawn, CHEST_TILE, DIRS
+
+MAX_STEPS_PER_FLOOR = 2000
+
+# Record layout (int32 per field)
+F_CLEARED, F_DEATH_FLOOR, F_FINAL_LEVEL, F_STEPS = 0, 1, 2, 3
+F_LEVEL_AT = 4                      # F_LEVEL_AT + (floor - 1): level on entering floor
+RECORD = F_LEVEL_AT + FINAL_FLOOR
+
+
+def heal_when_hurt(player) -> str:
+    """Chest choice: heal below half HP, otherwise gamble."""
+    return "heal" if player.hp < player.hp_max / 2 else "gamble"
+
+
+class AutoRun:
+    """State of one headless run (the TileContext plus autoplayer bookkeeping)."""
+
+    def __init__(self, battle_policy=None, chest_policy: Callable = heal_when_hurt):
+        self.battle_policy = battle_policy or default_policy
+        self.chest_policy = chest_policy
+        self.cleared = False
+        self.floor = 1
+        self.final_level = 0
+        self.level_at: List[int] = [0] * FINAL_FLOOR
+        self.steps = 0
+
+    def fight(self, player, monster) -> str:
+        return resolve_battle(player, monster, self.battle_policy).outcome
+
+
+def _distance_field(grid, target: Tuple[int, int], avoid: Set[Tuple[int, int]]) -> List[List[int]]:
+    """BFS distances to `target` over walkable tiles, not passing through `avoid` cells."""
+    h, w = len(grid), len(grid[0])
+    dist = [[-1] * w for _ in range(h)]
+    tr, tc = target
+    dist[tr][tc] = 0
+    dq = deque([target])
+    while dq:
+        r, c = dq.popleft()
+        for dr, dc in DIRS.values():
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < h and 0 <= nc < w and dist[nr][nc] == -1:
+                if grid[nr][nc] != "#" and (nr, nc) not in avoid:
+                    dist[nr][nc] = dist[r][c] + 1
+                    dq.append((nr, nc))
+    return dist
+
+
+def _next_target(ctx: TileContext) -> Tuple[Optional[Tuple[int, int]], Optional[List[List[int]]]]:
+    """Nearest reachable chest (never walking over the exit), else the exit."""
+    g, p = ctx.grid, ctx.player
+    layer = g.entities
+    exit_pos = layer.of_kind("exit")[0].pos
+    best = None
+    for chest in layer.of_kind("chest"):
+        dist = _distance_field(g, chest.pos, avoid={exit_pos})
+        d = dist[p.row][p.col]
+        if d > 0 and (best is None or d < best[0]):
+            best = (d, chest.pos, dist)
+    if best is not None:
+        return best[1], best[2]
+    return exit_pos, _distance_field(g, exit_pos, avoid=set())
+
+
+def play_run(seed: int, battle_policy=None, chest_policy: Callable = heal_when_hurt) -> AutoRun:
+    """Play one full run from `seed`; returns the finished AutoRun."""
+    random.seed(seed)
+    configure_encounters()  # random or roaming, as in config.json
+    run = AutoRun(battle_policy, chest_policy)
+    grid = load_floor(1)
+    player = Player(row=1, col=1)
+    player.row, player.col = choose_spawn(grid)
+    ctx = TileContext(player=player, floor=1, grid=grid, fight=run.fight,
+                      choose_chest=run.chest_policy)
+    run.level_at[0] = player.level
+
+    floor, floor_steps = ctx.floor, 0
+    target, dist = _next_target(ctx)
+    while not ctx.game_over:
+        if ctx.floor != floor:
+            floor, floor_steps = ctx.floor, 0
+            run.level_at[floor - 1] = player.level
+            target, dist = _next_target(ctx)
+        if floor_steps >= MAX_STEPS_PER_FLOOR:
+            ctx.game_over = True  # stuck; counts as a death on this floor
+            break
+        r, c = player.row, player.col
+        step = None
+        for dr, dc in DIRS.values():
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < len(dist) and 0 <= nc < len(dist[0]) and 0 <= dist[nr][nc] < dist[r][c]:
+                step = (nr, nc)
+                break
+        if step is None:
+            # Standing on the target (e.g. escaped back onto the exit): step off and return.
+            step = next((r + dr, c + dc) for dr, dc in DIRS.values() if ctx.grid[r + dr][c + dc] != "#")
+        ctx.prev_pos = (r, c)
+        player.row, player.col = step
+        run.steps += 1
+        floor_steps += 1
+        resolve_step(ctx)
+        if (player.row, player.col) == target or tile_at(ctx.grid, *target) not in (CHEST_TILE, EXIT_TILE):
+            target, dist = _next_target(ctx)
+    run.cleared = ctx.cleared
+    run.floor = ctx.floor
+    run.final_level = player.level
+    return run
+
+
+# =========================
+# Parallel batch
+# =========================
+def _run_shard(args) -> int:
+    shm_name, start, stop, base_seed = args
+    shm = shared_memory.SharedMemory(name=shm_name)
+    rec = shm.buf.cast("i")
+    try:
+        for i in range(start, stop):
+            run = play_run(base_seed + i)
+            off = i * RECORD
+            rec[off + F_CLEARED] = int(run.cleared)
+            rec[off + F_DEATH_FLOOR] = 0 if run.cleared else run.floor
+            rec[off + F_FINAL_LEVEL] = run.final_level
+            rec[off + F_STEPS] = run.steps
+            for f in range(FINAL_FLOOR):
+                rec[off + F_LEVEL_AT + f] = run.level_at[f]
+    finally:
+        rec.release()
+        shm.close()
+    return stop - start
+
+
+def run_batch(runs: int, workers: Optional[int] = None, base_seed: int = 0) -> Dict:
+    """Play `runs` seeded runs across a process pool and aggregate the results."""
+    workers = workers or os.cpu_count() or 1
+    shm = shared_memory.SharedMemory(create=True, size=max(1, runs * RECORD * 4))
+    try:
+        shards = max(1, min(runs, workers * 4))
+        bounds = [(runs * k // shards, runs * (k + 1) // shards) for k in range(shards)]
+        jobs = [(shm.name, a, b, base_seed) for a, b in bounds if b > a]
+        t0 = time.perf_counter()
+        if workers == 1:
+            for job in jobs:
+                _run_shard(job)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(_run_shard, jobs))
+        elapsed = time.perf_counter() - t0
+        rec = shm.buf.cast("i")
+        summary = _aggregate(rec, runs)
+        rec.release()
+    finally:
+        shm.close()
+        shm.unlink()
+    summary["elapsed_s"] = elapsed
+    summary["runs_per_s"] = runs / elapsed if elapsed else 0.0
+    summary["workers"] = workers
+    return summary
+
+
+def _aggregate(rec, runs: int) -> Dict:
+    cleared = 0
+    deaths = {f: 0 for f in range(1, FINAL_FLOOR + 1)}
+    level_sum = [0] * FINAL_FLOOR
+    reached = [0] * FINAL_FLOOR
+    for i in range(runs):
+        off = i * RECORD
+        if rec[off + F_CLEARED]:
+            cleared += 1
+        else:
+            deaths[rec[off + F_DEATH_FLOOR]] += 1
+        for f in range(FINAL_FLOOR):
+            lv = rec[off + F_LEVEL_AT + f]
+            if lv:
+                level_sum[f] += lv
+                reached[f] += 1
+    return {
+        "runs": runs,
+        "clear_rate": cleared / runs if runs else 0.0,
+        "death_floor_histogram": deaths,
+        "mean_level_at_floor": {f + 1: (level_sum[f] / reached[f] if reached[f] else None)
+                                for f in range(FINAL_FLOOR)},
+        "reached_floor": {f + 1: reached[f] for f in range(FINAL_FLOOR)},
+    }
+
+
+def format_summary(s: Dict) -> str:
+    lines = [f"{s['runs']} runs on {s['workers']} workers in {s['elapsed_s']:.2f}s "
+             f"({s['runs_per_s']:.0f} runs/s)",
+             f"clear rate: {s['clear_rate']:.1%}",
+             "floor  reached  deaths  mean level on entry"]
+    for f in range(1, FINAL_FLOOR + 1):
+        lv = s["mean_level_at_floor"][f]
+        lv_s = f"{lv:.2f}" if lv is not None else "-"
+        lines.append(f"{f:>5}{s['reached_floor'][f]:>9}{s['death_floor_histogram'][f]:>8}{lv_s:>21}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Headless full-run autoplayer")
+    ap.add_argument("--runs", type=int, default=1000)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--profile", action="store_true",
+                    help="profile the batch in-process (implies --workers 1)")
+    args = ap.parse_args(argv)
+
+    prof = None
+    if args.profile:
+        from sampler import Sampler
+        args.workers = 1
+        prof = Sampler().start()
+    summary = run_batch(args.runs, args.workers, args.seed)
+    print(format_summary(summary))
+    if prof is not None:
+        from sampler import profile_path
+        prof.stop()
+        print(f"Profile written: {prof.write_collapsed(profile_path('autoplay'))}")
+        print(prof.format_summary())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,117 @@
+"""
+Auto-resolve for foregone fights.
+
+Before an interactive battle against a lone, fresh monster from the
+content packs, the fight's outcome table is looked up: `samples` silent
+combat.resolve_battle() runs for the exact (player stat tuple, template,
+level, elite) key, kept as rows of
+    (won, HP change, SP change, potions used, SP potions used, turns).
+If the share of lost runs is at most "max_loss", one row is drawn
+uniformly (a single randrange, O(1)) and applied to the player instead of
+playing the battle, with a one-line summary. A drawn loss hands the fight
+back to the player, so an auto-resolve never kills anyone.
+
+Tables are built from their own seed (the key), with the game's RNG state
+saved and restored around them, so a seeded session replays the same
+whether a table was cached or not. They are kept in an LRU cache
+(TABLE_CACHE keys); a miss costs `samples` short headless battles.
+Groups and Mimics are always fought by hand.
+
+Config: "autoresolve": {"enabled": false, "max_loss": 0.01, "samples": 200}.
+"""
+
+import random
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+import content
+from combat import default_policy, exp_reward, resolve_battle
+from config import CFG
+from models import Player
+from monsters import MonsterGroup, monster_from_spec
+from progression import LevelUp
+
+TABLE_CACHE = 256
+
+# Player fields a fight's outcome depends on (level only matters for EXP, which is not simulated)
+STAT_KEYS = ("hp", "hp_max", "sp", "sp_max", "atk_min", "atk_max", "crit_chance", "crit_multiplier",
+             "potions", "sp_potions", "skill_ids")
+
+Row = Tuple[bool, int, int, int, int, int]
+
+
+class OutcomeTable(NamedTuple):
+    loss_p: float
+    rows: Tuple[Row, ...]
+
+
+class Resolved(NamedTuple):
+    summary: str
+    level_up: LevelUp
+
+
+def player_stats(player) -> tuple:
+    return tuple(getattr(player, k) for k in STAT_KEYS)
+
+
+@lru_cache(maxsize=TABLE_CACHE)
+def outcome_table(stats: tuple, tpl_index: int, level: int, elite: bool, samples: int,
+                  content_key: str = "") -> OutcomeTable:
+    """`samples` headless battles of a player with `stats` against the given monster."""
+    saved = random.getstate()
+    random.seed(repr((stats, tpl_index, level, elite, samples, content_key)))
+    try:
+        rows = []
+        for _ in range(samples):
+            p = Player(row=0, col=0, **dict(zip(STAT_KEYS, stats)))
+            hp0, sp0 = p.hp, p.sp
+            res = resolve_battle(p, monster_from_spec(tpl_index, level, elite), default_policy, award_exp=False)
+            rows.append((res.outcome == "win", p.hp - hp0, p.sp - sp0, res.potions_used,
+                         res.sp_potions_used, res.turns))
+    finally:
+        random.setstate(saved)
+    return OutcomeTable(sum(not row[0] for row in rows) / samples, tuple(rows))
+
+
+def _table_for(player, monster) -> Optional[OutcomeTable]:
+    """The outcome table for this fight, or None when it does not qualify."""
+    if isinstance(monster, MonsterGroup):
+        return None
+    c = content.current()
+    tpl_index = c.monster_index.get(monster.name)
+    if tpl_index is None:                      # Mimics and anything not from a template
+        return None
+    fresh = monster_from_spec(tpl_index, monster.level, monster.elite)
+    if (fresh.hp, fresh.atk_min, fresh.atk_max) != (monster.hp, monster.atk_min, monster.atk_max):
+        return None
+    S = CFG["autoresolve"]
+    return outcome_table(player_stats(player), tpl_index, monster.level, bool(monster.elite),
+                         int(S["samples"]), c.key)
+
+
+def try_resolve(player, monster) -> Optional[Resolved]:
+    """
+    Settle the fight from its outcome table when auto-resolve is on and the
+    loss chance is low enough: applies HP/SP/potions/EXP to the player and
+    returns the one-line summary with the level-up, if any. None means:
+    play the battle.
+    """
+    if not CFG["autoresolve"]["enabled"]:
+        return None
+    table = _table_for(player, monster)
+    if table is None or table.loss_p > float(CFG["autoresolve"]["max_loss"]):
+        return None
+    won, d_hp, d_sp, potions, sp_potions, turns = table.rows[random.randrange(len(table.rows))]
+    if not won:
+        return None
+    player.hp += d_hp
+    player.sp += d_sp
+    player.potions -= potions
+    player.sp_potions -= sp_potions
+    monster.hp = 0
+    exp = exp_reward(monster)
+    level_up = player.gain_exp(exp)
+    name = f"Elite {monster.name}" if monster.elite else monster.name
+    used = "".join(f", {n} {label}" for n, label in ((potions, "potion"), (sp_potions, "SP potion")) if n)
+    return Resolved(f"Auto-resolved: {name} (Lv {monster.level}) defeated in {turns} turn(s). "
+                    f"HP {d_hp:+d}, SP {d_sp:+d}{used}, +{exp} EXP.", level_up)
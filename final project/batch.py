@@ -0,0 +1,163 @@
+"""
+Batch driver: run the real main.game_loop on scripted input, at full speed.
+
+A script is the list of answers a player would type, one per prompt:
+start-menu choices, commands and move batches ("dddwws"), battle actions,
+skill numbers, chest choices. "Press Enter" pauses take no line. Each
+session runs:
+  - through an io_port.ScriptPort (no sleeps, no screen clears, no TTY),
+  - with all messages captured in a messages.BufferSink,
+  - in its own temporary directory, so saves never touch the cwd,
+  - from random.seed(seed), so a (script, seed) pair replays exactly.
+Many sessions are spread over a process pool.
+
+Usage:
+    python batch.py script.txt [more.txt ...] [--seeds 100] [--start 0] [--workers 4]
+                    [--set encounters.rate=0] [--out transcripts/]
+Script files hold one answer per line; lines starting with "#" are comments.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import io_port
+import messages
+from config import CFG
+
+Overrides = Dict[str, Dict[str, object]]
+
+
+class ScriptResult(NamedTuple):
+    name: str
+    seed: int
+    outcome: str        # "cleared" | "dead" | "quit" | "eof" (script ran out mid-game)
+    floor: int          # 0 when the script ran out
+    level: int
+    prompts: int        # answers consumed
+    elapsed_s: float
+    transcript: str     # everything the session printed ("" if not kept)
+
+
+@contextmanager
+def _config(overrides: Optional[Overrides]):
+    """Apply {"section": {"key": value}} to CFG for the duration of one session."""
+    overrides = overrides or {}
+    saved = {section: dict(CFG[section]) for section in overrides}
+    for section, values in overrides.items():
+        CFG[section].update(values)
+    try:
+        yield
+    finally:
+        for section, values in saved.items():
+            CFG[section] = values
+
+
+def run_script(lines: Sequence[str], seed: int = 0, name: str = "script",
+               overrides: Optional[Overrides] = None, keep_transcript: bool = True) -> ScriptResult:
+    """Play one session of main.game_loop with `lines` as the player's input."""
+    import main  # deferred: the full game stack is only needed to actually play
+
+    random.seed(seed)
+    sink = messages.BufferSink()
+    port = io_port.ScriptPort(lines)
+    cwd = os.getcwd()
+    t0 = time.perf_counter()
+    ctx = None
+    with tempfile.TemporaryDirectory() as tmp, _config(overrides):
+        os.chdir(tmp)
+        try:
+            with messages.use(messages.Messages([sink])), io_port.use(port):
+                ctx = main.game_loop()
+        except EOFError:
+            pass
+        finally:
+            os.chdir(cwd)
+    elapsed = time.perf_counter() - t0
+
+    if ctx is None:
+        outcome, floor, level = "eof", 0, 0
+    else:
+        outcome = "cleared" if ctx.cleared else ("dead" if not ctx.player.is_alive() else "quit")
+        floor, level = ctx.floor, ctx.player.level
+    return ScriptResult(name, seed, outcome, floor, level, port.asked, elapsed,
+                        sink.text() if keep_transcript else "")
+
+
+def _run_job(job: Tuple[str, Tuple[str, ...], int, Optional[Overrides], bool]) -> ScriptResult:
+    name, lines, seed, overrides, keep = job
+    return run_script(lines, seed, name, overrides, keep)
+
+
+def run_batch(scripts: Dict[str, Sequence[str]], seeds: Iterable[int] = (0,), workers: Optional[int] = None,
+              overrides: Optional[Overrides] = None, keep_transcript: bool = True) -> List[ScriptResult]:
+    """Every script under every seed, over `workers` processes (1 = in this process)."""
+    jobs = [(name, tuple(lines), seed, overrides, keep_transcript)
+            for seed in seeds for name, lines in scripts.items()]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) == 1:
+        return [_run_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def format_summary(results: List[ScriptResult], wall_s: float) -> str:
+    outcomes = Counter(r.outcome for r in results)
+    played = sum(r.elapsed_s for r in results)
+    lines = [f"{len(results)} sessions in {wall_s:.2f}s ({len(results) / wall_s if wall_s else 0:.0f}/s, "
+             f"{played / len(results) * 1000 if results else 0:.1f} ms per session)",
+             "outcomes: " + ", ".join(f"{k}={v}" for k, v in sorted(outcomes.items()))]
+    return "\n".join(lines)
+
+
+def _parse_set(items: List[str]) -> Overrides:
+    """["encounters.rate=0", ...] -> {"encounters": {"rate": 0}} (values parsed as JSON when possible)."""
+    import json
+    out: Overrides = {}
+    for item in items:
+        key, _, raw = item.partition("=")
+        section, _, name = key.partition(".")
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw
+        out.setdefault(section, {})[name] = value
+    return out
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Run scripted DRPG sessions headlessly")
+    ap.add_argument("scripts", nargs="+", help="script files, one answer per line")
+    ap.add_argument("--seeds", type=int, default=1)
+    ap.add_argument("--start", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--set", action="append", default=[], metavar="SECTION.KEY=VALUE",
+                    help="config override for every session")
+    ap.add_argument("--out", default=None, help="directory to write one transcript per session")
+    args = ap.parse_args(argv)
+
+    scripts = {}
+    for path in args.scripts:
+        with open(path, "r", encoding="utf-8") as f:
+            scripts[os.path.splitext(os.path.basename(path))[0]] = io_port.read_script(f.read())
+    t0 = time.perf_counter()
+    results = run_batch(scripts, range(args.start, args.start + args.seeds), args.workers,
+                        _parse_set(args.set), keep_transcript=args.out is not None)
+    wall = time.perf_counter() - t0
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        for r in results:
+            with open(os.path.join(args.out, f"{r.name}-{r.seed}.txt"), "w", encoding="utf-8") as f:
+                f.write(r.transcript)
+    messages.info(format_summary(results, wall))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
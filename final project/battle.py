@@ -1,203 +1,378 @@
-import os
-import time
-import random
+from typing import Callable, Optional
+
+import autoresolve
+import io_port
+import metrics
 from models import Player
-from monsters import Monster, generate_monster  # ← use shared monster module
-
-# ---------- Terminal FX helpers (visual effects for battles) ----------
-try:
-    from colorama import init, Fore, Style
-    init()
-    HAS_COLOR = True
-except Exception:
-    HAS_COLOR = False
-    class _Dummy: RESET = ""; BRIGHT = ""; RED = ""; YELLOW = ""; CYAN = ""
-    Fore = Style = _Dummy()  # type: ignore
-
-def cls():
-    """Clear the console screen (Windows/Linux/Mac)."""
-    os.system("cls" if os.name == "nt" else "clear")
-
-def typeout(text: str, delay: float = 0.012):
-    """Typewriter effect for tension."""
-    for ch in text:
-        print(ch, end="", flush=True)
-        time.sleep(delay)
-    print()
-
-def flash_banner(text: str):
-    """Big highlighted banner (critical, warnings, etc.)."""
-    line = "=" * max(24, len(text) + 6)
-    if HAS_COLOR:
-        print(Fore.YELLOW + Style.BRIGHT + line + Style.RESET_ALL)
-        print(Fore.RED + Style.BRIGHT + f"   {text}   " + Style.RESET_ALL)
-        print(Fore.YELLOW + Style.BRIGHT + line + Style.RESET_ALL)
-    else:
-        print(line); print(f"   {text}   "); print(line)
-
-def hit_stop(duration: float = 0.08):
-    """Short pause to sell impact."""
-    time.sleep(duration)
-
-def screen_shake(frames: int = 6, spread: int = 6, message: str = "!!! CRITICAL HIT !!!"):
-    """Clear-screen shake with random horizontal jitter."""
-    for _ in range(frames):
-        cls()
-        offset = " " * random.randint(0, spread)
-        if HAS_COLOR:
-            print(offset + Fore.RED + Style.BRIGHT + message + Style.RESET_ALL)
-        else:
-            print(offset + message)
-        time.sleep(0.045)
-
-def wait_for_key(msg: str = "Press Enter to continue..."):
-    """Keep FX on screen until player confirms."""
-    try:
-        prompt = msg
-        if HAS_COLOR:
-            prompt = Fore.CYAN + msg + Style.RESET_ALL
-        input("\n" + prompt)
-    except EOFError:
-        time.sleep(0.6)
+from monsters import Monster, MonsterGroup, generate_monster  # ← use shared monster module
+from messages import info
+from progression import format_level_up
+from combat import (player_strike, drink_potion, drink_sp_potion, try_escape, exp_reward,
+                    strike_preview, after_player_hit, monster_turn, end_round,
+                    group_strike, after_group_hit, group_turn, group_end_round, member_key, weakest,
+                    HEAL_POTION_HP, SP_POTION_SP)
+from effects import StatusEngine, EFFECTS, PLAYER, MONSTER
+
+# Terminal FX live in fx.py (colorama loads lazily); re-exported for callers.
+from fx import cls, flash_banner, hit_stop, screen_shake, wait_for_key, colorize
 
 # ---------- Battle loop ----------
-def battle(player: Player, monster: Monster) -> str:
+def battle(player: Player, monster: Monster,
+           on_turn: Optional[Callable[[Player, Monster], None]] = None) -> str:
     """
     Turn-based battle.
     Returns: "win" | "lose" | "escape".
     - Critical hits stun the monster for 1 turn.
+    - Skills and some monsters apply status effects (effects.py) on
+      either side; they tick at the end of each round.
+    - on_turn(player, monster), if given, runs after every resolved turn
+      (e.g. rewind snapshots).
+    - `monster` may be a MonsterGroup; see group_battle().
+    - With "autoresolve" on, a fight that is almost surely won is settled
+      from its outcome table in one line instead (see autoresolve.py).
     """
+    if isinstance(monster, MonsterGroup):
+        return group_battle(player, monster, on_turn)
+    auto = autoresolve.try_resolve(player, monster)
+    if auto is not None:
+        info("{}", auto.summary)
+        if auto.level_up:
+            info(format_level_up, auto.level_up)
+        metrics.incr("battle.auto")
+        metrics.incr("battle.win")
+        return "win"
     # Spawn line with name + elite highlight
     mname = f"Elite {monster.name}" if getattr(monster, "elite", False) else monster.name
-    if HAS_COLOR and getattr(monster, "elite", False):
-        mname = Fore.YELLOW + Style.BRIGHT + mname + Style.RESET_ALL
+    if getattr(monster, "elite", False):
+        mname = colorize(mname, "YELLOW")
     cls()
-    print(f"A wild {mname} (Lv {monster.level}) appeared! HP={monster.hp}")
+    info("A wild {} (Lv {}) appeared! HP={}", mname, monster.level, monster.hp)
 
-    monster_stun = 0  # stunned turns
+    status = StatusEngine()
 
     while monster.is_alive() and player.is_alive():
-        print()
-        action = input("Choose action: [A]ttack, [S]kill, [H]eal, [P]otion(SP), [I]nformation, [R]un > ").strip().lower()
-        print()
+        info("")
+        if status.stunned(PLAYER):
+            info("You are stunned and cannot act this turn!")
+            action = None
+        else:
+            action = io_port.ask("Choose action: [A]ttack, [S]kill, [H]eal, [P]otion(SP), [I]nformation, [R]un > ").strip().lower()
+        info("")
+        turn_start = metrics.clock()  # time the resolution, not the prompt
+
+        # Stunned: the monster still gets its turn
+        if action is None:
+            pass
 
         # Attack
-        if action == "a":
-            dmg, is_crit = player.roll_damage()
-            monster.hp -= dmg
-            if is_crit:
-                monster_stun = 1
-                hit_stop(min(0.04 + dmg * 0.003, 0.18))
-                screen_shake(frames=6, spread=6, message="!!! CRITICAL HIT !!!")
-                flash_banner("CRITICAL! MONSTER IS KNOCKED DOWN!")
-                print(f"You deal {dmg} critical damage. ({monster.name} HP={max(monster.hp,0)})")
-            else:
-                print(f"You hit the {monster.name} for {dmg} damage. ({monster.name} HP={max(monster.hp,0)})")
-
-        # Heal
-        elif action == "h":
-            if player.potions > 0:
-                heal = 10
-                player.hp = min(player.hp + heal, player.hp_max)
-                player.potions -= 1
-                print(f"You used a potion and recovered {heal} HP. (Player HP={player.hp}) (HP potion left: {player.potions})")
-            else:
-                print("No potions left!")
-        
-        #Potion (sp)
-        elif action == "p":
-            if player.sp_potions > 0:
-                restore = 6  # restore 6 sp 
-                player.sp = min(player.sp + restore, player.sp_max)
-                player.sp_potions -= 1
-                print(f"You used one SP potion and restored {restore} SP. (SP={player.sp}/{player.sp_max}) (SP potion left: {player.sp_potions})")
-            else:
-                print("No SP potions left!")
+        elif action == "a":
+            dmg, is_crit = player_strike(player, monster, bonus=status.atk_mod(PLAYER))
+            after_player_hit(status, monster, None, is_crit)
+            _report_strike(dmg, is_crit, None, [(monster.name, monster.hp)])
+
+        # Heal / Potion (sp)
+        elif action in ("h", "p"):
+            _use_potion(player, action)
 
         # Information
         elif action == "i":
-            print(f'Your hp: {player.hp}/{player.hp_max}')
-            print(f'Your sp: {player.sp}/{player.sp_max}')
-            print(f'You now have {player.potions} hp potions.')
-            print(f'You now have {player.sp_potions} sp potions.')
+            _show_player(player)
+            for who, label in ((PLAYER, "You"), (MONSTER, monster.name)):
+                active = status.active(who)
+                if active:
+                    info("{}: {}", label, ", ".join(f"{n} ({EFFECTS[n].desc})" for n in active))
 
             continue
 
 
         # Run
         elif action == "r":
-            if random.random() < 0.5:
-                print("You escaped successfully!")
+            if try_escape():
+                info("You escaped successfully!")
+                metrics.incr("battle.escape")
                 return "escape"
             else:
-                print("Escape failed!")
+                info("Escape failed!")
         
         # Skills
         elif action == "s":
-            print("== Skills ==")
-            for idx, sk in enumerate(player.skills, 1):
-                print(f"{idx}) {sk.name}  Cost:{sk.cost} SP  Mult:{sk.multiplier}x  - {sk.desc}")
-            print("0) Cancel")
-            print()
-
-            sel = input("Select skill number > ").strip()
-            if not sel.isdigit():
-                print("Invalid input."); continue
-            sel = int(sel)
-            if sel == 0:
+            sk = _choose_skill(player, monster, status.atk_mod(PLAYER))
+            if sk is None:
                 continue
-            if not (1 <= sel <= len(player.skills)):
-                print("Invalid selection."); continue
-
-            sk = player.skills[sel-1]
-            if not player.can_use(sk):
-                print("Not enough SP!"); continue
 
             # damage = base attack * skill mutiplier
-            base_dmg, is_crit = player.roll_damage()
-            dmg = int(base_dmg * sk.multiplier)
-            monster.hp -= dmg
-            player.use_skill(sk)
-
-            if is_crit:
-                monster_stun = 1  # same as basic attack crit
-                hit_stop(min(0.04 + dmg * 0.003, 0.18))  # pause for tension
-                screen_shake(frames=6, spread=6, message="!!! CRITICAL SKILL HIT !!!")
-                flash_banner(f"CRITICAL! {monster.name} IS KNOCKED DOWN!")
-                print(f"You used {sk.name} and dealt {dmg} CRITICAL damage! ({monster.name} HP={max(monster.hp,0)})")
-            else:
-                print()
-                print(f"You used {sk.name} and dealt {dmg} damage. ({monster.name} HP={max(monster.hp,0)})")
-            # --- Skill's own stun (independent of crit) ---
-            # Apply only if the monster survived the hit.
-            if sk.stun and monster.hp > 0:
-                monster_stun = 1
-                print(f"The {monster.name} is stunned by {sk.name}!")
+            dmg, is_crit = player_strike(player, monster, sk, status.atk_mod(PLAYER))
+            applied = after_player_hit(status, monster, sk, is_crit)
+            _report_strike(dmg, is_crit, sk, [(monster.name, monster.hp)])
+            # --- Skill's own effects (enemy ones only if the monster survived) ---
+            for who, name in applied:
+                if who == PLAYER:
+                    info("You gain {} from {}.", name, sk.name)
+                elif name == "stun":
+                    if sk.stun:
+                        info("The {} is stunned by {}!", monster.name, sk.name)
+                else:
+                    info("The {} suffers {} from {}!", monster.name, name, sk.name)
 
         else:
-            print("Invalid action.")
+            info("Invalid action.")
             continue
 
         # Monster turn (skipped if stunned or dead)
         if monster.is_alive():
-            if monster_stun > 0:
-                print(f"The {monster.name} is stunned and cannot act this turn!")
-                monster_stun -= 1
+            mdmg, inflicted = monster_turn(status, monster, player)
+            if mdmg is None:
+                info("The {} is stunned and cannot act this turn!", monster.name)
             else:
-                mdmg = random.randint(monster.atk_min, monster.atk_max)
-                player.hp -= mdmg
-                print(f"The {monster.name} hits you for {mdmg} damage. (Player HP={max(player.hp,0)})")
+                info("The {} hits you for {} damage. (Player HP={})", monster.name, mdmg, max(player.hp, 0))
+                if inflicted:
+                    info("The {} inflicts {} on you!", monster.name, inflicted)
+
+        # End of round: poison/regen ticks and expiries
+        _report_round(end_round(status, player, monster),
+                      lambda who: "You" if who == PLAYER else f"The {monster.name}")
+
+        metrics.observe_since("battle.turn", turn_start)
+        if on_turn is not None:
+            on_turn(player, monster)
 
     # Outcome
     if not player.is_alive():
-        print("You were defeated...")
+        info("You were defeated...")
+        metrics.incr("battle.lose")
         wait_for_key()
         return "lose"
     else:
-        base_exp = 3 + monster.level * 2
-        if getattr(monster, "elite", False):
-            base_exp = int(base_exp * 1.6)
-        player.gain_exp(base_exp)
-        print(f"You defeated the {monster.name}! +{base_exp} EXP.")
+        base_exp = exp_reward(monster)
+        delta = player.gain_exp(base_exp)
+        if delta:
+            info(format_level_up, delta)
+        info("You defeated the {}! +{} EXP.", monster.name, base_exp)
+        metrics.incr("battle.win")
         wait_for_key()
         return "win"
+
+
+# ---------- Shared turn pieces ----------
+def _use_potion(player: Player, action: str) -> None:
+    """[H]eal or SP [P]otion."""
+    if action == "h":
+        if player.potions > 0:
+            heal = HEAL_POTION_HP
+            drink_potion(player)
+            info("You used a potion and recovered {} HP. (Player HP={}) (HP potion left: {})",
+                 heal, player.hp, player.potions)
+        else:
+            info("No potions left!")
+    else:
+        if player.sp_potions > 0:
+            restore = SP_POTION_SP
+            drink_sp_potion(player)
+            info("You used one SP potion and restored {} SP. (SP={}/{}) (SP potion left: {})",
+                 restore, player.sp, player.sp_max, player.sp_potions)
+        else:
+            info("No SP potions left!")
+
+
+def _show_player(player: Player) -> None:
+    info("Your hp: {}/{}", player.hp, player.hp_max)
+    info("Your sp: {}/{}", player.sp, player.sp_max)
+    info("You now have {} hp potions.", player.potions)
+    info("You now have {} sp potions.", player.sp_potions)
+
+
+def _choose_skill(player: Player, target: Monster, bonus: int = 0):
+    """
+    Skill menu with damage previews against `target` (`bonus`: the player's
+    status attack modifier); None if cancelled or invalid.
+    """
+    info("== Skills ==")
+    # expected damage / kill chance against this monster (cached per stat tuple and bonus)
+    info("   Attack  ~{:.1f} dmg  Kill:{:.0%}", *strike_preview(player, target, bonus=bonus))
+    for idx, sk in enumerate(player.skills, 1):
+        avg, kill = strike_preview(player, target, sk, bonus)
+        info("{}) {}  Cost:{} SP  Mult:{}x  ~{:.1f} dmg  Kill:{:.0%}  - {}",
+             idx, sk.name, sk.cost, sk.multiplier, avg, kill, sk.desc)
+    info("0) Cancel")
+    info("")
+
+    sel = io_port.ask("Select skill number > ").strip()
+    if not sel.isdigit():
+        info("Invalid input."); return None
+    sel = int(sel)
+    if sel == 0:
+        return None
+    if not (1 <= sel <= len(player.skills)):
+        info("Invalid selection."); return None
+
+    sk = player.skills[sel-1]
+    if not player.can_use(sk):
+        info("Not enough SP!"); return None
+    return sk
+
+
+def _report_strike(dmg: int, is_crit: bool, skill, targets) -> None:
+    """
+    The player's strike: crit FX (hit-stop, shake, banner), then the hit
+    line. `targets` is [(name, HP after)] of everything the strike hit.
+    """
+    shown = ", ".join(f"{name} HP={max(hp, 0)}" for name, hp in targets)
+    if is_crit:
+        hit_stop(min(0.04 + dmg * 0.003, 0.18))  # pause for tension
+        screen_shake(frames=6, spread=6,
+                     message="!!! CRITICAL SKILL HIT !!!" if skill is not None else "!!! CRITICAL HIT !!!")
+        who = f"{targets[0][0].upper()} IS" if len(targets) == 1 else "MONSTERS ARE"
+        flash_banner(f"CRITICAL! {who} KNOCKED DOWN!")
+    if skill is not None:
+        info("You used {} and dealt {}{} damage. ({})", skill.name, dmg, " CRITICAL" if is_crit else "", shown)
+    elif is_crit:
+        info("You deal {} critical damage. ({})", dmg, shown)
+    else:
+        info("You hit the {} for {} damage. ({})", targets[0][0], dmg, shown)
+
+
+def _report_round(events, name_of: Callable[[object], str]) -> None:
+    """Print end_round() events: poison/regen ticks and expiries."""
+    for who, kind, value in events:
+        name = name_of(who)
+        if kind == "hp":
+            gain, loss = ("recover", "lose") if who == PLAYER else ("recovers", "loses")
+            info("{} {} {} HP from effects.", name, gain if value > 0 else loss, abs(value))
+        else:
+            info("{}: {} wore off.", name, value)
+
+
+# ---------- Group battles ----------
+def _roster(group: MonsterGroup, status: StatusEngine) -> str:
+    parts = []
+    for i, name in enumerate(group.names):
+        if group.hp[i] <= 0:
+            continue
+        tag = " (stunned)" if status.stunned(member_key(i)) else ""
+        elite = "Elite " if group.elite[i] else ""
+        parts.append(f"{i + 1}) {elite}{name} Lv{group.levels[i]} HP={group.hp[i]}{tag}")
+    return "   ".join(parts)
+
+
+def _choose_target(group: MonsterGroup) -> Optional[int]:
+    """The member to hit: asked for when more than one is standing; None if invalid."""
+    alive = group.alive()
+    if len(alive) == 1:
+        return alive[0]
+    sel = io_port.ask("Target number > ").strip()
+    if sel.isdigit() and int(sel) - 1 in alive:
+        return int(sel) - 1
+    info("Invalid target.")
+    return None
+
+
+def group_battle(player: Player, group: MonsterGroup,
+                 on_turn: Optional[Callable[[Player, MonsterGroup], None]] = None) -> str:
+    """
+    battle() against several monsters: single-target actions ask for a
+    target, AoE skills hit every living member, then all members that can
+    act attack together. EXP is the sum over the group.
+    Returns: "win" | "lose" | "escape".
+    """
+    cls()
+    info("A group of {} monsters appeared!", len(group))
+    status = StatusEngine()
+
+    def name_of(who) -> str:
+        return "You" if who == PLAYER else f"The {group.names[who[1]]}"
+
+    while group.is_alive() and player.is_alive():
+        info("")
+        info(_roster, group, status)
+        if status.stunned(PLAYER):
+            info("You are stunned and cannot act this turn!")
+            action = None
+        else:
+            action = io_port.ask("Choose action: [A]ttack, [S]kill, [H]eal, [P]otion(SP), [I]nformation, [R]un > ").strip().lower()
+        info("")
+        turn_start = metrics.clock()
+
+        if action is None:
+            pass
+
+        elif action == "a":
+            target = _choose_target(group)
+            if target is None:
+                continue
+            dmg, is_crit, hit = group_strike(player, group, target, bonus=status.atk_mod(PLAYER))
+            after_group_hit(status, group, hit, None, is_crit)
+            _report_strike(dmg, is_crit, None, [(group.names[i], group.hp[i]) for i in hit])
+
+        elif action in ("h", "p"):
+            _use_potion(player, action)
+
+        elif action == "i":
+            _show_player(player)
+            active = status.active(PLAYER)
+            if active:
+                info("You: {}", ", ".join(f"{n} ({EFFECTS[n].desc})" for n in active))
+            for i in group.alive():
+                active = status.active(member_key(i))
+                if active:
+                    info("{} {}: {}", i + 1, group.names[i], ", ".join(active))
+            continue
+
+        elif action == "r":
+            if try_escape():
+                info("You escaped successfully!")
+                metrics.incr("battle.escape")
+                return "escape"
+            info("Escape failed!")
+
+        elif action == "s":
+            # previews against the weakest member
+            sk = _choose_skill(player, group.member(weakest(group)), status.atk_mod(PLAYER))
+            if sk is None:
+                continue
+            target = weakest(group) if sk.aoe else _choose_target(group)
+            if target is None:
+                continue
+            dmg, is_crit, hit = group_strike(player, group, target, sk, status.atk_mod(PLAYER))
+            applied = after_group_hit(status, group, hit, sk, is_crit)
+            _report_strike(dmg, is_crit, sk, [(group.names[i], group.hp[i]) for i in hit])
+            for who, name in applied:
+                if who == PLAYER:
+                    info("You gain {} from {}.", name, sk.name)
+                elif name != "stun" or sk.stun:
+                    info("The {} suffers {} from {}!", group.names[who], name, sk.name)
+
+        else:
+            info("Invalid action.")
+            continue
+
+        # Monsters' turn: every member that can act, in one step
+        if group.is_alive():
+            dmg, inflicted = group_turn(status, group, player)
+            for i in group.alive():
+                if status.stunned(member_key(i)):
+                    info("The {} is stunned and cannot act this turn!", group.names[i])
+                else:
+                    info("The {} hits you for {} damage.", group.names[i], dmg[i])
+            info("You take {} damage in total. (Player HP={})", sum(dmg), max(player.hp, 0))
+            for i, name in inflicted:
+                info("The {} inflicts {} on you!", group.names[i], name)
+
+        _report_round(group_end_round(status, player, group), name_of)
+
+        metrics.observe_since("battle.turn", turn_start)
+        if on_turn is not None:
+            on_turn(player, group)
+
+    if not player.is_alive():
+        info("You were defeated...")
+        metrics.incr("battle.lose")
+        wait_for_key()
+        return "lose"
+    base_exp = exp_reward(group)
+    delta = player.gain_exp(base_exp)
+    if delta:
+        info(format_level_up, delta)
+    info("You defeated the whole group! +{} EXP.", base_exp)
+    metrics.incr("battle.win")
+    wait_for_key()
+    return "win"
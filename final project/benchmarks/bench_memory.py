@@ -0,0 +1,80 @@
+"""
+Per-session memory benchmark.
+
+A session is what a server keeps alive per connected player: the Player,
+the current floor grid and the TileContext tying them together. The
+script builds many sessions (and monsters) under tracemalloc and reports
+the average retained bytes per object, failing (exit 1) when a budget
+is exceeded.
+
+Usage:
+    python benchmarks/bench_memory.py [--sessions 2000] [--monsters 20000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models import Player
+from monsters import generate_monster
+from tiles import TileContext
+from world import load_floor, choose_spawn
+
+# Budgets in bytes per object (measured on CPython 3.11, 11x11 floors).
+SESSION_BUDGET = 4096
+PLAYER_BUDGET = 192
+MONSTER_BUDGET = 128
+
+
+def _per_object(build, n: int) -> float:
+    """Average bytes retained by `build()` over n calls."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    keep = [build() for _ in range(n)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(s.size_diff for s in after.compare_to(before, "filename"))
+    # don't count the list that keeps the objects alive
+    total -= sys.getsizeof(keep)
+    return total / n
+
+
+def new_session() -> TileContext:
+    grid = load_floor(1)
+    player = Player(row=1, col=1)
+    player.row, player.col = choose_spawn(grid)
+    return TileContext(player=player, floor=1, grid=grid)
+
+
+def measure(sessions: int = 2000, monsters: int = 20000) -> dict:
+    random.seed(0)
+    new_session()  # warm caches (config, skill lookups) outside the measurement
+    return {
+        "session": _per_object(new_session, sessions),
+        "player": _per_object(lambda: Player(row=1, col=1), sessions),
+        "monster": _per_object(lambda: generate_monster(3), monsters),
+    }
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Per-session memory budget")
+    ap.add_argument("--sessions", type=int, default=2000)
+    ap.add_argument("--monsters", type=int, default=20000)
+    args = ap.parse_args(argv)
+
+    res = measure(args.sessions, args.monsters)
+    budgets = {"session": SESSION_BUDGET, "player": PLAYER_BUDGET, "monster": MONSTER_BUDGET}
+    ok = True
+    for key, used in res.items():
+        flag = "ok" if used <= budgets[key] else "OVER"
+        ok &= used <= budgets[key]
+        print(f"{key:<8} {used:8.0f} B/obj  (budget {budgets[key]} B)  {flag}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
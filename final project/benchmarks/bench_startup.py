@@ -0,0 +1,71 @@
+"""
+Startup benchmark: how long a fresh interpreter needs to import a module.
+
+Runs `python -X importtime -c "import <module>"` several times, takes the
+cumulative import time of the module from the report, and fails (exit 1)
+when the median exceeds the budget. Worker processes spawn by importing
+`headless`, so that is the default target.
+
+Usage:
+    python benchmarks/bench_startup.py [--module headless] [--budget-ms 60] [--runs 7]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Modules a headless import must never load.
+FORBIDDEN = ("colorama", "fx", "battle", "events", "main")
+
+
+def import_time_us(module: str) -> int:
+    """Cumulative import time (microseconds) of `module` in a fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module and not parts[2][1:].startswith(" "):
+            return int(parts[1])
+    raise RuntimeError(f"{module} not found in -X importtime output")
+
+
+def loaded_modules(module: str) -> set:
+    """Names of all modules present after importing `module`."""
+    code = f"import sys, {module}; print('\\n'.join(sys.modules))"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+    return set(proc.stdout.split())
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--module", default="headless")
+    ap.add_argument("--budget-ms", type=float, default=60.0)
+    ap.add_argument("--runs", type=int, default=7)
+    args = ap.parse_args(argv)
+
+    samples = [import_time_us(args.module) / 1000 for _ in range(args.runs)]
+    median = statistics.median(samples)
+    print(f"import {args.module}: median {median:.1f} ms, min {min(samples):.1f} ms "
+          f"over {args.runs} runs (budget {args.budget_ms:.1f} ms)")
+
+    ok = median <= args.budget_ms
+    leaked = sorted(set(FORBIDDEN) & loaded_modules(args.module))
+    if args.module == "headless" and leaked:
+        print(f"FAIL: headless import loaded {', '.join(leaked)}")
+        ok = False
+    if median > args.budget_ms:
+        print("FAIL: import time over budget")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
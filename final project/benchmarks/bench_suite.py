@@ -0,0 +1,287 @@
+"""
+Benchmark suite with regression thresholds.
+
+Every case runs a fixed amount of work from a fixed seed, repeated several
+times. The best (minimum) time per operation is the stable statistic and
+is compared against the stored baseline (benchmarks/baselines.json); the
+median and IQR are reported for context. A case slower than
+baseline * (1 + tolerance) is a regression and makes the run exit 1.
+
+Usage:
+    python benchmarks/bench_suite.py                 # run and compare
+    python benchmarks/bench_suite.py -k maze         # only cases whose name contains "maze"
+    python benchmarks/bench_suite.py --tolerance 0.5
+    python benchmarks/bench_suite.py --update        # store current results as the baseline
+    python benchmarks/bench_suite.py --profile       # also write a collapsed-stack profile
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import world
+from combat import resolve_battle
+from entities import EntityLayer, FloorGrid
+from rewind import History
+from roaming import FlowField, spawn_pack
+from tiles import TileContext
+from events import _roll_permanent_boosts
+from models import Player
+from monsters import generate_monster
+from sampler import Sampler, profile_path
+from save_load import save_game, load_game
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+DEFAULT_TOLERANCE = 0.30
+REPEATS = 7
+
+
+class Case:
+    """A named benchmark: setup() -> state, run(state) does `ops` operations, teardown(state)."""
+
+    def __init__(self, name: str, run: Callable, ops: int, setup: Callable = lambda: None,
+                 teardown: Callable = lambda state: None, seed: int = 0):
+        self.name, self.run, self.ops, self.seed = name, run, ops, seed
+        self.setup, self.teardown = setup, teardown
+
+
+CASES: List[Case] = []
+
+
+def case(name: str, ops: int, setup: Callable = lambda: None,
+         teardown: Callable = lambda state: None, seed: int = 0):
+    def deco(fn):
+        CASES.append(Case(name, fn, ops, setup, teardown, seed))
+        return fn
+    return deco
+
+
+# =========================
+# Cases
+# =========================
+def _maze_case(size: int, n: int) -> None:
+    @case(f"maze_{size}x{size}", ops=n)
+    def _run(_state):
+        for _ in range(n):
+            world._carve_maze(size, size)
+
+for _size, _n in ((11, 400), (21, 100), (41, 25), (81, 6)):
+    _maze_case(_size, _n)
+
+
+@case("maze_eller_81x81", ops=6)
+def _eller(_state):
+    for _ in range(6):
+        world.carve_maze_eller(81, 81)
+
+
+@case("maze_eller_stream_rows", ops=2000)
+def _eller_stream(_state):
+    for _row in itertools.islice(world.iter_eller_rows(201), 2000):
+        pass
+
+
+@case("spawn_exit_chests", ops=200,
+      setup=lambda: [world._carve_maze(world.MAP_W, world.MAP_H) for _ in range(200)])
+def _spawn(grids):
+    for g in grids:
+        world.choose_spawn(FloorGrid(row[:] for row in g))
+
+
+def _entity_setup():
+    layer = EntityLayer()
+    for _ in range(5000):
+        layer.add("chest", random.randrange(500), random.randrange(500))
+    return layer
+
+
+def _roaming_setup():
+    g = FloorGrid([["#"] * 201] + [["#"] + ["."] * 199 + ["#"] for _ in range(199)] + [["#"] * 201])
+    return spawn_pack(g, 3, 500, (100, 100)), FlowField(g, radius=8)
+
+
+@case("roaming_tick_500", ops=200, setup=_roaming_setup)
+def _roaming_tick(state):
+    pack, field = state
+    for k in range(200):
+        pack.tick(field, 100 * 201 + 50 + k // 2, wander=150)
+
+
+def _rewind_setup():
+    g = FloorGrid(world.carve_maze_eller(201, 201))
+    for i in range(200):
+        g.entities.add("chest", 1 + 2 * (i % 100), 1 + 2 * (i // 100))
+    return TileContext(player=Player(row=1, col=1), floor=1, grid=g), History(depth=50)
+
+
+@case("rewind_snapshot_201x201", ops=20000, setup=_rewind_setup)
+def _rewind_snapshot(state):
+    ctx, history = state
+    for i in range(20000):
+        ctx.player.hp = 10 + i % 5
+        history.record(ctx)
+
+
+@case("entity_queries", ops=4000, setup=_entity_setup)
+def _entity_queries(layer):
+    for i in range(1000):
+        r, c = (i * 37) % 500, (i * 91) % 500
+        layer.first(r, c)
+        sum(1 for _ in layer.in_radius(r, c, 6))
+        sum(1 for _ in layer.in_rect(r, c, r + 10, c + 10))
+        e = layer.add("chest", r, c)
+        layer.remove(e)
+
+
+@case("monster_generation", ops=20000)
+def _monsters(_state):
+    for i in range(20000):
+        generate_monster(1 + i % 5)
+
+
+@case("headless_battle", ops=2000)
+def _battles(_state):
+    for i in range(2000):
+        p = Player(row=1, col=1)
+        p.advance_to_level(1 + i % 5)
+        resolve_battle(p, generate_monster(1 + i % 5))
+
+
+@case("chest_boost_rolls", ops=20000)
+def _boosts(_state):
+    for i in range(20000):
+        _roll_permanent_boosts(is_mimic=bool(i & 1))
+
+
+@case("player_to_from_dict", ops=20000, setup=lambda: Player(row=3, col=4))
+def _player_dict(p):
+    for _ in range(20000):
+        Player.from_dict(p.to_dict())
+
+
+def _save_setup():
+    g = world.load_floor(1, seed=1)
+    p = Player(row=1, col=1)
+    p.row, p.col = world.choose_spawn(g)
+    fd, path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    return p, g, path
+
+
+@case("save_load_roundtrip", ops=200, setup=_save_setup, teardown=lambda state: os.remove(state[2]))
+def _save_load(state):
+    p, g, path = state
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(200):
+            save_game(p, 1, g, path=path)
+            load_game(path=path)
+
+
+def _render_setup():
+    g = world.load_floor(1, seed=2)
+    p = Player(row=1, col=1)
+    p.row, p.col = world.choose_spawn(g)
+    return p, g
+
+
+@case("render", ops=2000, setup=_render_setup)
+def _render(state):
+    p, g = state
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(2000):
+            world.render(g, p, 1, "tip")
+
+
+# =========================
+# Runner
+# =========================
+def run_case(c: Case, repeats: int = REPEATS) -> Dict[str, float]:
+    """Time one case; returns stats in microseconds per operation."""
+    samples = []
+    for _ in range(repeats):
+        random.seed(c.seed)
+        state = c.setup()
+        random.seed(c.seed + 1)
+        t0 = time.perf_counter()
+        c.run(state)
+        samples.append((time.perf_counter() - t0) * 1e6 / c.ops)
+        c.teardown(state)
+    q = statistics.quantiles(samples, n=4) if len(samples) >= 2 else [samples[0]] * 3
+    return {
+        "median_us": statistics.median(samples),
+        "min_us": min(samples),
+        "iqr_us": q[2] - q[0],
+        "stdev_us": statistics.stdev(samples) if len(samples) >= 2 else 0.0,
+    }
+
+
+def load_baselines(path: str = BASELINE_PATH) -> Dict[str, dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def compare(results: Dict[str, dict], baselines: Dict[str, dict], tolerance: float) -> List[str]:
+    """Names of cases whose best time exceeds baseline * (1 + tolerance)."""
+    return [name for name, r in results.items()
+            if name in baselines and r["min_us"] > baselines[name]["min_us"] * (1 + tolerance)]
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="DRPG benchmark suite")
+    ap.add_argument("-k", dest="pattern", default="", help="only run cases containing this text")
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                    help="allowed slowdown vs. baseline (0.3 = 30%%)")
+    ap.add_argument("--repeats", type=int, default=REPEATS)
+    ap.add_argument("--baseline", default=BASELINE_PATH)
+    ap.add_argument("--update", action="store_true", help="write results as the new baseline")
+    ap.add_argument("--profile", action="store_true",
+                    help="sample the whole batch and write a collapsed-stack profile")
+    args = ap.parse_args(argv)
+    prof = Sampler().start() if args.profile else None
+
+    baselines = load_baselines(args.baseline)
+    results = {}
+    print(f"{'case':<22}{'min us/op':>12}{'median':>10}{'iqr':>10}{'baseline':>12}{'ratio':>8}")
+    for c in CASES:
+        if args.pattern not in c.name:
+            continue
+        r = results[c.name] = run_case(c, args.repeats)
+        base = baselines.get(c.name, {}).get("min_us")
+        ratio = f"{r['min_us'] / base:.2f}" if base else "-"
+        base_s = f"{base:.2f}" if base else "-"
+        print(f"{c.name:<22}{r['min_us']:>12.2f}{r['median_us']:>10.2f}{r['iqr_us']:>10.2f}{base_s:>12}{ratio:>8}")
+
+    if prof is not None:
+        prof.stop()
+        print(f"Profile written: {prof.write_collapsed(profile_path('bench'))}")
+        print(prof.format_summary())
+
+    if args.update:
+        baselines.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    slow = compare(results, baselines, args.tolerance)
+    for name in slow:
+        print(f"REGRESSION: {name} is more than {args.tolerance:.0%} slower than baseline")
+    return 1 if slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
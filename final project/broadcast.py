@@ -0,0 +1,397 @@
+"""
+Spectator broadcast: stream a live session to local viewers.
+
+The hub keeps the last screen it sent (map rows as shown, status line,
+tip). publish() diffs the new screen against it and encodes one frame:
+  K  keyframe  the whole screen; sent to each viewer when it joins
+  D  delta     changed map cells, the status line / tip if they changed,
+               and the game messages (battle events, ...) since the last frame
+Each frame is encoded once and the same bytes object is queued on every
+viewer socket, so per-viewer cost is the size of the delta. Viewers that
+fall more than MAX_BACKLOG bytes behind are resynchronised with a fresh
+keyframe instead of being sent the backlog (a frame already partly on
+the wire is finished first, so the stream stays aligned). Whatever a
+socket does not take at once is written by the hub's I/O thread as the
+socket drains, also while the host waits at a prompt.
+
+Wire format (big-endian), every frame:
+  kind:1 ("K" | "D")  seq:4  length:4  payload:length
+  keyframe payload:  h:1 w:1 map:h*w  status:str  tip:str
+  delta payload:     flags:1 (1 status, 2 tip)  n:2 (row:1 col:1 glyph:1)*n
+                     [status:str] [tip:str]  m:2 event:str*m
+  str = len:2 utf-8:len
+Map glyphs are single ASCII bytes.
+
+Host:   python main.py --broadcast 7777
+Watch:  python broadcast.py --port 7777
+"""
+
+import argparse
+import select
+import socket
+import struct
+import threading
+from collections import deque
+from typing import Deque, Iterator, List, Optional, Tuple
+
+import messages
+from world import compose_rows, render_text, status_line
+
+HEADER = struct.Struct("!cII")
+CELL = struct.Struct("!BBc")
+U8 = struct.Struct("!B")
+U16 = struct.Struct("!H")
+MAX_BACKLOG = 1 << 20  # bytes queued for one viewer before it is resynced
+FLAG_STATUS, FLAG_TIP = 1, 2
+
+Cell = Tuple[int, int, str]
+
+
+# =========================
+# Encoding
+# =========================
+def _pack_str(text: str) -> bytes:
+    data = text.encode("utf-8")[:0xFFFF]
+    return U16.pack(len(data)) + data
+
+
+def _unpack_str(buf: memoryview, pos: int) -> Tuple[str, int]:
+    (n,) = U16.unpack_from(buf, pos)
+    pos += U16.size
+    return bytes(buf[pos:pos + n]).decode("utf-8", errors="replace"), pos + n
+
+
+def encode_keyframe(seq: int, rows: List[str], status: str, tip: str) -> bytes:
+    payload = b"".join([U8.pack(len(rows)), U8.pack(len(rows[0]) if rows else 0),
+                        "".join(rows).encode("ascii", errors="replace"),
+                        _pack_str(status), _pack_str(tip)])
+    return HEADER.pack(b"K", seq, len(payload)) + payload
+
+
+def encode_delta(seq: int, cells: List[Cell], status: Optional[str], tip: Optional[str],
+                 events: List[str]) -> bytes:
+    """A delta frame; status / tip are None when unchanged."""
+    flags = (FLAG_STATUS if status is not None else 0) | (FLAG_TIP if tip is not None else 0)
+    parts = [U8.pack(flags), U16.pack(len(cells))]
+    parts.extend(CELL.pack(r, c, ch.encode("ascii", errors="replace")) for r, c, ch in cells)
+    if status is not None:
+        parts.append(_pack_str(status))
+    if tip is not None:
+        parts.append(_pack_str(tip))
+    parts.append(U16.pack(len(events)))
+    parts.extend(_pack_str(e) for e in events)
+    payload = b"".join(parts)
+    return HEADER.pack(b"D", seq, len(payload)) + payload
+
+
+def diff_rows(old: List[str], new: List[str]) -> List[Cell]:
+    """Changed cells between two screens of the same size (unchanged rows cost one compare)."""
+    cells = []
+    for r, (a, b) in enumerate(zip(old, new)):
+        if a != b:
+            cells.extend((r, c, y) for c, (x, y) in enumerate(zip(a, b)) if x != y)
+    return cells
+
+
+class FrameReader:
+    """Splits a byte stream into (kind, seq, payload) frames."""
+
+    def __init__(self):
+        self._buf = bytearray()
+
+    def feed(self, data: bytes) -> Iterator[Tuple[str, int, memoryview]]:
+        self._buf += data
+        pos = 0
+        while len(self._buf) - pos >= HEADER.size:
+            kind, seq, n = HEADER.unpack_from(self._buf, pos)
+            end = pos + HEADER.size + n
+            if len(self._buf) < end:
+                break
+            yield kind.decode("ascii"), seq, memoryview(bytes(self._buf[pos + HEADER.size:end]))
+            pos = end
+        del self._buf[:pos]
+
+
+class Screen:
+    """A viewer's copy of the host screen, kept current by apply()."""
+
+    def __init__(self):
+        self.rows: List[bytearray] = []
+        self.status = ""
+        self.tip = ""
+        self.seq = -1
+        self.events: List[str] = []     # messages carried by the last frame
+
+    def apply(self, kind: str, seq: int, payload: memoryview) -> None:
+        if kind == "K":
+            h, w = payload[0], payload[1]
+            grid = bytes(payload[2:2 + h * w])
+            self.rows = [bytearray(grid[r * w:(r + 1) * w]) for r in range(h)]
+            self.status, pos = _unpack_str(payload, 2 + h * w)
+            self.tip, pos = _unpack_str(payload, pos)
+            self.events = []
+        else:
+            flags = payload[0]
+            (n,) = U16.unpack_from(payload, 1)
+            pos = 3
+            for _ in range(n):
+                r, c, ch = CELL.unpack_from(payload, pos)
+                self.rows[r][c] = ch[0]
+                pos += CELL.size
+            if flags & FLAG_STATUS:
+                self.status, pos = _unpack_str(payload, pos)
+            if flags & FLAG_TIP:
+                self.tip, pos = _unpack_str(payload, pos)
+            (m,) = U16.unpack_from(payload, pos)
+            pos += U16.size
+            self.events = []
+            for _ in range(m):
+                text, pos = _unpack_str(payload, pos)
+                self.events.append(text)
+        self.seq = seq
+
+    def map_rows(self) -> List[str]:
+        return [row.decode("ascii") for row in self.rows]
+
+    def text(self) -> str:
+        lines = self.map_rows()
+        if lines:
+            lines.append("-" * len(lines[0]))
+        lines.append(self.status)
+        if self.tip:
+            lines.append(self.tip)
+        lines.extend(self.events)
+        return "\n".join(lines)
+
+
+# =========================
+# Hub
+# =========================
+class _Viewer:
+    __slots__ = ("sock", "out", "queued", "partial")
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.out: Deque[memoryview] = deque()
+        self.queued = 0
+        self.partial = False    # out[0] is the unsent rest of a frame already partly written
+
+
+class BroadcastHub:
+    """
+    Accepts viewers on a local TCP port and fans out the frames built by
+    publish(). A background thread accepts viewers and flushes queued
+    output whenever a viewer socket becomes writable.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = socket.create_server((host, port))
+        self.address = self._server.getsockname()
+        self._viewers: List[_Viewer] = []
+        self._lock = threading.Lock()
+        self._rows: List[str] = []
+        self._status = ""
+        self._tip = ""
+        self._events: List[str] = []
+        self._seq = 0
+        self._keyframe: Tuple[int, bytes] = (-1, b"")
+        self._closed = False
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._thread = threading.Thread(target=self._io_loop, name="broadcast-io", daemon=True)
+        self._thread.start()
+
+    @property
+    def viewers(self) -> int:
+        return len(self._viewers)
+
+    # ---- host side ----
+    def event(self, text: str) -> None:
+        """Queue a game message for the next frame."""
+        with self._lock:
+            self._events.append(text)
+
+    def publish(self, grid, player, floor: int, tip: str = "") -> Optional[bytes]:
+        """Send what changed since the last frame; returns the frame (None if nothing changed)."""
+        rows = compose_rows(grid, player)
+        status = status_line(player, floor)
+        with self._lock:
+            if not self._rows or len(rows) != len(self._rows) or len(rows[0]) != len(self._rows[0]):
+                # first frame or a new floor size: everyone gets a keyframe
+                self._set(rows, status, tip)
+                frame = self._current_keyframe()
+                self._events.clear()
+            else:
+                cells = diff_rows(self._rows, rows)
+                new_status = status if status != self._status else None
+                new_tip = tip if tip != self._tip else None
+                if not (cells or new_status is not None or new_tip is not None or self._events):
+                    return None
+                self._set(rows, status, tip)
+                frame = encode_delta(self._seq, cells, new_status, new_tip, self._events)
+                self._events = []
+            for v in list(self._viewers):
+                self._send(v, frame)
+            if any(v.out for v in self._viewers):
+                self._wake()
+            return frame
+
+    def _set(self, rows: List[str], status: str, tip: str) -> None:
+        self._seq += 1
+        self._rows, self._status, self._tip = rows, status, tip
+
+    def _current_keyframe(self) -> bytes:
+        """The keyframe for the current seq, encoded once however many viewers join."""
+        seq, frame = self._keyframe
+        if seq != self._seq:
+            frame = encode_keyframe(self._seq, self._rows, self._status, self._tip)
+            self._keyframe = (self._seq, frame)
+        return frame
+
+    # ---- viewers ----
+    def _wake(self) -> None:
+        """Make the I/O thread re-check which viewers have output pending."""
+        try:
+            self._wake_w.send(b"x")
+        except OSError:
+            pass
+
+    def _io_loop(self) -> None:
+        while not self._closed:
+            with self._lock:
+                pending = {v.sock: v for v in self._viewers if v.out}
+            try:
+                readable, writable, _ = select.select([self._server, self._wake_r], list(pending), [])
+            except (OSError, ValueError):
+                if self._closed:
+                    return
+                continue  # a viewer was dropped meanwhile
+            if self._wake_r in readable:
+                try:
+                    self._wake_r.recv(4096)
+                except OSError:
+                    pass
+            if self._server in readable:
+                self._accept()
+            if writable:
+                with self._lock:
+                    for sock in writable:
+                        v = pending[sock]
+                        if v in self._viewers:
+                            self._flush(v)
+
+    def _accept(self) -> None:
+        try:
+            sock, _addr = self._server.accept()
+        except OSError:
+            return
+        sock.setblocking(False)
+        v = _Viewer(sock)
+        with self._lock:
+            self._viewers.append(v)
+            if self._rows:
+                self._send(v, self._current_keyframe())
+
+    def _send(self, v: _Viewer, frame: bytes) -> None:
+        """Queue `frame` for one viewer and write as much as its socket takes now."""
+        if v.queued + len(frame) > MAX_BACKLOG:
+            # too far behind: drop the whole queued frames, resync from a keyframe;
+            # a partly written frame must be finished or the stream is misaligned
+            head = v.out[0] if v.partial else None
+            v.out.clear()
+            v.queued = 0
+            if head is not None:
+                v.out.append(head)
+                v.queued = len(head)
+            frame = self._current_keyframe()
+        v.out.append(memoryview(frame))
+        v.queued += len(frame)
+        self._flush(v)
+
+    def _flush(self, v: _Viewer) -> None:
+        """Write queued frames until the socket would block."""
+        try:
+            while v.out:
+                n = v.sock.send(v.out[0])
+                v.queued -= n
+                if n < len(v.out[0]):
+                    v.out[0] = v.out[0][n:]
+                    v.partial = True
+                    break
+                v.out.popleft()
+                v.partial = False
+        except BlockingIOError:
+            pass
+        except OSError:
+            self._drop(v)
+
+    def _drop(self, v: _Viewer) -> None:
+        if v in self._viewers:
+            self._viewers.remove(v)
+        v.sock.close()
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake()
+        self._thread.join(timeout=1.0)
+        self._server.close()
+        self._wake_r.close()
+        self._wake_w.close()
+        with self._lock:
+            for v in list(self._viewers):
+                self._drop(v)
+
+
+class BroadcastSink(messages.Sink):
+    """
+    Forwards game messages to a hub as frame events. The map frame itself
+    (world.render_text) is skipped: viewers get it as cell deltas.
+    """
+    lazy = True
+
+    def __init__(self, hub: BroadcastHub, level: int = messages.INFO):
+        super().__init__(level)
+        self.hub = hub
+
+    def record(self, level: int, template, args: tuple, end: str) -> None:
+        if template is render_text:
+            return
+        text = messages.format_message(template, args)
+        if text:
+            self.hub.event(text)
+
+
+# =========================
+# Viewer
+# =========================
+def watch(host: str = "127.0.0.1", port: int = 7777) -> None:
+    """Connect to a hub and redraw the screen on every frame until it closes."""
+    from fx import cls  # lazy: the hub side needs no terminal FX
+    reader, screen = FrameReader(), Screen()
+    with socket.create_connection((host, port)) as sock:
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                break
+            for kind, seq, payload in reader.feed(data):
+                screen.apply(kind, seq, payload)
+            cls()
+            messages.info(screen.text)
+    messages.info("[broadcast] Session ended.")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Watch a broadcast DRPG session")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=7777)
+    args = ap.parse_args(argv)
+    try:
+        watch(args.host, args.port)
+    except (ConnectionError, KeyboardInterrupt) as e:
+        messages.warn("[broadcast] {}", e or "stopped")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,455 @@
+"""
+Battle rules without the terminal: damage, potions, escape, EXP.
+
+battle.battle() uses these for the interactive fight; resolve_battle()
+plays a whole fight headlessly with a pluggable policy, for simulators,
+benchmarks and the autoplayer. Nothing here prints or reads input.
+
+Status effects (effects.py) are shared by both: a round is the player's
+action (skipped while stunned), then the monster's (skipped while
+stunned), then end_round() ticks HP effects and expires old ones. A crit
+stuns the monster for one round, like a stun skill.
+
+Group encounters (monsters.MonsterGroup) follow the same round, with
+the group's columns updated in one pass: group_strike() for the player's
+hit (every living member for an AoE skill), group_turn() for all the
+members' attacks, group_end_round() for ticks. A lone Monster never goes
+through this path.
+"""
+
+import random
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import compress, repeat
+from operator import add, gt, mul, not_, sub
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from effects import StatusEngine, PLAYER, MONSTER
+from monsters import MonsterGroup
+
+HEAL_POTION_HP = 10    # HP restored by one potion
+SP_POTION_SP = 6       # SP restored by one SP potion
+ESCAPE_CHANCE = 0.5
+ELITE_EXP_MULT = 1.6
+
+# A policy picks the player's action each turn:
+#   "a" attack, "h" heal, "p" SP potion, "r" run, or ("s", skill)
+Action = Union[str, Tuple[str, object]]
+Policy = Callable[[object, object], Action]
+
+
+def _exp_for(level: int, elite) -> int:
+    base_exp = 3 + level * 2
+    if elite:
+        base_exp = int(base_exp * ELITE_EXP_MULT)
+    return base_exp
+
+
+def exp_reward(monster) -> int:
+    """EXP for defeating `monster`; for a group, the sum over its members."""
+    if isinstance(monster, MonsterGroup):
+        return sum(map(_exp_for, monster.levels, monster.elite))
+    return _exp_for(monster.level, getattr(monster, "elite", False))
+
+
+def player_strike(player, monster, skill=None, bonus: int = 0) -> Tuple[int, bool]:
+    """
+    Roll the player's damage (optionally through a skill), apply it and
+    pay the skill's SP. `bonus` (buffs/debuffs) is added to the roll.
+    Returns (damage, is_crit).
+    """
+    dmg, is_crit = player.roll_damage()
+    if bonus:
+        dmg = max(0, dmg + bonus)
+    if skill is not None:
+        dmg = int(dmg * skill.multiplier)
+        player.use_skill(skill)
+    monster.hp -= dmg
+    return dmg, is_crit
+
+
+def monster_strike(monster, player, bonus: int = 0) -> int:
+    """Monster hits the player; returns the damage dealt."""
+    mdmg = max(0, random.randint(monster.atk_min, monster.atk_max) + bonus)
+    player.hp -= mdmg
+    return mdmg
+
+
+# =========================
+# Status effects in the turn order
+# =========================
+def after_player_hit(status: StatusEngine, monster, skill, is_crit: bool) -> List[Tuple[str, str]]:
+    """
+    Effects of the player's strike: a crit stuns the monster, then the
+    skill's effects (enemy ones only if it survived). Returns (target, effect) applied.
+    """
+    applied = []
+    if is_crit and monster.hp > 0:
+        status.apply(MONSTER, "stun")
+        applied.append((MONSTER, "stun"))
+    if skill is not None:
+        for name, target in skill.effects:
+            who = PLAYER if target == "self" else MONSTER
+            if who == MONSTER and monster.hp <= 0:
+                continue
+            if who == MONSTER and name == "stun" and is_crit:
+                continue  # already stunned by the crit this round
+            status.apply(who, name)
+            applied.append((who, name))
+    return applied
+
+
+def monster_turn(status: StatusEngine, monster, player) -> Tuple[Optional[int], Optional[str]]:
+    """
+    The monster's action: (damage, effect applied to the player), or
+    (None, None) when it is stunned.
+    """
+    if status.stunned(MONSTER):
+        return None, None
+    mdmg = monster_strike(monster, player, status.atk_mod(MONSTER))
+    applied = None
+    if monster.on_hit and player.hp > 0:
+        name, chance = monster.on_hit
+        if random.random() < chance:
+            status.apply(PLAYER, name)
+            applied = name
+    return mdmg, applied
+
+
+def end_round(status: StatusEngine, player, monster):
+    """Per-round HP effects and expiries; see StatusEngine.end_round."""
+    return status.end_round({PLAYER: player, MONSTER: monster})
+
+
+def drink_potion(player) -> int:
+    """Use one HP potion; returns HP restored (0 if none left)."""
+    if player.potions <= 0:
+        return 0
+    before = player.hp
+    player.hp = min(player.hp + HEAL_POTION_HP, player.hp_max)
+    player.potions -= 1
+    return player.hp - before
+
+
+def drink_sp_potion(player) -> int:
+    """Use one SP potion; returns SP restored (0 if none left)."""
+    if player.sp_potions <= 0:
+        return 0
+    before = player.sp
+    player.sp = min(player.sp + SP_POTION_SP, player.sp_max)
+    player.sp_potions -= 1
+    return player.sp - before
+
+
+def try_escape() -> bool:
+    return random.random() < ESCAPE_CHANCE
+
+
+# =========================
+# Damage preview
+# =========================
+def damage_stats(player) -> Tuple[int, int, float, float]:
+    """The stats a strike depends on; they only change on level-up and permanent boosts."""
+    return (player.atk_min, player.atk_max, player.crit_chance, player.crit_multiplier)
+
+
+@lru_cache(maxsize=256)
+def damage_distribution(stats: Tuple[int, int, float, float], multiplier: float = 1.0,
+                        bonus: int = 0) -> Tuple[Tuple[int, float], ...]:
+    """
+    Exact distribution of one strike as ((damage, probability), ...), sorted by
+    damage: a uniform base roll, a crit with chance crit_chance (x crit_multiplier,
+    truncated), the status bonus (floored at 0), then the skill multiplier
+    (truncated), as in player_strike().
+    """
+    atk_min, atk_max, crit, crit_mult = stats
+    p_base = 1.0 / (atk_max - atk_min + 1)
+    dist = {}
+    for base in range(atk_min, atk_max + 1):
+        for dmg, p in ((base, 1.0 - crit), (int(base * crit_mult), crit)):
+            if p > 0:
+                if bonus:
+                    dmg = max(0, dmg + bonus)
+                dmg = int(dmg * multiplier)
+                dist[dmg] = dist.get(dmg, 0.0) + p * p_base
+    return tuple(sorted(dist.items()))
+
+
+@lru_cache(maxsize=256)
+def _preview_table(stats: Tuple[int, int, float, float], multiplier: float,
+                   bonus: int = 0) -> Tuple[float, Tuple[int, ...], Tuple[float, ...]]:
+    """(expected damage, damages, P(damage >= damages[i])) for kill-probability lookups."""
+    dist = damage_distribution(stats, multiplier, bonus)
+    dmgs = tuple(d for d, _p in dist)
+    tail, acc = [], 0.0
+    for _d, p in reversed(dist):
+        acc += p
+        tail.append(acc)
+    return sum(d * p for d, p in dist), dmgs, tuple(reversed(tail))
+
+
+def strike_preview(player, monster, skill=None, bonus: int = 0) -> Tuple[float, float]:
+    """
+    (expected damage, chance to kill `monster` this hit) for an attack or a
+    skill; `bonus` is the player's current status attack modifier.
+    """
+    expected, dmgs, tail = _preview_table(damage_stats(player),
+                                          skill.multiplier if skill is not None else 1.0, bonus)
+    i = bisect_left(dmgs, monster.hp)
+    return expected, (tail[i] if i < len(tail) else 0.0)
+
+
+# =========================
+# Policies
+# =========================
+def attack_policy(player, monster) -> Action:
+    """Always use the basic attack."""
+    return "a"
+
+
+def default_policy(player, monster) -> Action:
+    """
+    A sensible greedy player: heal when low, otherwise the strongest
+    affordable damage skill, otherwise attack. Against two or more
+    monsters an affordable AoE skill comes first.
+    """
+    if player.hp <= max(4, player.hp_max // 3) and player.potions > 0:
+        return "h"
+    if isinstance(monster, MonsterGroup) and len(monster.alive()) > 1:
+        for sk in player.skills:
+            if sk.aoe and player.can_use(sk):
+                return ("s", sk)
+    best = None
+    for sk in player.skills:
+        if player.can_use(sk) and sk.multiplier > 1 and (best is None or sk.multiplier > best.multiplier):
+            best = sk
+    if best is not None:
+        return ("s", best)
+    return "a"
+
+
+@dataclass
+class BattleResult:
+    outcome: str            # "win" | "lose" | "escape"
+    turns: int = 0
+    hp_lost: int = 0
+    sp_used: int = 0
+    potions_used: int = 0
+    sp_potions_used: int = 0
+    exp: int = 0
+
+
+def resolve_battle(player, monster, policy: Optional[Policy] = None,
+                   max_turns: int = 500, award_exp: bool = True) -> BattleResult:
+    """
+    Play a full battle with the same rules as battle.battle(), silently,
+    status effects included. Runs past `max_turns` count as a loss.
+    `monster` may be a MonsterGroup; single targets are then the weakest
+    living member.
+    """
+    policy = policy or default_policy
+    if isinstance(monster, MonsterGroup):
+        return _resolve_group_battle(player, monster, policy, max_turns, award_exp)
+    hp0, sp0 = player.hp, player.sp
+    pots0, spots0 = player.potions, player.sp_potions
+    res = BattleResult(outcome="lose")
+    status = StatusEngine()
+
+    while monster.is_alive() and player.is_alive() and res.turns < max_turns:
+        res.turns += 1
+        action = "" if status.stunned(PLAYER) else policy(player, monster)
+        bonus = status.atk_mod(PLAYER)
+
+        if action == "a":
+            _dmg, is_crit = player_strike(player, monster, bonus=bonus)
+            after_player_hit(status, monster, None, is_crit)
+        elif action == "h":
+            drink_potion(player)
+        elif action == "p":
+            drink_sp_potion(player)
+        elif action == "r":
+            if try_escape():
+                res.outcome = "escape"
+                break
+        elif action:
+            _kind, sk = action
+            if not player.can_use(sk):
+                sk = None
+            _dmg, is_crit = player_strike(player, monster, sk, bonus)
+            after_player_hit(status, monster, sk, is_crit)
+
+        if monster.is_alive():
+            monster_turn(status, monster, player)
+        end_round(status, player, monster)
+
+    if res.outcome != "escape":
+        res.outcome = "win" if (player.is_alive() and not monster.is_alive()) else "lose"
+    # measured before EXP, since a level-up refills HP/SP
+    res.hp_lost = max(0, hp0 - max(player.hp, 0))
+    res.sp_used = sp0 - player.sp
+    res.potions_used = pots0 - player.potions
+    res.sp_potions_used = spots0 - player.sp_potions
+    if res.outcome == "win":
+        res.exp = exp_reward(monster)
+        if award_exp:
+            player.gain_exp(res.exp)
+    return res
+
+
+# =========================
+# Group battles
+# =========================
+class _Member:
+    """hp view of one group member, so StatusEngine.end_round can tick it."""
+    __slots__ = ("group", "i")
+
+    def __init__(self, group: MonsterGroup, i: int):
+        self.group, self.i = group, i
+
+    @property
+    def hp(self) -> int:
+        return self.group.hp[self.i]
+
+    @hp.setter
+    def hp(self, value: int) -> None:
+        self.group.hp[self.i] = value
+
+
+def member_key(i: int) -> Tuple[str, int]:
+    """StatusEngine target of group member i."""
+    return (MONSTER, i)
+
+
+def weakest(group: MonsterGroup) -> int:
+    """The living member with the least HP (the default single target)."""
+    return min(group.alive(), key=group.hp.__getitem__)
+
+
+def group_strike(player, group: MonsterGroup, target: int, skill=None,
+                 bonus: int = 0) -> Tuple[int, bool, List[int]]:
+    """
+    One damage roll, as player_strike(): applied to member `target`, or to
+    every living member at once for an AoE skill. Returns
+    (damage, is_crit, indices hit).
+    """
+    dmg, is_crit = player.roll_damage()
+    if bonus:
+        dmg = max(0, dmg + bonus)
+    if skill is not None:
+        dmg = int(dmg * skill.multiplier)
+        player.use_skill(skill)
+    hp = group.hp
+    if skill is not None and skill.aoe:
+        alive = bytes(map(gt, hp, repeat(0)))
+        hit = list(compress(range(len(hp)), alive))
+        hp[:] = array("i", map(sub, hp, map(mul, alive, repeat(dmg))))
+    else:
+        hit = [target]
+        hp[target] -= dmg
+    return dmg, is_crit, hit
+
+
+def after_group_hit(status: StatusEngine, group: MonsterGroup, hit: List[int], skill,
+                    is_crit: bool) -> List[Tuple[object, str]]:
+    """
+    after_player_hit() for a group: a crit stuns every member it hit, then
+    the skill's effects land on each surviving member hit, all through the
+    StatusEngine under member_key(i). Returns (PLAYER or member index,
+    effect) applied.
+    """
+    applied: List[Tuple[object, str]] = []
+    survivors = [i for i in hit if group.hp[i] > 0]
+    if is_crit:
+        for i in survivors:
+            status.apply(member_key(i), "stun")
+            applied.append((i, "stun"))
+    if skill is not None:
+        for name, target in skill.effects:
+            if target == "self":
+                status.apply(PLAYER, name)
+                applied.append((PLAYER, name))
+                continue
+            if name == "stun" and is_crit:
+                continue  # already stunned by the crit this round
+            for i in survivors:
+                status.apply(member_key(i), name)
+                applied.append((i, name))
+    return applied
+
+
+def group_turn(status: StatusEngine, group: MonsterGroup, player) -> Tuple[List[int], List[Tuple[int, str]]]:
+    """
+    Every living, unstunned member attacks at once. Returns (damage per
+    member, 0 for those that did not act; [(member, effect inflicted)]).
+    """
+    n = len(group)
+    keys = list(map(member_key, range(n)))
+    ready = bytes(map(mul, map(gt, group.hp, repeat(0)), map(not_, map(status.stunned, keys))))
+    rolls = map(random.randint, group.atk_min, group.atk_max)
+    mods = map(status.atk_mod, keys)
+    dmg = list(map(mul, ready, map(max, repeat(0), map(add, rolls, mods))))
+    player.hp -= sum(dmg)
+    inflicted = []
+    for i in compress(range(n), ready):
+        on_hit = group.on_hit[i]
+        if on_hit and player.hp > 0 and random.random() < on_hit[1]:
+            status.apply(PLAYER, on_hit[0])
+            inflicted.append((i, on_hit[0]))
+    return dmg, inflicted
+
+
+def group_end_round(status: StatusEngine, player, group: MonsterGroup):
+    """end_round() for a group: every member is a StatusEngine target."""
+    actors: Dict[object, object] = {PLAYER: player}
+    for i in range(len(group)):
+        actors[member_key(i)] = _Member(group, i)
+    return status.end_round(actors)
+
+
+def _resolve_group_battle(player, group: MonsterGroup, policy: Policy, max_turns: int,
+                          award_exp: bool) -> BattleResult:
+    hp0, sp0 = player.hp, player.sp
+    pots0, spots0 = player.potions, player.sp_potions
+    res = BattleResult(outcome="lose")
+    status = StatusEngine()
+
+    while group.is_alive() and player.is_alive() and res.turns < max_turns:
+        res.turns += 1
+        action = "" if status.stunned(PLAYER) else policy(player, group)
+        bonus = status.atk_mod(PLAYER)
+
+        if action == "a":
+            _dmg, is_crit, hit = group_strike(player, group, weakest(group), bonus=bonus)
+            after_group_hit(status, group, hit, None, is_crit)
+        elif action == "h":
+            drink_potion(player)
+        elif action == "p":
+            drink_sp_potion(player)
+        elif action == "r":
+            if try_escape():
+                res.outcome = "escape"
+                break
+        elif action:
+            _kind, sk = action
+            if not player.can_use(sk):
+                sk = None
+            _dmg, is_crit, hit = group_strike(player, group, weakest(group), sk, bonus)
+            after_group_hit(status, group, hit, sk, is_crit)
+
+        if group.is_alive():
+            group_turn(status, group, player)
+        group_end_round(status, player, group)
+
+    if res.outcome != "escape":
+        res.outcome = "win" if (player.is_alive() and not group.is_alive()) else "lose"
+    res.hp_lost = max(0, hp0 - max(player.hp, 0))
+    res.sp_used = sp0 - player.sp
+    res.potions_used = pots0 - player.potions
+    res.sp_potions_used = spots0 - player.sp_potions
+    if res.outcome == "win":
+        res.exp = exp_reward(group)
+        if award_exp:
+            player.gain_exp(res.exp)
+    return res
@@ -2,12 +2,15 @@
 """
 Load configuration from config.json with safe defaults.
 Import CFG from this module anywhere you need configuration values.
+The file is read lazily: nothing touches the disk until CFG is first used.
 """
 
-import json, os
+import os
+from collections.abc import MutableMapping
+from metrics import timed
 
 _DEFAULTS = {
-    "treasure": {
+    "treasure": {                  # fallback only: the content packs' treasure.json sets these
         "chest_per_floor": 1,
         "mimic_chance": 0.30,
         "heal_rate": 0.30,
@@ -15,7 +18,33 @@ _DEFAULTS = {
         "gamble_attr_count_max": 3,
         "backfire_prob": 0.20,
         "mimic_boost_bias": 0.20,
-    }
+    },
+    "encounters": {
+        "mode": "random",          # "random": flat roll per step; "roaming": monsters on the map
+        "rate": 0.25,              # random mode: chance per step
+        "roaming_per_floor": 6,    # roaming mode: monsters spawned per floor
+        "chase_radius": 8,         # roaming mode: path distance at which monsters start chasing
+        "wander_rate": 0.3,        # roaming mode: share of idle monsters that wander each tick
+        "group_max": 8,            # random mode: largest monster group (1 = always a single monster)
+    },
+    "world": {
+        "generator": "dfs",        # maze generator: "dfs" (recursive backtracking) or "eller" (row-streaming)
+        "fog": True,               # fog of war: only what the player has seen is drawn
+        "fog_radius": 3,           # sight radius in cells (walls block the line of sight)
+    },
+    "input": {
+        "raw_keys": True,          # single-keystroke input on a terminal (no Enter needed)
+    },
+    "autoresolve": {
+        "enabled": False,          # settle lone-monster fights you can hardly lose without playing them
+        "max_loss": 0.01,          # auto-resolve only when at most this share of simulated fights is lost
+        "samples": 200,            # simulated fights per outcome table
+    },
+    "content": {
+        "dir": "content",          # pack root, relative to this module
+        "packs": ["base"],         # layered in order; add a server pack after "base"
+        "cache": True,             # keep compiled packs in <dir>/.cache (keyed by file hashes)
+    },
 }
 
 def _deep_update(dst: dict, src: dict) -> dict:
@@ -27,18 +56,74 @@ def _deep_update(dst: dict, src: dict) -> dict:
             dst[k] = v
     return dst
 
+def _deep_copy(src: dict) -> dict:
+    """Copy nested dicts; leaf values are immutable scalars."""
+    return {k: _deep_copy(v) if isinstance(v, dict) else v for k, v in src.items()}
+
+@timed("config.load")
 def load_config() -> dict:
-    """Load user config from config.json, fall back to defaults if missing."""
+    """
+    Load user config from config.json, fall back to defaults if missing.
+    Precedence: defaults < content packs (treasure tuning) < config.json.
+    """
+    import json  # deferred: only paid when config is actually read
+    import content
+    import messages
     here = os.path.dirname(__file__)
     path = os.path.join(here, "config.json")
-    cfg = json.loads(json.dumps(_DEFAULTS))  # deep copy defaults
+    cfg = _deep_copy(_DEFAULTS)
+    user = {}
     try:
         with open(path, "r", encoding="utf-8") as f:
             user = json.load(f)
-        _deep_update(cfg, user)
     except Exception as e:
-        print(f"[config] Using defaults ({e})")
+        messages.warn("[config] Using defaults ({})", e)
+    if isinstance(user.get("content"), dict):
+        _deep_update(cfg["content"], user["content"])
+    try:
+        cfg["treasure"].update(content.load(cfg["content"]).treasure)
+    except content.ContentError as e:
+        messages.warn("[config] Content packs not loaded ({})", e)
+    _deep_update(cfg, user)
     return cfg
 
+
+class _LazyConfig(MutableMapping):
+    """Dict-like singleton that calls load_config() on first access."""
+
+    def __init__(self):
+        self._data = None
+
+    def _get(self) -> dict:
+        if self._data is None:
+            self._data = load_config()
+        return self._data
+
+    def is_loaded(self) -> bool:
+        return self._data is not None
+
+    def reload(self) -> None:
+        """Drop the cached config; the next access re-reads config.json."""
+        self._data = None
+
+    def __getitem__(self, key):
+        return self._get()[key]
+
+    def __setitem__(self, key, value):
+        self._get()[key] = value
+
+    def __delitem__(self, key):
+        del self._get()[key]
+
+    def __iter__(self):
+        return iter(self._get())
+
+    def __len__(self):
+        return len(self._get())
+
+    def __repr__(self):
+        return f"CFG({self._get()!r})" if self.is_loaded() else "CFG(<not loaded>)"
+
+
 # Public singleton
-CFG = load_config()
+CFG = _LazyConfig()
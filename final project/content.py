@@ -0,0 +1,341 @@
+"""
+Content packs: monster, skill and treasure definitions loaded from data files.
+
+A pack is a directory holding any of
+    monsters.json   [{"name", "base_hp", "base_atk_min", "base_atk_max",
+                      "floors", "weight", "on_hit"?: [effect, chance]}, ...]
+    skills.json     [{"name", "cost", "multiplier", "desc"?, "stun"?,
+                      "effects"?: [[effect, "enemy" | "self"], ...], "aoe"?}, ...]
+    treasure.json   {"mimic_chance": 0.3, ...}   (keys of config "treasure")
+Packs are layered in order: a later pack replaces monsters and skills of
+the same name in place (so template indices and skill ids keep their
+order) and appends new ones; treasure keys are merged. The game ships
+content/base; a server adds its own pack on top in config.json:
+    "content": {"dir": "content", "packs": ["base", "my_server"]}
+Pack names are relative to "dir" (itself relative to this module), or
+absolute paths.
+
+Loading validates every entry (ContentError names the file and entry)
+and compiles the result into plain tuples and dicts plus the lookup
+indexes the game needs: name -> index for monsters and skills, and the
+(template indices, weights) pool of every floor. The compiled form is
+cached with marshal under <dir>/.cache, keyed by a hash of the pack
+files' bytes, so a later start with unchanged files reads one file and
+skips parsing and validation.
+
+    python content.py [--no-cache]    validate the configured packs and print a summary
+"""
+
+import hashlib
+import marshal
+import os
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from metrics import timed
+
+CONTENT_VERSION = 1      # bump when the compiled layout changes
+KINDS = ("monsters", "skills", "treasure")
+MAX_TEMPLATES = 127      # roaming packs store template indices in signed bytes
+TARGETS = ("enemy", "self")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+Pool = Tuple[Tuple[int, ...], Tuple[float, ...]]
+
+
+class ContentError(ValueError):
+    """A pack file is missing, unreadable or fails validation."""
+
+
+class Content(NamedTuple):
+    key: str                          # hash of the pack files this was compiled from
+    monsters: List[Dict]              # templates, in pack order (index = template index)
+    skills: List[tuple]               # skills.Skill arguments, in pack order
+    treasure: Dict[str, float]
+    monster_index: Dict[str, int]     # template name -> index
+    skill_index: Dict[str, int]       # skill name -> position in skills
+    floor_pools: Dict[int, Pool]      # floor -> (template indices, weights)
+    any_pool: Pool                    # every template, for floors no template lists
+    from_cache: bool
+
+
+# =========================
+# Locating packs
+# =========================
+def pack_dirs(section: dict) -> List[str]:
+    """Absolute pack directories for a config "content" section, in layering order."""
+    root = os.path.join(HERE, section.get("dir", "content"))
+    dirs = []
+    for name in section.get("packs", ["base"]):
+        path = os.path.normpath(os.path.join(root, name))
+        if not os.path.isdir(path):
+            raise ContentError(f"content pack {name!r} not found ({path})")
+        dirs.append(path)
+    if not dirs:
+        raise ContentError("no content packs configured")
+    return dirs
+
+
+def _read_packs(dirs: Sequence[str]) -> Tuple[str, List[Tuple[str, str, bytes]]]:
+    """(cache key, [(kind, path, raw bytes)]) for every pack file present."""
+    h = hashlib.sha256(f"drpg-content-{CONTENT_VERSION}".encode())
+    files = []
+    for d in dirs:
+        for kind in KINDS:
+            path = os.path.join(d, kind + ".json")
+            try:
+                with open(path, "rb") as f:
+                    raw = f.read()
+            except FileNotFoundError:
+                h.update(f"{kind}:-".encode())
+                continue
+            except OSError as e:
+                raise ContentError(f"{path}: {e}") from e
+            h.update(f"{kind}:{len(raw)}:".encode())
+            h.update(raw)
+            files.append((kind, path, raw))
+    return h.hexdigest(), files
+
+
+# =========================
+# Validation
+# =========================
+def _is_int(v) -> bool:
+    return isinstance(v, int) and not isinstance(v, bool)
+
+
+def _is_num(v) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _check(ok: bool, where: str, what: str) -> None:
+    if not ok:
+        raise ContentError(f"{where}: {what}")
+
+
+def _check_keys(entry: dict, required: Sequence[str], optional: Sequence[str], where: str) -> None:
+    _check(isinstance(entry, dict), where, "expected an object")
+    missing = [k for k in required if k not in entry]
+    _check(not missing, where, f"missing {', '.join(missing)}")
+    unknown = sorted(set(entry) - set(required) - set(optional))
+    _check(not unknown, where, f"unknown field(s) {', '.join(unknown)}")
+
+
+def _effect_names():
+    from effects import EFFECTS
+    return EFFECTS
+
+
+def _monster(entry, where: str) -> Dict:
+    _check_keys(entry, ("name", "base_hp", "base_atk_min", "base_atk_max", "floors", "weight"),
+                ("on_hit",), where)
+    _check(isinstance(entry["name"], str) and entry["name"].strip() != "", where, "name must be a non-empty string")
+    _check(_is_int(entry["base_hp"]) and entry["base_hp"] > 0, where, "base_hp must be a positive integer")
+    a1, a2 = entry["base_atk_min"], entry["base_atk_max"]
+    _check(_is_int(a1) and _is_int(a2) and 0 <= a1 <= a2, where, "need integers 0 <= base_atk_min <= base_atk_max")
+    floors = entry["floors"]
+    _check(isinstance(floors, list) and floors and all(_is_int(f) and f > 0 for f in floors),
+           where, "floors must be a non-empty list of positive integers")
+    _check(_is_num(entry["weight"]) and entry["weight"] > 0, where, "weight must be a positive number")
+    tpl = {k: entry[k] for k in ("name", "base_hp", "base_atk_min", "base_atk_max")}
+    tpl["floors"] = list(floors)
+    tpl["weight"] = entry["weight"]
+    if "on_hit" in entry:
+        on_hit = entry["on_hit"]
+        _check(isinstance(on_hit, list) and len(on_hit) == 2 and on_hit[0] in _effect_names()
+               and _is_num(on_hit[1]) and 0 <= on_hit[1] <= 1,
+               where, "on_hit must be [known effect, chance 0..1]")
+        tpl["on_hit"] = (on_hit[0], on_hit[1])
+    return tpl
+
+
+def _skill(entry, where: str) -> tuple:
+    _check_keys(entry, ("name", "cost", "multiplier"), ("desc", "stun", "effects", "aoe"), where)
+    _check(isinstance(entry["name"], str) and entry["name"].strip() != "", where, "name must be a non-empty string")
+    _check(_is_int(entry["cost"]) and entry["cost"] >= 0, where, "cost must be a non-negative integer")
+    _check(_is_num(entry["multiplier"]) and entry["multiplier"] >= 0, where, "multiplier must be >= 0")
+    desc = entry.get("desc", "")
+    _check(isinstance(desc, str), where, "desc must be a string")
+    stun, aoe = entry.get("stun", False), entry.get("aoe", False)
+    _check(isinstance(stun, bool) and isinstance(aoe, bool), where, "stun and aoe must be true/false")
+    effects = entry.get("effects", [])
+    _check(isinstance(effects, list) and all(isinstance(e, list) and len(e) == 2 and e[0] in _effect_names()
+                                             and e[1] in TARGETS for e in effects),
+           where, f"effects must be [[known effect, {' | '.join(TARGETS)}], ...]")
+    return (entry["name"], entry["cost"], entry["multiplier"], desc, stun,
+            tuple(tuple(e) for e in effects), aoe)
+
+
+def _treasure(data, where: str) -> Dict[str, float]:
+    from config import _DEFAULTS
+    known = _DEFAULTS["treasure"]
+    _check(isinstance(data, dict), where, "expected an object")
+    for k, v in data.items():
+        _check(k in known, where, f"unknown treasure key {k!r}")
+        _check(_is_num(v) and v >= 0, where, f"{k} must be a non-negative number")
+    return dict(data)
+
+
+def _layer(into: List, index: Dict[str, int], items: List, name_of) -> None:
+    """Replace same-name items in place, append new ones."""
+    for item in items:
+        i = index.get(name_of(item))
+        if i is None:
+            index[name_of(item)] = len(into)
+            into.append(item)
+        else:
+            into[i] = item
+
+
+# =========================
+# Compiling
+# =========================
+@timed("content.compile")
+def compile_files(files: Sequence[Tuple[str, str, bytes]]) -> dict:
+    """Parse, validate and layer pack files into the marshal-able compiled form."""
+    import json  # deferred: a cache hit never parses
+    monsters: List[Dict] = []
+    skills: List[tuple] = []
+    treasure: Dict[str, float] = {}
+    monster_index: Dict[str, int] = {}
+    skill_index: Dict[str, int] = {}
+
+    for kind, path, raw in files:
+        try:
+            data = json.loads(raw.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError) as e:
+            raise ContentError(f"{path}: {e}") from e
+        if kind == "treasure":
+            treasure.update(_treasure(data, path))
+            continue
+        _check(isinstance(data, list), path, "expected a list")
+        build, name_at = (_monster, "name") if kind == "monsters" else (_skill, 0)
+        items = [build(entry, f"{path} #{i} ({entry.get('name', '?') if isinstance(entry, dict) else '?'})")
+                 for i, entry in enumerate(data)]
+        names = [item[name_at] for item in items]
+        dupes = sorted({n for n in names if names.count(n) > 1})
+        _check(not dupes, path, f"duplicate name(s) {', '.join(dupes)}")
+        if kind == "monsters":
+            _layer(monsters, monster_index, items, lambda m: m["name"])
+        else:
+            _layer(skills, skill_index, items, lambda s: s[0])
+
+    _check(bool(monsters), "content", "no monsters defined")
+    _check(len(monsters) <= MAX_TEMPLATES, "content", f"at most {MAX_TEMPLATES} monsters")
+    _check(bool(skills), "content", "no skills defined")
+
+    floor_pools: Dict[int, Pool] = {}
+    for floor in sorted({f for m in monsters for f in m["floors"]}):
+        idx = tuple(i for i, m in enumerate(monsters) if floor in m["floors"])
+        floor_pools[floor] = (idx, tuple(monsters[i]["weight"] for i in idx))
+    return {
+        "version": CONTENT_VERSION,
+        "monsters": monsters,
+        "skills": skills,
+        "treasure": treasure,
+        "monster_index": monster_index,
+        "skill_index": skill_index,
+        "floor_pools": floor_pools,
+        "any_pool": (tuple(range(len(monsters))), tuple(m["weight"] for m in monsters)),
+    }
+
+
+def _cache_path(section: dict, key: str) -> str:
+    root = os.path.join(HERE, section.get("dir", "content"))
+    return os.path.join(root, ".cache", f"{key[:32]}.bin")
+
+
+def _read_cache(path: str) -> Optional[dict]:
+    try:
+        with open(path, "rb") as f:
+            data = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return data if isinstance(data, dict) and data.get("version") == CONTENT_VERSION else None
+
+
+def _write_cache(path: str, data: dict) -> None:
+    """Best effort: a read-only install just compiles on every start."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            marshal.dump(data, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        import messages
+        messages.debug("[content] cache not written ({})", e)
+
+
+_loaded: Dict[tuple, Content] = {}
+
+
+def load(section: Optional[dict] = None, use_cache: Optional[bool] = None) -> Content:
+    """
+    The compiled content for a config "content" section (defaults: base pack),
+    from the in-process memo, the on-disk cache, or the pack files.
+    """
+    section = section or {}
+    if use_cache is None:
+        use_cache = bool(section.get("cache", True))
+    dirs = pack_dirs(section)
+    key, files = _read_packs(dirs)
+    memo = _loaded.get((key, tuple(dirs)))
+    if memo is not None:
+        return memo
+
+    data = _read_cache(_cache_path(section, key)) if use_cache else None
+    from_cache = data is not None
+    if data is None:
+        data = compile_files(files)
+        if use_cache:
+            _write_cache(_cache_path(section, key), data)
+    content = Content(key, data["monsters"], data["skills"], data["treasure"], data["monster_index"],
+                      data["skill_index"], data["floor_pools"], data["any_pool"], from_cache)
+    _loaded[(key, tuple(dirs))] = content
+    return content
+
+
+_current: Optional[Tuple[tuple, Content]] = None
+
+
+def current() -> Content:
+    """The content for the configured packs (config "content"), loaded once per pack list."""
+    global _current
+    from config import CFG
+    section = CFG["content"]
+    ident = (section.get("dir"), tuple(section.get("packs", ())))
+    if _current is None or _current[0] != ident:
+        _current = (ident, load(section))
+    return _current[1]
+
+
+def reset() -> None:
+    """Forget loaded content (the on-disk cache stays); the next current() reloads."""
+    global _current
+    _current = None
+    _loaded.clear()
+
+
+def main(argv=None) -> int:
+    import argparse
+    import messages
+    from config import CFG
+    ap = argparse.ArgumentParser(description="Validate and compile the configured content packs")
+    ap.add_argument("--no-cache", action="store_true", help="always parse the pack files")
+    args = ap.parse_args(argv)
+    try:
+        c = load(CFG["content"], use_cache=not args.no_cache)
+    except ContentError as e:
+        messages.error("{}", e)
+        return 1
+    messages.info("packs: {}", ", ".join(CFG["content"]["packs"]))
+    messages.info("{} monsters, {} skills, {} treasure keys ({})", len(c.monsters), len(c.skills),
+                  len(c.treasure), "cached" if c.from_cache else "compiled")
+    for floor, (idx, _weights) in sorted(c.floor_pools.items()):
+        messages.info("  floor {}: {}", floor, ", ".join(c.monsters[i]["name"] for i in idx))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
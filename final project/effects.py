@@ -0,0 +1,161 @@
+"""
+Status effects for battles: stuns, poison, regen, buffs and debuffs.
+
+Effects are data: an EffectDef says how long it lasts and what it does
+while active (skip the target's actions, HP per round, attack modifier).
+Skills name the effects they apply (skills.Skill.effects), monster
+templates may apply one on hit ("on_hit" in a content pack's monsters.json).
+
+A StatusEngine runs one battle. Each apply() pushes the effect's expiry
+round onto a heap and adds its numbers to the target's running totals
+(an Aggregate), so
+  - apply is O(log n), and each expiry is one heap pop,
+  - "is the monster stunned?" and "how much poison ticks now?" read the
+    totals in O(1); end_round() never walks the list of effects.
+Re-applying a non-stacking effect refreshes its expiry; the superseded
+heap entry is skipped when it surfaces.
+
+Rounds: an effect applied during round t with duration d is active for
+rounds t .. t+d-1 (a 1-round stun skips the target's next action).
+"""
+
+import heapq
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Tuple
+
+PLAYER, MONSTER = "player", "monster"
+
+
+@dataclass(frozen=True, slots=True)
+class EffectDef:
+    name: str
+    duration: int               # rounds
+    stun: bool = False          # target loses its actions
+    hp_per_turn: int = 0        # applied at the end of each round (<0 poison, >0 regen)
+    atk_mod: int = 0            # added to the target's damage rolls (<0 debuff)
+    stacks: bool = False        # False: re-applying refreshes the duration
+    desc: str = ""
+
+
+EFFECTS: Dict[str, EffectDef] = {}
+
+
+def define_effect(effect: EffectDef) -> EffectDef:
+    """Register (or replace) an effect definition by name."""
+    EFFECTS[effect.name] = effect
+    return effect
+
+
+def effect(name: str) -> EffectDef:
+    return EFFECTS[name]
+
+
+for _e in (
+    EffectDef("stun", 1, stun=True, desc="cannot act"),
+    EffectDef("knockout", 2, stun=True, desc="cannot act for 2 rounds"),
+    EffectDef("poison", 3, hp_per_turn=-2, stacks=True, desc="-2 HP per round"),
+    EffectDef("regen", 3, hp_per_turn=3, desc="+3 HP per round"),
+    EffectDef("rage", 3, atk_mod=2, desc="+2 damage"),
+    EffectDef("weaken", 2, atk_mod=-2, desc="-2 damage"),
+):
+    define_effect(_e)
+
+
+class Aggregate:
+    """Running totals of everything active on one target."""
+    __slots__ = ("stun", "hp_per_turn", "atk_mod")
+
+    def __init__(self):
+        self.stun = 0
+        self.hp_per_turn = 0
+        self.atk_mod = 0
+
+    def add(self, e: EffectDef, sign: int) -> None:
+        self.stun += sign * e.stun
+        self.hp_per_turn += sign * e.hp_per_turn
+        self.atk_mod += sign * e.atk_mod
+
+
+class StatusEngine:
+    """Active effects of one battle, keyed by target ("player", "monster", ...)."""
+
+    def __init__(self):
+        self.round = 0
+        self._heap: List[Tuple[int, int, Hashable, str]] = []   # (expires, seq, target, name)
+        self._active: Dict[Tuple[Hashable, str], List[int]] = {}  # (target, name) -> [expires, stacks]
+        self._agg: Dict[Hashable, Aggregate] = {}
+        self._seq = 0
+
+    def _push(self, expires: int, target: Hashable, name: str) -> None:
+        self._seq += 1
+        heapq.heappush(self._heap, (expires, self._seq, target, name))
+
+    def apply(self, target: Hashable, name: str) -> EffectDef:
+        e = EFFECTS[name]
+        expires = self.round + e.duration
+        key = (target, name)
+        cur = self._active.get(key)
+        if cur is not None and not e.stacks:
+            if expires > cur[0]:
+                cur[0] = expires
+                self._push(expires, target, name)
+            return e
+        if cur is None:
+            self._active[key] = [expires, 1]
+        else:
+            cur[0] = max(cur[0], expires)
+            cur[1] += 1
+        agg = self._agg.get(target)
+        if agg is None:
+            agg = self._agg[target] = Aggregate()
+        agg.add(e, +1)
+        self._push(expires, target, name)
+        return e
+
+    # ---- O(1) queries ----
+    def stunned(self, target: Hashable) -> bool:
+        agg = self._agg.get(target)
+        return agg is not None and agg.stun > 0
+
+    def atk_mod(self, target: Hashable) -> int:
+        agg = self._agg.get(target)
+        return agg.atk_mod if agg is not None else 0
+
+    def active(self, target: Hashable) -> List[str]:
+        """Names of the effects on `target` (for display; O(active effects))."""
+        return sorted(name for (t, name) in self._active if t == target)
+
+    def end_round(self, actors: Dict[Hashable, object]) -> List[Tuple[Hashable, str, int]]:
+        """
+        Close the round: per-round HP changes on each target in `actors`
+        (clamped to 0..hp_max), then expiries. Returns the events as
+        (target, "hp", delta) and (target, "expired", effect name).
+        """
+        events = []
+        for target, obj in actors.items():
+            agg = self._agg.get(target)
+            if agg is None or not agg.hp_per_turn or obj.hp <= 0:
+                continue
+            before = obj.hp
+            hp = before + agg.hp_per_turn
+            hp_max: Optional[int] = getattr(obj, "hp_max", None)
+            if hp_max is not None:
+                hp = min(hp, hp_max)
+            obj.hp = max(hp, 0)
+            if obj.hp != before:
+                events.append((target, "hp", obj.hp - before))
+        self.round += 1
+        heap = self._heap
+        while heap and heap[0][0] <= self.round:
+            expires, _seq, target, name = heapq.heappop(heap)
+            key = (target, name)
+            cur = self._active.get(key)
+            e = EFFECTS[name]
+            if cur is None or (not e.stacks and cur[0] != expires):
+                continue  # superseded by a refresh
+            self._agg[target].add(e, -1)
+            cur[1] -= 1
+            if cur[1] <= 0:
+                del self._active[key]
+                events.append((target, "expired", name))
+        return events
@@ -0,0 +1,312 @@
+"""
+Entity layer: things that sit on the map (chests, exits, later NPCs and
+traps), kept apart from the terrain grid.
+
+Entities are indexed two ways:
+  - by cell: {(r, c): [entity, ...]} for O(1) "what is at (r, c)"
+  - by bucket: cells grouped into BUCKET x BUCKET squares, so rectangle and
+    radius queries only visit the buckets that overlap the query area
+A cell may hold several entities. The per-kind index is a plain list
+with swap-remove: each entity remembers its slot in it, so add, remove
+and move are O(1) (plus O(cells in one bucket)) at thousands of entities,
+while a fresh floor's layer stays compact.
+
+FloorGrid is the terrain grid (a list of rows, as before) that carries
+its EntityLayer as `.entities`, so existing code that indexes grid[r][c]
+keeps working while objects live in the layer. `.monsters` holds the
+floor's roaming pack when roaming encounters are on (see roaming.py).
+
+Both keep a frozen (tuple) image for snapshots (see rewind.py). The
+layer's image is one tuple per occupied bucket; a change drops only its
+bucket's tuple, so freeze() rebuilds the changed buckets and copies one
+pointer per other bucket. Terrain writes through FloorGrid.set_tile
+replace just that row in the image. Unchanged buckets and rows are shared
+between snapshots, and thaw() rewrites only the ones that differ.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+BUCKET = 8
+
+# Glyph drawn (and dispatched on) for each entity kind
+GLYPHS = {
+    "chest": "C",
+    "exit": "E",
+}
+KINDS = {glyph: kind for kind, glyph in GLYPHS.items()}
+
+Pos = Tuple[int, int]
+
+
+@dataclass(slots=True, eq=False)
+class Entity:
+    kind: str
+    row: int
+    col: int
+    slot: int = field(default=-1, repr=False)   # index in the layer's per-kind list
+
+    @property
+    def glyph(self) -> str:
+        return GLYPHS.get(self.kind, "?")
+
+    @property
+    def pos(self) -> Pos:
+        return (self.row, self.col)
+
+
+class EntityLayer:
+    """Spatially indexed set of entities on one floor."""
+    __slots__ = ("bucket", "_cells", "_buckets", "_by_kind", "_frozen", "_images")
+
+    def __init__(self, bucket: int = BUCKET):
+        self.bucket = bucket
+        self._cells: Dict[Pos, List[Entity]] = {}
+        self._buckets: Dict[Pos, List[Pos]] = {}   # bucket -> occupied cells in it
+        self._by_kind: Dict[str, List[Entity]] = {}
+        self._frozen: Optional[tuple] = None       # cached freeze(); None after a change
+        self._images: Optional[Dict[Pos, tuple]] = None   # bucket -> frozen entries, from the first freeze()
+
+    def _bucket_of(self, r: int, c: int) -> Pos:
+        return (r // self.bucket, c // self.bucket)
+
+    # =========================
+    # Mutation
+    # =========================
+    def add(self, kind: str, r: int, c: int) -> Entity:
+        e = Entity(kind, r, c)
+        self._insert(e)
+        return e
+
+    def _changed(self, pos: Pos) -> None:
+        self._frozen = None
+        if self._images is not None:
+            self._images.pop(self._bucket_of(*pos), None)
+
+    def _insert(self, e: Entity) -> None:
+        pos = (e.row, e.col)
+        self._changed(pos)
+        cell = self._cells.get(pos)
+        if cell is None:
+            self._cells[pos] = [e]
+            self._buckets.setdefault(self._bucket_of(*pos), []).append(pos)
+        else:
+            cell.append(e)
+        same = self._by_kind.setdefault(e.kind, [])
+        e.slot = len(same)
+        same.append(e)
+
+    def _unindex(self, e: Entity) -> None:
+        """Swap-remove e from its per-kind list."""
+        same = self._by_kind[e.kind]
+        last = same.pop()
+        if last is not e:
+            same[e.slot] = last
+            last.slot = e.slot
+        e.slot = -1
+
+    def remove(self, e: Entity) -> None:
+        pos = (e.row, e.col)
+        self._changed(pos)
+        cell = self._cells[pos]
+        cell.remove(e)
+        if not cell:
+            del self._cells[pos]
+            b = self._bucket_of(*pos)
+            cells = self._buckets[b]
+            cells.remove(pos)
+            if not cells:
+                del self._buckets[b]
+        self._unindex(e)
+
+    def move(self, e: Entity, r: int, c: int) -> None:
+        self.remove(e)
+        e.row, e.col = r, c
+        self._insert(e)
+
+    def take(self, r: int, c: int, kind: str) -> Optional[Entity]:
+        """Remove and return the first entity of `kind` at (r, c), if any."""
+        e = self.first(r, c, kind)
+        if e is not None:
+            self.remove(e)
+        return e
+
+    # =========================
+    # Queries
+    # =========================
+    def at(self, r: int, c: int) -> List[Entity]:
+        return self._cells.get((r, c), [])
+
+    def first(self, r: int, c: int, kind: Optional[str] = None) -> Optional[Entity]:
+        for e in self._cells.get((r, c), ()):
+            if kind is None or e.kind == kind:
+                return e
+        return None
+
+    def of_kind(self, kind: str) -> List[Entity]:
+        return list(self._by_kind.get(kind, ()))
+
+    def in_rect(self, r0: int, c0: int, r1: int, c1: int) -> Iterator[Entity]:
+        """Entities with r0 <= row <= r1 and c0 <= col <= c1."""
+        b = self.bucket
+        for br in range(r0 // b, r1 // b + 1):
+            for bc in range(c0 // b, c1 // b + 1):
+                for pos in self._buckets.get((br, bc), ()):
+                    if r0 <= pos[0] <= r1 and c0 <= pos[1] <= c1:
+                        yield from self._cells[pos]
+
+    def in_radius(self, r: int, c: int, radius: float) -> Iterator[Entity]:
+        """Entities within Euclidean distance `radius` of (r, c)."""
+        k = int(radius)
+        r2 = radius * radius
+        for e in self.in_rect(r - k, c - k, r + k, c + k):
+            if (e.row - r) ** 2 + (e.col - c) ** 2 <= r2:
+                yield e
+
+    def top(self) -> Iterator[Tuple[Pos, Entity]]:
+        """(cell, first entity there) for every occupied cell; what gets drawn."""
+        for pos, cell in self._cells.items():
+            yield pos, cell[0]
+
+    def __len__(self) -> int:
+        return sum(len(s) for s in self._by_kind.values())
+
+    def __iter__(self) -> Iterator[Entity]:
+        for cell in self._cells.values():
+            yield from cell
+
+    # =========================
+    # Snapshots
+    # =========================
+    def _bucket_image(self, b: Pos) -> tuple:
+        cells = self._cells
+        return tuple((e.kind, e.row, e.col) for pos in self._buckets[b] for e in cells[pos])
+
+    def freeze(self) -> tuple:
+        """
+        Immutable image ((bucket, ((kind, row, col), ...)), ...); the same object
+        until the layer changes, then only the changed buckets are rebuilt.
+        """
+        if self._frozen is None:
+            images = self._images
+            if images is None:
+                images = self._images = {}
+            for b in self._buckets:
+                if b not in images:
+                    images[b] = self._bucket_image(b)
+            self._frozen = tuple(images.items())
+        return self._frozen
+
+    def thaw(self, frozen: tuple) -> None:
+        """Reset the layer to a freeze() image, rebuilding only buckets that differ."""
+        cur = dict(self.freeze())
+        if frozen is self._frozen:
+            return
+        new = dict(frozen)
+        for b, image in cur.items():
+            if new.get(b) is not image:
+                for pos in self._buckets.pop(b):
+                    for e in self._cells.pop(pos):
+                        self._unindex(e)
+        for b, image in new.items():
+            if cur.get(b) is not image:
+                for kind, r, c in image:
+                    self._insert(Entity(kind, r, c))
+        self._images = new
+        self._frozen = frozen
+
+    # =========================
+    # Serialization
+    # =========================
+    def to_list(self) -> List[dict]:
+        return [{"kind": e.kind, "row": e.row, "col": e.col} for e in self]
+
+    @classmethod
+    def from_list(cls, data: List[dict]) -> "EntityLayer":
+        layer = cls()
+        for d in data:
+            layer.add(str(d["kind"]), int(d["row"]), int(d["col"]))
+        return layer
+
+
+class FloorGrid(list):
+    """Terrain rows plus the floor's entity layer (and roaming monsters / fog of war, if any)."""
+    __slots__ = ("entities", "monsters", "fog", "_frozen")
+
+    def __init__(self, rows=(), entities: Optional[EntityLayer] = None):
+        super().__init__(rows)
+        self.entities = entities if entities is not None else EntityLayer()
+        self.monsters = None
+        self.fog = None
+        self._frozen: Optional[tuple] = None
+
+    def set_tile(self, r: int, c: int, ch: str) -> None:
+        """Change one terrain cell; the frozen image copies that row and the row pointers."""
+        row = self[r]
+        row[c] = ch
+        if self._frozen is not None:
+            f = self._frozen
+            self._frozen = f[:r] + (tuple(row),) + f[r + 1:]
+
+    def freeze(self) -> tuple:
+        """Immutable terrain image (tuple of row tuples), shared until set_tile()."""
+        if self._frozen is None:
+            self._frozen = tuple(tuple(row) for row in self)
+        return self._frozen
+
+    def thaw(self, frozen: tuple) -> None:
+        """Reset the terrain to a freeze() image, rewriting only rows that differ."""
+        cur = self.freeze()
+        if frozen is cur:
+            return
+        for r, (old, new) in enumerate(zip(cur, frozen)):
+            if old is not new:
+                self[r][:] = new
+        self._frozen = frozen
+
+    @classmethod
+    def from_legacy(cls, rows) -> "FloorGrid":
+        """Migrate a grid with objects baked into tiles ('C', 'E') to terrain + entities."""
+        g = cls([list(row) for row in rows])
+        for r, row in enumerate(g):
+            for c, ch in enumerate(row):
+                kind = KINDS.get(ch)
+                if kind is not None:
+                    g.entities.add(kind, r, c)
+                    row[c] = "."
+        return g
+
+
+def layer_of(grid) -> Optional[EntityLayer]:
+    """The grid's entity layer, or None for a plain (legacy) grid."""
+    return getattr(grid, "entities", None)
+
+
+def tile_at(grid, r: int, c: int) -> str:
+    """What stands at (r, c): the glyph of the first entity there, else the terrain tile."""
+    layer = getattr(grid, "entities", None)
+    if layer is not None:
+        e = layer.first(r, c)
+        if e is not None:
+            return e.glyph
+    return grid[r][c]
+
+
+def place(grid, kind: str, r: int, c: int) -> None:
+    """Put an entity on the grid (in its layer, or as a tile on a legacy grid)."""
+    layer = getattr(grid, "entities", None)
+    if layer is not None:
+        layer.add(kind, r, c)
+    else:
+        grid[r][c] = GLYPHS[kind]
+
+
+def take(grid, kind: str, r: int, c: int) -> bool:
+    """Remove an entity of `kind` at (r, c); True if one was there."""
+    layer = getattr(grid, "entities", None)
+    if layer is not None:
+        return layer.take(r, c, kind) is not None
+    if grid[r][c] == GLYPHS[kind]:
+        grid[r][c] = "."
+        return True
+    return False
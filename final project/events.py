@@ -1,33 +1,52 @@
 """
 Chest event handler:
-- When stepping on a chest ('C'), there is a configured chance to spawn a Mimic (elite).
+- When stepping on a chest entity ('C'), there is a configured chance to spawn a Mimic (elite).
 - If not a Mimic, the player chooses:
   1) restore % of HP & SP now, or
   2) gamble for permanent random stat changes (each may backfire).
 Config values are loaded from config.json via config.CFG.
+The battle and the heal/gamble choice are injectable, so headless callers
+(autoplay.py) run these same rules without a terminal.
 """
 
 import random
+from typing import Callable, Optional
+
+import io_port
+import messages
 from config import CFG
-from battle import battle
-from monsters import generate_mimic_monster  
-from battle import wait_for_key, cls
+from monsters import generate_mimic_monster
+from metrics import timed
+from entities import take
+
+# Attributes a chest can change, in the order random.sample draws from.
+BOOST_CANDIDATES = ('hp_max', 'sp_max', 'atk_min', 'atk_max', 'crit_chance')
 
-def chest_event(player, floor: int, grid, r: int, c: int):
+@timed("events.chest_event")
+def chest_event(player, floor: int, grid, r: int, c: int,
+                fight: Optional[Callable] = None, choose: Optional[Callable] = None):
     """
     Resolve an interaction with a chest at (r, c).
+    fight(player, monster) -> "win" | "lose" | "escape" runs the Mimic battle
+    (default: the interactive battle()). choose(player) -> "heal" | "gamble"
+    replaces the prompt; when given, the chest also prints nothing.
     Returns a pair: (message: str, consumed: bool)
-      - consumed=True means the chest tile becomes '.'.
+      - consumed=True means the chest is removed from the floor.
       - consumed=False keeps the chest (e.g., player escaped the Mimic).
     """
     T = CFG["treasure"]
+    show = choose is None
+    if show or fight is None:
+        from battle import battle, cls  # lazy: keeps the terminal stack out of headless imports
+        fight = fight or battle
 
     # 1) Chance to be a Mimic (elite monster)
     if random.random() < float(T["mimic_chance"]):
-        cls()
-        print("The chest was a Mimic!")
+        if show:
+            cls()
+            messages.info("The chest was a Mimic!")
         monster = generate_mimic_monster(floor)
-        outcome = battle(player, monster)   # "win" | "lose" | "escape"
+        outcome = fight(player, monster)   # "win" | "lose" | "escape"
 
         if outcome == "lose":
             return "You were defeated by the Mimic.", False
@@ -38,26 +57,29 @@ def chest_event(player, floor: int, grid, r: int, c: int):
         # Win reward: heal and permanent boosts (bias towards positive)
         player.heal_percent(float(T["heal_rate"]))
         boosts = _roll_permanent_boosts(is_mimic=True)
-        _apply_and_print_boosts(player, boosts)
-        grid[r][c] = '.'
+        _apply_and_print_boosts(player, boosts, show)
+        take(grid, "chest", r, c)
         return "You defeated the Mimic and feel empowered!", True
 
     # 2) Normal chest: give the player a choice
-    cls()
-    print("You found a chest! Choose one:")
-    print(f"1) Restore {int(float(T['heal_rate']) * 100)}% HP & SP now")
-    print("2) Gamble: permanent random stat boosts (each pick may backfire)")
-
-    choice = input("Select [1/2] > ").strip()
-    if choice == "1":
+    if show:
+        cls()
+        messages.info("You found a chest! Choose one:")
+        messages.info("1) Restore {}% HP & SP now", int(float(T['heal_rate']) * 100))
+        messages.info("2) Gamble: permanent random stat boosts (each pick may backfire)")
+        choice = "heal" if io_port.ask("Select [1/2] > ").strip() == "1" else "gamble"
+    else:
+        choice = choose(player)
+
+    if choice == "heal":
         player.heal_percent(float(T["heal_rate"]))
-        grid[r][c] = '.'
+        take(grid, "chest", r, c)
         return "You feel refreshed.", True
 
     # Choice 2: gamble with possible backlash per-attribute
     boosts = _roll_permanent_boosts(is_mimic=False)
-    _apply_and_print_boosts(player, boosts)
-    grid[r][c] = '.'
+    _apply_and_print_boosts(player, boosts, show)
+    take(grid, "chest", r, c)
     return "You opened the chest and accepted its fate.", True
 
 
@@ -73,7 +95,7 @@ def _roll_permanent_boosts(is_mimic: bool) -> dict:
     backfire = float(T["backfire_prob"])
     bias = float(T["mimic_boost_bias"]) if is_mimic else 0.0
 
-    candidates = ['hp_max', 'sp_max', 'atk_min', 'atk_max', 'crit_chance']
+    candidates = list(BOOST_CANDIDATES)
     k = random.randint(kmin, kmax)
     picks = random.sample(candidates, k)
     delta = {}
@@ -111,10 +133,14 @@ def _roll_permanent_boosts(is_mimic: bool) -> dict:
     return delta
 
 
-def _apply_and_print_boosts(player, boosts: dict) -> None:
+def _apply_and_print_boosts(player, boosts: dict, show: bool = True) -> None:
     """Apply boosts to player and print a compact, readable summary."""
+    if not show:
+        player.apply_permanent_boosts(boosts)
+        return
+    from fx import wait_for_key
     if not boosts:
-        print("Nothing happens...")
+        messages.info("Nothing happens...")
         wait_for_key()
         return
 
@@ -125,6 +151,6 @@ def _apply_and_print_boosts(player, boosts: dict) -> None:
             parts.append(f"{k} {'+' if v>=0 else ''}{int(v*100)}%")
         else:
             parts.append(f"{k} {'+' if v>=0 else ''}{v}")
-    print("Permanent change:", ", ".join(parts))
+    messages.info("Permanent change: {}", ", ".join(parts))
     wait_for_key()
 
@@ -0,0 +1,286 @@
+"""
+Floor generator QA: run load_floor + choose_spawn over many seeds and check
+what players rely on.
+
+Invariants per floor (a failure is reported by name):
+  closed_border    the outer ring is wall, so no walk leaves the map
+  perfect_maze     every open cell is connected and the open cells form a tree
+  spawn_walkable   the spawn is an open cell
+  spawn_clear      no entity (chest, exit) on the spawn
+  exit_count       exactly one exit
+  exit_reachable   the exit can be reached from the spawn
+  exit_distance    the exit is at least min_exit_distance steps from the spawn
+  chest_count      as many chests as config "treasure.chest_per_floor"
+  chests_reachable every chest can be reached from the spawn
+
+Quality metrics, collected as histograms:
+  dead_end_pct   share of open cells with a single open neighbour (5% bins)
+  path_len       shortest spawn -> exit walk
+  chest_detour   extra steps to visit each chest on the way, summed
+Neighbour counts are computed over the whole floor at once with
+map/compress over shifted byte strings (C-level loops, no per-cell Python);
+the distances come from two flat-array BFS passes (spawn and exit).
+
+Seeds are sharded over a process pool; each shard returns only its
+histograms, failure counts and the first failing seeds. The failing seeds
+are written as a JSONL regression corpus that recheck() replays.
+
+Usage:
+    python floorqa.py --seeds 1000000 [--start 0] [--workers 4] [--corpus floorqa_corpus.jsonl]
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from array import array
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress
+from operator import add
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from config import CFG
+from world import load_floor, choose_spawn
+
+MIN_EXIT_DISTANCE = 4
+MAX_CORPUS_PER_SHARD = 100
+CORPUS_PATH = "floorqa_corpus.jsonl"
+METRICS = ("dead_end_pct", "path_len", "chest_detour")
+
+Pos = Tuple[int, int]
+
+
+class FloorReport(NamedTuple):
+    seed: int
+    floor: int
+    failures: Tuple[str, ...]
+    dead_end_pct: int            # 5% bin of the dead-end ratio
+    path_len: int                # -1 if the exit is unreachable
+    chest_detour: int            # -1 if a chest or the exit is unreachable
+
+
+def _bfs(open_: bytes, w: int, start: int) -> array:
+    """Flat BFS distances over open cells (-1 = unreachable)."""
+    size = len(open_)
+    dist = array("i", [-1]) * size
+    if not open_[start]:
+        return dist
+    dist[start] = 0
+    dq = deque([start])
+    while dq:
+        cur = dq.popleft()
+        d = dist[cur] + 1
+        for n in (cur - w, cur + w, cur - 1, cur + 1):
+            if 0 <= n < size and open_[n] and dist[n] < 0:
+                dist[n] = d
+                dq.append(n)
+    return dist
+
+
+def _degrees(open_: bytes, w: int) -> List[int]:
+    """Open-neighbour count of every cell, from four shifted copies of the floor."""
+    pad = bytes(w)
+    up, down = pad + open_[:-w], open_[w:] + pad
+    left, right = b"\0" + open_[:-1], open_[1:] + b"\0"
+    return list(map(add, map(add, up, down), map(add, left, right)))
+
+
+def check_floor(grid, spawn: Pos, seed: int = -1, floor: int = 1,
+                min_exit_distance: int = MIN_EXIT_DISTANCE) -> FloorReport:
+    """Check one generated floor (terrain + entity layer) against every invariant."""
+    h, w = len(grid), len(grid[0])
+    open_ = bytes(ch != "#" for row in grid for ch in row)
+    failures = []
+
+    border = open_[:w] + open_[-w:] + bytes(open_[r * w] | open_[r * w + w - 1] for r in range(h))
+    if any(border):
+        failures.append("closed_border")
+
+    sr, sc = spawn
+    s = sr * w + sc
+    from_spawn = _bfs(open_, w, s)
+    n_open = sum(open_)
+    edges = sum(map(min, open_[:-1], open_[1:])) + sum(map(min, open_[:-w], open_[w:]))
+    reached = len(from_spawn) - from_spawn.count(-1)
+    if reached != n_open or edges != n_open - 1:
+        failures.append("perfect_maze")
+    if not open_[s]:
+        failures.append("spawn_walkable")
+
+    layer = grid.entities
+    if layer.first(sr, sc) is not None:
+        failures.append("spawn_clear")
+    exits = layer.of_kind("exit")
+    chests = layer.of_kind("chest")
+    if len(exits) != 1:
+        failures.append("exit_count")
+    if len(chests) != int(CFG["treasure"]["chest_per_floor"]):
+        failures.append("chest_count")
+
+    path_len = detour = -1
+    if exits:
+        e = exits[0].row * w + exits[0].col
+        path_len = from_spawn[e]
+        if path_len < 0:
+            failures.append("exit_reachable")
+        elif path_len < min_exit_distance:
+            failures.append("exit_distance")
+    chest_cells = [c.row * w + c.col for c in chests]
+    if any(from_spawn[c] < 0 for c in chest_cells):
+        failures.append("chests_reachable")
+    elif path_len >= 0:
+        from_exit = _bfs(open_, w, e)
+        detour = sum(from_spawn[c] + from_exit[c] - path_len for c in chest_cells)
+
+    dead = list(compress(_degrees(open_, w), open_)).count(1)
+    dead_end_pct = int(dead * 20 / n_open) * 5 if n_open else 0
+    return FloorReport(seed, floor, tuple(failures), dead_end_pct, path_len, detour)
+
+
+def check_seed(seed: int, floor: int = 1, min_exit_distance: int = MIN_EXIT_DISTANCE) -> FloorReport:
+    """Generate floor `floor` from `seed` exactly as the game does, then check it."""
+    grid = load_floor(floor, seed=seed)
+    spawn = choose_spawn(grid)
+    return check_floor(grid, spawn, seed, floor, min_exit_distance)
+
+
+# =========================
+# Parallel batch
+# =========================
+def _check_shard(args) -> Tuple[int, Dict[str, Counter], Counter, List[dict]]:
+    start, stop, floor, min_exit_distance = args
+    hists = {m: Counter() for m in METRICS}
+    failures: Counter = Counter()
+    corpus: List[dict] = []
+    state = random.getstate()
+    try:
+        for seed in range(start, stop):
+            rep = check_seed(seed, floor, min_exit_distance)
+            hists["dead_end_pct"][rep.dead_end_pct] += 1
+            hists["path_len"][rep.path_len] += 1
+            hists["chest_detour"][rep.chest_detour] += 1
+            if rep.failures:
+                failures.update(rep.failures)
+                if len(corpus) < MAX_CORPUS_PER_SHARD:
+                    corpus.append(_corpus_entry(rep))
+    finally:
+        random.setstate(state)
+    return stop - start, hists, failures, corpus
+
+
+def _corpus_entry(rep: FloorReport) -> dict:
+    return {"seed": rep.seed, "floor": rep.floor, "generator": CFG["world"]["generator"],
+            "failures": list(rep.failures)}
+
+
+def run_batch(seeds: int, start: int = 0, floor: int = 1, workers: Optional[int] = None,
+              min_exit_distance: int = MIN_EXIT_DISTANCE) -> Dict:
+    """Check seeds [start, start + seeds) across a process pool and merge the results."""
+    workers = workers or os.cpu_count() or 1
+    shards = max(1, min(seeds, workers * 8))
+    jobs = [(start + seeds * k // shards, start + seeds * (k + 1) // shards, floor, min_exit_distance)
+            for k in range(shards)]
+    jobs = [j for j in jobs if j[1] > j[0]]
+    t0 = time.perf_counter()
+    if workers == 1:
+        results = [_check_shard(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_check_shard, jobs))
+    elapsed = time.perf_counter() - t0
+
+    hists = {m: Counter() for m in METRICS}
+    failures: Counter = Counter()
+    corpus: List[dict] = []
+    for _n, h, f, c in results:
+        for m in METRICS:
+            hists[m].update(h[m])
+        failures.update(f)
+        corpus.extend(c)
+    corpus.sort(key=lambda e: e["seed"])
+    return {
+        "seeds": seeds,
+        "start": start,
+        "floor": floor,
+        "workers": workers,
+        "elapsed_s": elapsed,
+        "seeds_per_s": seeds / elapsed if elapsed else 0.0,
+        "failures": dict(failures),
+        "failing_seeds": corpus,
+        "histograms": {m: dict(sorted(hists[m].items())) for m in METRICS},
+    }
+
+
+# =========================
+# Regression corpus
+# =========================
+def write_corpus(entries: Iterable[dict], path: str = CORPUS_PATH) -> str:
+    """Append failing seeds to a JSONL corpus (one {"seed", "floor", ...} per line)."""
+    with open(path, "a", encoding="utf-8") as f:
+        for e in entries:
+            f.write(json.dumps(e) + "\n")
+    return path
+
+
+def load_corpus(path: str = CORPUS_PATH) -> List[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def recheck(path: str = CORPUS_PATH, min_exit_distance: int = MIN_EXIT_DISTANCE) -> List[FloorReport]:
+    """Replay a corpus; returns the reports of seeds that still fail."""
+    still = []
+    for e in load_corpus(path):
+        rep = check_seed(int(e["seed"]), int(e.get("floor", 1)), min_exit_distance)
+        if rep.failures:
+            still.append(rep)
+    return still
+
+
+def format_summary(s: Dict) -> str:
+    lines = [f"{s['seeds']} seeds (floor {s['floor']}) on {s['workers']} workers in "
+             f"{s['elapsed_s']:.2f}s ({s['seeds_per_s']:.0f} seeds/s)"]
+    if s["failures"]:
+        lines.append("failures: " + ", ".join(f"{k}={v}" for k, v in sorted(s["failures"].items())))
+    else:
+        lines.append("failures: none")
+    for m in METRICS:
+        hist = s["histograms"][m]
+        total = sum(hist.values()) or 1
+        lines.append(f"{m}:")
+        for value, n in hist.items():
+            bar = "#" * max(1, round(40 * n / total)) if n else ""
+            lines.append(f"  {value:>5} {n:>9} {bar}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Floor generator QA over many seeds")
+    ap.add_argument("--seeds", type=int, default=10000)
+    ap.add_argument("--start", type=int, default=0)
+    ap.add_argument("--floor", type=int, default=1)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--min-exit-distance", type=int, default=MIN_EXIT_DISTANCE)
+    ap.add_argument("--corpus", default=CORPUS_PATH, help="JSONL file to append failing seeds to")
+    ap.add_argument("--recheck", action="store_true", help="replay --corpus instead of a new batch")
+    args = ap.parse_args(argv)
+
+    if args.recheck:
+        still = recheck(args.corpus, args.min_exit_distance)
+        for rep in still:
+            print(f"seed {rep.seed} floor {rep.floor}: {', '.join(rep.failures)}")
+        print(f"{len(still)} corpus seed(s) still failing")
+        return 1 if still else 0
+
+    summary = run_batch(args.seeds, args.start, args.floor, args.workers, args.min_exit_distance)
+    print(format_summary(summary))
+    if summary["failing_seeds"]:
+        print(f"Failing seeds written: {write_corpus(summary['failing_seeds'], args.corpus)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
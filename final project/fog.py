@@ -0,0 +1,160 @@
+"""
+Fog of war: what the player has seen of each floor.
+
+A cell is visible when it lies within `radius` of the player (Euclidean)
+and no wall stands on the straight line between them (Bresenham). The
+rays are precomputed per radius as offsets, so a move costs the cells of
+one disk around the player, never the whole floor; only the cells whose
+state changes are written:
+  - newly seen cells are marked in the explored bitmap and copied from
+    the terrain into `view`, the map as the player remembers it,
+  - `visible` is swapped for the new set.
+Unexplored cells show as FOG_GLYPH. Entities (chest, exit) show once
+their cell has been explored, roaming monsters only while in sight; see
+world.compose_rows.
+
+Exploring happens on the movement path, not while drawing: look() is
+called by world.try_move after each step and by the game loop whenever
+the player is placed (spawn, new floor, escape, rewind, load), so a
+session with no visible output explores the same. compose_rows only
+reads the fog.
+
+Each FloorGrid carries its own Fog (grid.fog), so rewinding across a
+staircase keeps each floor's memory. Saves store the explored bitmap
+packed 8 cells per byte (pack_bits / unpack_bits).
+
+Config: "world": {"fog": true, "fog_radius": 3}.
+"""
+
+import base64
+from functools import lru_cache
+from itertools import compress
+from typing import List, Optional, Set, Tuple
+
+from config import CFG
+
+FOG_GLYPH = " "
+WALL = "#"
+
+Ray = Tuple[int, int, Tuple[Tuple[int, int], ...]]
+
+
+def _line(dr: int, dc: int) -> List[Tuple[int, int]]:
+    """Bresenham cells from (0, 0) to (dr, dc), both ends excluded."""
+    cells = []
+    n = max(abs(dr), abs(dc))
+    for k in range(1, n):
+        cells.append((round(dr * k / n), round(dc * k / n)))
+    return cells
+
+
+@lru_cache(maxsize=8)
+def sight_table(radius: int) -> Tuple[Ray, ...]:
+    """(dr, dc, cells in between) for every offset within `radius`, nearest first."""
+    rays = []
+    for dr in range(-radius, radius + 1):
+        for dc in range(-radius, radius + 1):
+            if dr * dr + dc * dc <= radius * radius:
+                rays.append((dr, dc, tuple(_line(dr, dc))))
+    rays.sort(key=lambda ray: ray[0] * ray[0] + ray[1] * ray[1])
+    return tuple(rays)
+
+
+def pack_bits(flags) -> bytes:
+    """0/1 bytes -> bitmap, 8 cells per byte (cell i is bit i % 8 of byte i // 8)."""
+    out = bytearray((len(flags) + 7) // 8)
+    for i in compress(range(len(flags)), flags):
+        out[i >> 3] |= 1 << (i & 7)
+    return bytes(out)
+
+
+def unpack_bits(data: bytes, n: int) -> bytearray:
+    return bytearray((b >> k) & 1 for b in data for k in range(8))[:n]
+
+
+class Fog:
+    """Explored bitmap, current visible set and remembered view of one floor."""
+    __slots__ = ("h", "w", "radius", "explored", "visible", "view", "origin")
+
+    def __init__(self, h: int, w: int, radius: int, explored: Optional[bytearray] = None):
+        self.h, self.w, self.radius = h, w, radius
+        self.explored = explored if explored is not None else bytearray(h * w)
+        self.visible: Set[int] = set()
+        self.view: List[List[str]] = [[FOG_GLYPH] * w for _ in range(h)]
+        self.origin: Optional[Tuple[int, int]] = None
+
+    def visible_from(self, grid, r: int, c: int) -> Set[int]:
+        """Flat indices of the cells in sight from (r, c)."""
+        h, w = self.h, self.w
+        seen = set()
+        for dr, dc, between in sight_table(self.radius):
+            rr, cc = r + dr, c + dc
+            if 0 <= rr < h and 0 <= cc < w:
+                for br, bc in between:
+                    if grid[r + br][c + bc] == WALL:
+                        break
+                else:
+                    seen.add(rr * w + cc)
+        return seen
+
+    def update(self, grid, r: int, c: int) -> List[int]:
+        """Look from (r, c); returns the cells seen for the first time (already drawn into view)."""
+        if self.origin == (r, c):
+            return []
+        now = self.visible_from(grid, r, c)
+        w, explored, view = self.w, self.explored, self.view
+        fresh = []
+        for i in now - self.visible:
+            if not explored[i]:
+                explored[i] = 1
+                fresh.append(i)
+            row, col = divmod(i, w)
+            if view[row][col] == FOG_GLYPH:
+                view[row][col] = grid[row][col]
+        self.visible = now
+        self.origin = (r, c)
+        return fresh
+
+    def is_explored(self, r: int, c: int) -> bool:
+        return bool(self.explored[r * self.w + c])
+
+    def is_visible(self, r: int, c: int) -> bool:
+        return r * self.w + c in self.visible
+
+    # ---- saves ----
+    def to_dict(self) -> dict:
+        return {"radius": self.radius,
+                "explored": base64.b64encode(pack_bits(self.explored)).decode("ascii")}
+
+    @classmethod
+    def from_dict(cls, data: dict, grid) -> "Fog":
+        """Rebuild a saved fog for `grid`; the remembered view is redrawn from the terrain."""
+        h, w = len(grid), len(grid[0])
+        explored = unpack_bits(base64.b64decode(data["explored"]), h * w)
+        fog = cls(h, w, int(data.get("radius", fog_radius())), explored)
+        for i in compress(range(h * w), explored):
+            r, c = divmod(i, w)
+            fog.view[r][c] = grid[r][c]
+        return fog
+
+
+def fog_enabled() -> bool:
+    return bool(CFG["world"]["fog"])
+
+
+def fog_radius() -> int:
+    return int(CFG["world"]["fog_radius"])
+
+
+def fog_of(grid) -> Optional[Fog]:
+    """The grid's Fog, created on first use when fog is on; None if off or for plain grids."""
+    fog = getattr(grid, "fog", None)
+    if fog is None and hasattr(grid, "fog") and fog_enabled():
+        fog = grid.fog = Fog(len(grid), len(grid[0]), fog_radius())
+    return fog
+
+
+def look(grid, r: int, c: int) -> List[int]:
+    """Explore from (r, c) on the grid's fog (a no-op with fog off); returns the newly explored cells."""
+    fog = fog_of(grid)
+    return fog.update(grid, r, c) if fog is not None else []
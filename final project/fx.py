@@ -0,0 +1,79 @@
+"""
+Terminal FX helpers (visual effects for battles).
+colorama is imported and initialized lazily on first use, so headless
+code that never renders does not pay for the terminal stack.
+"""
+
+import random
+
+import io_port
+import messages
+
+_COLORS = None  # (Fore, Style) once loaded; False if colorama is unavailable
+
+
+def _colors():
+    """Import and initialize colorama on first call; cache the result."""
+    global _COLORS
+    if _COLORS is None:
+        try:
+            from colorama import init, Fore, Style
+            init()
+            _COLORS = (Fore, Style)
+        except Exception:
+            _COLORS = False
+    return _COLORS
+
+
+def has_color() -> bool:
+    """True when colored output is available."""
+    return bool(_colors())
+
+
+def colorize(text: str, color: str) -> str:
+    """Wrap text in a bright colorama color (e.g. "YELLOW"); plain text without colorama."""
+    c = _colors()
+    if not c:
+        return text
+    Fore, Style = c
+    return getattr(Fore, color) + Style.BRIGHT + text + Style.RESET_ALL
+
+
+def cls():
+    """Clear the console screen (Windows/Linux/Mac)."""
+    io_port.clear()
+
+def typeout(text: str, delay: float = 0.012):
+    """Typewriter effect for tension."""
+    for ch in text:
+        messages.info(ch, end="")
+        io_port.pause(delay)
+    messages.info("")
+
+def flash_banner(text: str):
+    """Big highlighted banner (critical, warnings, etc.)."""
+    line = "=" * max(24, len(text) + 6)
+    messages.info(colorize, line, "YELLOW")
+    messages.info(colorize, f"   {text}   ", "RED")
+    messages.info(colorize, line, "YELLOW")
+
+def hit_stop(duration: float = 0.08):
+    """Short pause to sell impact."""
+    io_port.pause(duration)
+
+def screen_shake(frames: int = 6, spread: int = 6, message: str = "!!! CRITICAL HIT !!!"):
+    """Clear-screen shake with random horizontal jitter."""
+    for _ in range(frames):
+        cls()
+        offset = " " * random.randint(0, spread)
+        messages.info(offset + colorize(message, "RED"))
+        io_port.pause(0.045)
+
+def wait_for_key(msg: str = "Press Enter to continue..."):
+    """Keep FX on screen until player confirms."""
+    prompt = msg
+    c = _colors()
+    if c:
+        Fore, Style = c
+        prompt = Fore.CYAN + msg + Style.RESET_ALL
+    io_port.wait("\n" + prompt)
@@ -0,0 +1,33 @@
+"""
+Headless entry point: the game rules without the terminal stack.
+Simulators and worker processes should import from here; nothing in
+this module pulls in fx/colorama or the interactive battle loop, and
+config.json is only read when CFG is first used.
+"""
+
+from config import CFG, load_config
+from skills import Skill, all_skills
+from models import Player
+from monsters import Monster, templates, generate_monster, generate_mimic_monster
+from world import load_floor, choose_spawn, try_move, CHEST_TILE, DIRS, MAP_W, MAP_H
+from entities import Entity, EntityLayer, FloorGrid, tile_at
+from combat import resolve_battle, BattleResult, default_policy, attack_policy, exp_reward
+
+__all__ = [
+    "CFG", "load_config",
+    "Skill", "all_skills", "ALL_SKILLS",
+    "Player",
+    "Monster", "templates", "MONSTER_DB", "generate_monster", "generate_mimic_monster",
+    "load_floor", "choose_spawn", "try_move", "CHEST_TILE", "DIRS", "MAP_W", "MAP_H",
+    "Entity", "EntityLayer", "FloorGrid", "tile_at",
+    "resolve_battle", "BattleResult", "default_policy", "attack_policy", "exp_reward",
+]
+
+
+def __getattr__(name: str):
+    # the content packs are only loaded when these are first used
+    if name == "ALL_SKILLS":
+        return all_skills()
+    if name == "MONSTER_DB":
+        return templates()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
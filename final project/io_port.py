@@ -0,0 +1,123 @@
+"""
+Console I/O port: everything the game reads from or does to the terminal
+besides printing (which goes through messages).
+
+    io_port.ask(prompt)   a line of input
+    io_port.wait(prompt)  "press Enter to continue"
+    io_port.clear()       clear the screen
+    io_port.pause(s)      sleep for effect (FX timing)
+
+The active Port lives in a ContextVar, like the messages session, so a
+caller can run the unmodified game flow against another port:
+    with io_port.use(ScriptPort(["n", "ddd", "q"])):
+        main.game_loop()
+TerminalPort (the default) looks builtins.input / time.sleep up on each
+call, so tests that patch those keep working. ScriptPort answers prompts
+from a list of lines, never sleeps, clears or waits, and raises EOFError
+when the script runs out.
+"""
+
+import builtins
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable, Iterator, List, Optional
+
+import messages
+
+
+class Port:
+    raw_keys = False  # may keys.read_command() switch the terminal to single-key mode?
+
+    def ask(self, prompt: str = "") -> str:
+        raise NotImplementedError
+
+    def wait(self, prompt: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def pause(self, seconds: float) -> None:
+        pass
+
+
+class TerminalPort(Port):
+    raw_keys = True
+
+    def ask(self, prompt: str = "") -> str:
+        return builtins.input(prompt)
+
+    def wait(self, prompt: str) -> None:
+        try:
+            builtins.input(prompt)
+        except EOFError:
+            time.sleep(0.6)
+
+    def clear(self) -> None:
+        os.system("cls" if os.name == "nt" else "clear")
+
+    def pause(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+
+class ScriptPort(Port):
+    """
+    Answers prompts from `lines` in order. Each prompt and answer is echoed
+    to the messages session, so a captured transcript reads like the
+    terminal would. EOFError once the script is used up.
+    """
+
+    def __init__(self, lines: Iterable[str], echo: bool = True):
+        self._lines: Iterator[str] = iter(lines)
+        self.echo = echo
+        self.asked = 0
+
+    def ask(self, prompt: str = "") -> str:
+        line = next(self._lines, None)
+        if line is None:
+            raise EOFError("script exhausted")
+        self.asked += 1
+        if self.echo:
+            messages.info("{}{}", prompt, line)
+        return line
+
+
+def read_script(text: str) -> List[str]:
+    """Script text -> answer lines; blank lines are answers too, "#" starts a comment line."""
+    return [line for line in text.splitlines() if not line.lstrip().startswith("#")]
+
+
+_current: ContextVar[Optional[Port]] = ContextVar("drpg_io_port", default=None)
+_terminal = TerminalPort()
+
+
+def current() -> Port:
+    return _current.get() or _terminal
+
+
+@contextmanager
+def use(port: Port) -> Iterator[Port]:
+    """Route game I/O in this context (thread / task) through `port`."""
+    token = _current.set(port)
+    try:
+        yield port
+    finally:
+        _current.reset(token)
+
+
+def ask(prompt: str = "") -> str:
+    return current().ask(prompt)
+
+
+def wait(prompt: str) -> None:
+    current().wait(prompt)
+
+
+def clear() -> None:
+    current().clear()
+
+
+def pause(seconds: float) -> None:
+    current().pause(seconds)
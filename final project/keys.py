@@ -0,0 +1,93 @@
+"""
+Keyboard input for the exploration loop.
+
+On a terminal, read_command() switches stdin to cbreak (POSIX termios) or
+uses msvcrt (Windows) to read a single keystroke without Enter, then
+drains whatever else was typed ahead, so "dddwws" typed quickly arrives
+as one command string. Anywhere else (pipes, tests, IDE consoles,
+scripted ports) it reads a line through io_port.ask(), where a whole
+line like "dddwws" is a batch too.
+
+Set "input": {"raw_keys": false} in config.json to always read lines.
+"""
+
+import os
+import sys
+from typing import Iterable, List
+
+import io_port
+import messages
+
+
+def raw_available() -> bool:
+    """True if stdin is a terminal we know how to put in single-key mode."""
+    try:
+        if not sys.stdin.isatty():
+            return False
+    except (AttributeError, ValueError):
+        return False
+    if os.name == "nt":
+        try:
+            import msvcrt  # noqa: F401
+            return True
+        except ImportError:
+            return False
+    try:
+        import termios, tty  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _read_raw_posix() -> str:
+    import select
+    import termios
+    import tty
+    fd = sys.stdin.fileno()
+    old = termios.tcgetattr(fd)
+    try:
+        tty.setcbreak(fd, termios.TCSANOW)    # no line buffering, no echo; Ctrl-C still works;
+                                              # TCSANOW keeps keys typed before the prompt
+        chunks = [os.read(fd, 1)]
+        while select.select([fd], [], [], 0)[0]:
+            chunks.append(os.read(fd, 64))    # typed-ahead keys
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old)
+    return b"".join(chunks).decode("utf-8", errors="ignore")
+
+
+def _read_raw_windows() -> str:
+    import msvcrt
+    keys = [msvcrt.getwch()]
+    while msvcrt.kbhit():
+        keys.append(msvcrt.getwch())
+    return "".join(keys)
+
+
+def read_command(prompt: str, raw: bool = True) -> str:
+    """
+    One command string, lower-cased, without whitespace or Enter.
+    With raw=True and a real terminal: the first keystroke plus typed-ahead keys.
+    """
+    if raw and io_port.current().raw_keys and raw_available():
+        messages.info(prompt, end="")
+        keys = _read_raw_windows() if os.name == "nt" else _read_raw_posix()
+        if "\x03" in keys:
+            raise KeyboardInterrupt
+        if "\x04" in keys:
+            raise EOFError
+        cmd = "".join(keys.split()).lower()
+        messages.info(cmd)                    # echo what was read
+        return cmd
+    return io_port.ask(prompt).strip().lower()
+
+
+def split_moves(cmd: str, moves: Iterable[str]) -> List[str]:
+    """
+    The keys of a pure movement batch ("dddwws" -> ['d','d','d','w','w','s']),
+    or [cmd] unchanged for anything else, so other commands keep their meaning.
+    """
+    moves = set(moves)
+    if len(cmd) > 1 and all(ch in moves for ch in cmd):
+        return list(cmd)
+    return [cmd]
@@ -1,23 +1,33 @@
-import random
-
+import argparse
+import atexit
+from functools import partial
+
+import io_port
+import memtrace
+import messages
+import metrics
+from config import CFG
+from fog import look
+from keys import read_command, split_moves
 from save_load import save_game, load_game, has_save, delete_save
 from models import Player
-from world import load_floor, render, try_move, choose_spawn
-from events import chest_event
-from world import CHEST_TILE
-from monsters import generate_monster
-from battle import battle  # returns: "win" | "lose" | "escape"
-from battle import wait_for_key
+from world import load_floor, render, try_move, choose_spawn, DIRS
+from tiles import TileContext, resolve_step, configure_encounters  # chest/exit handlers + encounter policy
+from battle import battle, wait_for_key
+from rewind import History
+from sampler import Sampler, profile_path
 
 
 
-def game_loop():
+def game_loop(hub=None):
     """
     Main game loop for the DRPG.
     - Starts on floor 1
     - Player explores the dungeon until reaching the exit
     - Game ends after clearing the final floor
     - Save/Load support
+    - hub: a broadcast.BroadcastHub to stream the session to spectators
+    Returns the final TileContext (batch.py reads the outcome from it).
     """
     # --- Start menu: New vs Load ---
     floor = 1
@@ -29,10 +39,10 @@ def game_loop():
 
         # Save files exist
         if has_save():
-            print("Save found. Choose:")
-            print("[C] Continue (load save)")
-            print("[N] New Game (overwrite existing save)")
-            choice = input("> ").strip().lower()
+            messages.info("Save found. Choose:")
+            messages.info("[C] Continue (load save)")
+            messages.info("[N] New Game (overwrite existing save)")
+            choice = io_port.ask("> ").strip().lower()
 
             if choice == "c":
                 loaded = load_game()
@@ -41,7 +51,7 @@ def game_loop():
                     tip = "Save loaded."
                     is_stopped = True
                 else:
-                    print("Failed to load save. Starting a new game...")
+                    messages.info("Failed to load save. Starting a new game...")
                     delete_save()  # prevent dirty save files
                     grid = load_floor(floor)
                     player = Player(row=1, col=1)
@@ -58,11 +68,11 @@ def game_loop():
                 tip = "Enter the dungeon... Find 'E' to reach the next floor."
                 is_stopped = True
             else:
-                print('Invalid Input.')
+                messages.info('Invalid Input.')
 
         else:
-            print()
-            print('No save file found, automatically starting a new game')
+            messages.info("")
+            messages.info('No save file found, automatically starting a new game')
             wait_for_key()
             grid = load_floor(floor)
             player = Player(row=1, col=1)
@@ -72,81 +82,107 @@ def game_loop():
 
    
 
-    while True:
-        # Render map and player status
-        render(grid, player, floor, tip)
-
-        # Get player input
-        cmd = input("Command (WASD to move, Q to quit, L to learn the legend, T to save) > ").strip().lower()
+    configure_encounters()
+    ctx = TileContext(player=player, floor=floor, grid=grid, tip=tip)
+    memtrace.mark("floor_start", ctx.floor)
+    history = History()
+    history.record(ctx)
+
+    def on_battle_turn(_p, _m):
+        history.record(ctx, kind="battle")
+        if hub is not None:
+            hub.publish(ctx.grid, ctx.player, ctx.floor, ctx.tip)
+
+    ctx.fight = partial(battle, on_turn=on_battle_turn)
+    raw = bool(CFG["input"]["raw_keys"])
+
+    while not ctx.game_over:
+        # Explore from wherever the player now stands (spawn, new floor, escape, rewind), then render
+        look(ctx.grid, ctx.player.row, ctx.player.col)
+        render(ctx.grid, ctx.player, ctx.floor, ctx.tip)
+        if hub is not None:
+            hub.publish(ctx.grid, ctx.player, ctx.floor, ctx.tip)
+
+        # Get player input (single keystroke on a terminal; "dddwws" queues several moves)
+        cmd = read_command("Command (WASD to move, Q to quit, L to learn the legend, T to save, U/U3 to rewind) > ", raw)
         if cmd == "q":
-            print("You have quit the game. Goodbye!")
+            messages.info("You have quit the game. Goodbye!")
             break
 
         if cmd == 'l':
-            print()
-            print("#: Wall, you cannot pass the wall")
-            print(".: Road, you can just walk on the road.")
-            print("@: You, this is your location.")
-            print("E: Entrance, you have to go to there(goal).")
-            print("C: Treasure Chest, you can get reward or other things...?")
+            messages.info("")
+            messages.info("#: Wall, you cannot pass the wall")
+            messages.info(".: Road, you can just walk on the road.")
+            messages.info("@: You, this is your location.")
+            messages.info("E: Entrance, you have to go to there(goal).")
+            messages.info("C: Treasure Chest, you can get reward or other things...?")
+            messages.info("M: Monster, it wanders and chases you when you come close.")
             wait_for_key()
             continue
 
+        if cmd == "u" or (cmd.startswith("u") and cmd[1:].isdigit()):
+            n = history.rewind(ctx, int(cmd[1:] or 1))
+            ctx.tip = f"Rewound {n} turn(s)." if n else "Nothing to rewind."
+            continue
+
         if cmd == "t":
-            print()
-            save_game(player, floor, grid)
-            tip = "Game saved."
+            messages.info("")
+            save_game(ctx.player, ctx.floor, ctx.grid)
+            ctx.tip = "Game saved."
             wait_for_key()
             continue
-        # Attempt to move (remember previous position for potential escape)
-        prev_row, prev_col = player.row, player.col
-        moved, tip, at_exit = try_move(grid, player, cmd)
-        if not moved:
-            continue  # Invalid move, render again
-
-        # After a successful move:
-        tile = grid[player.row][player.col]
-
-        # If standing on a chest, resolve chest event first.
-        if tile == CHEST_TILE:
-            tip_msg, consumed = chest_event(player, floor, grid, player.row, player.col)
-            tip = tip_msg
-            # chest_event turns the tile into '.' when consumed.
-            # Skip random encounter & exit check this turn to avoid double events.
-            continue
-
-
-        # -------------------------
-        # Random encounter trigger
-        # -------------------------
-        if random.random() < 0.25:  # 25% chance after each move
-            monster = generate_monster(floor)
-            outcome = battle(player, monster)  # "win" | "lose" | "escape"
-
-            if outcome == "lose":
-                print("Game Over. Thanks for playing!")
+        # Apply the move(s); a batch renders once, and stops at a wall or any event
+        for key in split_moves(cmd, DIRS):
+            # Attempt to move (remember previous position for potential escape)
+            ctx.prev_pos = (ctx.player.row, ctx.player.col)
+            moved, ctx.tip, _at_exit = try_move(ctx.grid, ctx.player, key)
+            if not moved:
+                break  # Invalid move, render again
+
+            # After a successful move: chest / encounter / exit, via the tile registry
+            eventful = resolve_step(ctx)
+            if not ctx.game_over:
+                history.record(ctx)
+            if eventful or ctx.game_over:
                 break
 
-            if outcome == "escape":
-                # Do not consume the step: revert to previous tile
-                player.row, player.col = prev_row, prev_col
-                tip = "You escaped and returned to your previous position."
-                # Skip exit check this turn
-                continue
+    if ctx.cleared:
+        messages.info("Congratulations! You have reached the final exit. Victory!")
+    elif not ctx.player.is_alive():
+        messages.info("Game Over. Thanks for playing!")
+    memtrace.mark("session_end", ctx.floor)
+    return ctx
 
-            # outcome == "win"
-            tip = "You won the battle."
+def _parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="DRPG battle system")
+    ap.add_argument("--profile", action="store_true",
+                    help="sample the session and write a collapsed-stack profile on exit")
+    ap.add_argument("--broadcast", type=int, metavar="PORT", default=None,
+                    help="stream the session to spectators on this local port (see broadcast.py)")
+    return ap.parse_args(argv)
 
-        # Check if player reached the exit (only if we didn't escape)
-        if at_exit:
-            if floor < 5:
-                floor += 1
-                grid = load_floor(floor)
-                player.row, player.col = choose_spawn(grid)
-                tip = f"You have entered Floor {floor}."
-            else:
-                print("Congratulations! You have reached the final exit. Victory!")
-                break
 
 if __name__ == "__main__":
-    game_loop()
+    args = _parse_args()
+    if metrics.enabled():
+        # DRPG_METRICS=1: dump on SIGUSR1 and once more at exit
+        metrics.install_signal_dump()
+        atexit.register(metrics.write_reports)
+    prof = Sampler().start() if args.profile else None
+    hub = None
+    if args.broadcast is not None:
+        from broadcast import BroadcastHub, BroadcastSink
+        hub = BroadcastHub(port=args.broadcast)
+        messages.current().add(BroadcastSink(hub))
+        messages.info("[broadcast] Spectators: python broadcast.py --port {}", hub.address[1])
+    try:
+        game_loop(hub)
+    finally:
+        if hub is not None:
+            hub.close()
+        if prof is not None:
+            prof.stop()
+            messages.info("[profile] collapsed stacks written to {}", prof.write_collapsed(profile_path('main')))
+            messages.info(prof.format_summary())
+    if memtrace.enabled():
+        messages.info("[memtrace] report written to {}", memtrace.write_report())
\ No newline at end of file
@@ -0,0 +1,203 @@
+"""
+Opt-in memory accounting with tracemalloc.
+
+Enable with DRPG_MEMTRACE=1 (or memtrace.start()). The game loop marks
+floor transitions and battle boundaries; each mark takes a tracemalloc
+snapshot and attributes the live allocations to subsystems by the game
+function that made them (e.g. world._carve_maze -> "grid"). The report
+has peak and retained bytes per floor and for the whole session.
+
+Disabled, mark() is a single None check.
+"""
+
+import ast
+import os
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+NFRAMES = 8
+
+# Friendly subsystem names for the functions that own most memory.
+SUBSYSTEMS = {
+    "world._blank_grid": "grid",
+    "world._carve_maze": "grid",
+    "world.iter_eller_rows": "grid",
+    "world.carve_maze_eller": "grid",
+    "world.load_floor": "grid",
+    "world._distances_from": "bfs_dist",
+    "world._farthest_from": "bfs_dist",
+    "world._random_free_cell": "spawn",
+    "world._place_exit_on_edge": "spawn",
+    "world._place_chests": "chests",
+    "world.render": "render",
+    "save_load.save_game": "save",
+    "save_load.load_game": "save",
+}
+# Fallback by module when the function is not listed above
+MODULE_SUBSYSTEMS = {
+    "models": "player",
+    "skills": "player",
+    "monsters": "monsters",
+    "battle": "battle",
+    "combat": "battle",
+    "events": "chests",
+    "save_load": "save",
+    "world": "world",
+    "entities": "entities",
+    "main": "session",
+    "tiles": "session",
+}
+
+_func_index: Dict[str, List[Tuple[int, int, str]]] = {}
+
+
+def _functions_in(path: str) -> List[Tuple[int, int, str]]:
+    """(first line, last line, qualname) of every function in a source file, innermost last."""
+    if path not in _func_index:
+        spans = []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                tree = ast.parse(f.read())
+        except (OSError, SyntaxError):
+            tree = None
+
+        def walk(node, prefix):
+            for child in ast.iter_child_nodes(node):
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    name = prefix + child.name
+                    if not isinstance(child, ast.ClassDef):
+                        spans.append((child.lineno, child.end_lineno, name))
+                    walk(child, name + ".")
+        if tree is not None:
+            walk(tree, "")
+        _func_index[path] = spans
+    return _func_index[path]
+
+
+def attribute(frame_file: str, lineno: int) -> Optional[str]:
+    """'module.function' for a frame inside the game sources, else None."""
+    if not frame_file.startswith(HERE) or os.sep + "tests" + os.sep in frame_file:
+        return None
+    module = os.path.splitext(os.path.basename(frame_file))[0]
+    if module == "memtrace":
+        return None  # the accountant's own bookkeeping
+    best = None
+    for first, last, name in _functions_in(frame_file):
+        if first <= lineno <= last:
+            best = name  # later spans are nested deeper
+    return f"{module}.{best}" if best else f"{module}.<module>"
+
+
+def subsystem(func: str) -> str:
+    if func in SUBSYSTEMS:
+        return SUBSYSTEMS[func]
+    if func.endswith(".<module>"):
+        return "imports"  # module-level code: import-time tables and constants
+    return MODULE_SUBSYSTEMS.get(func.split(".", 1)[0], "other")
+
+
+class MemoryAccountant:
+    """Collects per-floor peak/retained bytes and per-subsystem attribution."""
+
+    def __init__(self):
+        self.floors: Dict[int, dict] = {}
+        self.marks: List[dict] = []
+        self.session_peak = 0
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(NFRAMES)
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+
+    def by_subsystem(self) -> Dict[str, Dict[str, int]]:
+        """Live bytes by subsystem and by function, from a fresh snapshot."""
+        snap = tracemalloc.take_snapshot()
+        subs: Dict[str, int] = {}
+        funcs: Dict[str, int] = {}
+        for stat in snap.statistics("traceback"):
+            owner = None
+            for frame in reversed(stat.traceback):  # most recent call first
+                owner = attribute(frame.filename, frame.lineno)
+                if owner:
+                    break
+            if owner is None:
+                continue
+            funcs[owner] = funcs.get(owner, 0) + stat.size
+            key = subsystem(owner)
+            subs[key] = subs.get(key, 0) + stat.size
+        return {"subsystems": subs, "functions": funcs}
+
+    def mark(self, event: str, floor: int) -> None:
+        """Record a boundary: floor_start / floor_end / battle_start / battle_end / session_end."""
+        current, peak = tracemalloc.get_traced_memory()
+        fl = self.floors.setdefault(floor, {"peak": 0, "retained": 0, "battles": 0})
+        fl["peak"] = max(fl["peak"], peak)
+        self.session_peak = max(self.session_peak, peak)
+        attribution = self.by_subsystem()
+        if event == "battle_start":
+            fl["battles"] += 1
+        # retained = live bytes at the latest boundary seen on this floor
+        fl["retained"] = current
+        fl["subsystems"] = attribution["subsystems"]
+        self.marks.append({"event": event, "floor": floor, "current": current, "peak": peak,
+                           "subsystems": attribution["subsystems"]})
+        if event in ("floor_start", "floor_end"):
+            tracemalloc.reset_peak()  # peaks are tracked per floor
+
+    def report(self) -> dict:
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        top = {}
+        if tracemalloc.is_tracing():
+            funcs = self.by_subsystem()["functions"]
+            top = dict(sorted(funcs.items(), key=lambda kv: -kv[1])[:10])
+        return {
+            "session": {"peak": max(self.session_peak, peak), "retained": current, "top_functions": top},
+            "floors": {str(k): v for k, v in sorted(self.floors.items())},
+            "marks": len(self.marks),
+        }
+
+
+ACCOUNTANT: Optional[MemoryAccountant] = None
+
+
+def start() -> MemoryAccountant:
+    global ACCOUNTANT
+    if ACCOUNTANT is None:
+        ACCOUNTANT = MemoryAccountant()
+        ACCOUNTANT.start()
+    return ACCOUNTANT
+
+
+def stop() -> None:
+    global ACCOUNTANT
+    if ACCOUNTANT is not None:
+        ACCOUNTANT.stop()
+        ACCOUNTANT = None
+
+
+def enabled() -> bool:
+    return ACCOUNTANT is not None
+
+
+def mark(event: str, floor: int) -> None:
+    """Boundary hook for the game loop; no-op unless accounting is on."""
+    if ACCOUNTANT is not None:
+        ACCOUNTANT.mark(event, floor)
+
+
+def write_report(path: Optional[str] = None) -> Optional[str]:
+    """Write the compact JSON report (default: DRPG_MEMTRACE_PATH or memreport.json)."""
+    if ACCOUNTANT is None:
+        return None
+    import json
+    path = path or os.environ.get("DRPG_MEMTRACE_PATH", "memreport.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(ACCOUNTANT.report(), f, indent=1)
+    return path
+
+
+if os.environ.get("DRPG_MEMTRACE", "") not in ("", "0"):
+    start()
@@ -0,0 +1,206 @@
+"""
+Leveled game messages with per-session sinks.
+
+Game code says what happened; the session decides where it goes:
+    messages.info("You hit the {} for {} damage.", name, dmg)
+The template is only formatted when some sink wants the text at that
+level, so a session with a NullSink (simulators, servers, the autoplayer)
+pays a level check and nothing else. A template may also be a callable,
+called with the args only when needed, for text that is costly to build
+(e.g. the rendered map).
+
+Sinks:
+  TerminalSink  print() to the console (looked up on each call, so tests
+                that patch print or redirect stdout still see the text)
+  BufferSink    keeps (level, template, args) and formats on read; args
+                should be plain values, and callable templates (which may
+                read live state) are formatted when recorded
+  NullSink      drops everything without formatting
+  JsonlSink     one {"t", "level", "text"} JSON object per line
+
+The current session's Messages lives in a ContextVar, so each thread (or
+asyncio task) of a server can route its own session with use(...); the
+default is a single TerminalSink at INFO.
+"""
+
+import builtins
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+DEBUG, INFO, WARN, ERROR = 10, 20, 30, 40
+LEVEL_NAMES = {DEBUG: "debug", INFO: "info", WARN: "warn", ERROR: "error"}
+OFF = 100  # above every level
+
+Template = Union[str, Callable[..., str]]
+
+
+def format_message(template: Template, args: tuple) -> str:
+    if callable(template):
+        return template(*args)
+    return template.format(*args) if args else template
+
+
+# =========================
+# Sinks
+# =========================
+class Sink:
+    """Receives messages at or above `level`."""
+    lazy = False  # True: gets the raw template/args via record() instead of text
+
+    def __init__(self, level: int = INFO):
+        self.level = level
+
+    def write(self, level: int, text: str, end: str) -> None:
+        raise NotImplementedError
+
+    def record(self, level: int, template: Template, args: tuple, end: str) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class TerminalSink(Sink):
+    def write(self, level: int, text: str, end: str) -> None:
+        builtins.print(text, end=end, flush=True)
+
+
+class NullSink(Sink):
+    def __init__(self):
+        super().__init__(OFF)
+
+    def write(self, level: int, text: str, end: str) -> None:
+        pass
+
+
+class BufferSink(Sink):
+    """In-memory capture; formatting is deferred until the text is read."""
+    lazy = True
+
+    def __init__(self, level: int = INFO):
+        super().__init__(level)
+        self.records: List[Tuple[int, Template, tuple, str]] = []
+
+    def record(self, level: int, template: Template, args: tuple, end: str) -> None:
+        if callable(template):
+            template, args = template(*args), ()
+        self.records.append((level, template, args, end))
+
+    def text(self, level: int = DEBUG) -> str:
+        """Everything captured at or above `level`, as it would have been printed."""
+        return "".join(format_message(t, a) + end for lv, t, a, end in self.records if lv >= level)
+
+    def lines(self, level: int = DEBUG) -> List[str]:
+        return self.text(level).splitlines()
+
+    def clear(self) -> None:
+        self.records.clear()
+
+
+class JsonlSink(Sink):
+    """Structured log: one JSON object per message, to a path or an open text stream."""
+
+    def __init__(self, target, level: int = INFO):
+        super().__init__(level)
+        self._own = isinstance(target, str)
+        self._f = open(target, "a", encoding="utf-8") if self._own else target
+
+    def write(self, level: int, text: str, end: str) -> None:
+        import json  # deferred: only structured sessions pay for it
+        self._f.write(json.dumps({"t": round(time.time(), 3), "level": LEVEL_NAMES.get(level, level),
+                                  "text": text}) + "\n")
+
+    def close(self) -> None:
+        if self._own:
+            self._f.close()
+        else:
+            self._f.flush()
+
+
+# =========================
+# Session router
+# =========================
+class Messages:
+    """One session's sinks; emit() formats at most once, and only if a sink needs text."""
+
+    def __init__(self, sinks: Optional[List[Sink]] = None):
+        self.sinks: List[Sink] = list(sinks) if sinks is not None else [TerminalSink()]
+        self._update()
+
+    def _update(self) -> None:
+        self.min_level = min((s.level for s in self.sinks), default=OFF)
+
+    def add(self, sink: Sink) -> Sink:
+        self.sinks.append(sink)
+        self._update()
+        return sink
+
+    def remove(self, sink: Sink) -> None:
+        self.sinks.remove(sink)
+        self._update()
+
+    def emit(self, level: int, template: Template, *args, end: str = "\n") -> None:
+        if level < self.min_level:
+            return
+        text = None
+        for sink in self.sinks:
+            if level < sink.level:
+                continue
+            if sink.lazy:
+                sink.record(level, template, args, end)
+            else:
+                if text is None:
+                    text = format_message(template, args)
+                sink.write(level, text, end)
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+
+_current: ContextVar[Optional[Messages]] = ContextVar("drpg_messages", default=None)
+_default: Optional[Messages] = None
+
+
+def current() -> Messages:
+    """The active session's Messages (a terminal one by default)."""
+    m = _current.get()
+    if m is None:
+        global _default
+        if _default is None:
+            _default = Messages()
+        m = _default
+    return m
+
+
+@contextmanager
+def use(messages: Messages) -> Iterator[Messages]:
+    """Route messages in this context (thread / task) to `messages`."""
+    token = _current.set(messages)
+    try:
+        yield messages
+    finally:
+        _current.reset(token)
+
+
+def quiet():
+    """Shortcut: drop all messages in this context."""
+    return use(Messages([NullSink()]))
+
+
+def debug(template: Template, *args, end: str = "\n") -> None:
+    current().emit(DEBUG, template, *args, end=end)
+
+
+def info(template: Template, *args, end: str = "\n") -> None:
+    current().emit(INFO, template, *args, end=end)
+
+
+def warn(template: Template, *args, end: str = "\n") -> None:
+    current().emit(WARN, template, *args, end=end)
+
+
+def error(template: Template, *args, end: str = "\n") -> None:
+    current().emit(ERROR, template, *args, end=end)
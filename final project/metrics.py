@@ -0,0 +1,203 @@
+"""
+Low-overhead metrics: counters and latency histograms for hot paths.
+
+Disabled by default; enable with the DRPG_METRICS=1 environment variable
+or metrics.enable(). While disabled, an instrumented call costs one
+global lookup and a branch, and timer() hands back a shared no-op.
+
+Export on demand with to_prometheus() / snapshot(), or write both files
+with write_reports(directory).
+"""
+
+import functools
+import os
+import time
+from bisect import bisect_left
+from typing import Dict, Optional
+
+_ENABLED = os.environ.get("DRPG_METRICS", "") not in ("", "0")
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+           0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+PREFIX = "drpg_"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (last bucket is +Inf)."""
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+_counters: Dict[str, int] = {}
+_histograms: Dict[str, Histogram] = {}
+
+
+def enable() -> None:
+    global _ENABLED
+    _ENABLED = True
+
+
+def disable() -> None:
+    global _ENABLED
+    _ENABLED = False
+
+
+def enabled() -> bool:
+    return _ENABLED
+
+
+def reset() -> None:
+    _counters.clear()
+    _histograms.clear()
+
+
+# =========================
+# Recording
+# =========================
+def incr(name: str, n: int = 1) -> None:
+    """Add n to a counter."""
+    if _ENABLED:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def observe(name: str, seconds: float) -> None:
+    """Record one latency sample."""
+    if _ENABLED:
+        h = _histograms.get(name)
+        if h is None:
+            h = _histograms[name] = Histogram()
+        h.observe(seconds)
+
+
+def clock() -> float:
+    """Start mark for observe_since(); 0.0 when disabled."""
+    return time.perf_counter() if _ENABLED else 0.0
+
+
+def observe_since(name: str, start: float) -> None:
+    """Record the time elapsed since a clock() mark."""
+    if _ENABLED and start:
+        observe(name, time.perf_counter() - start)
+
+
+class _Timer:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name: str):
+    """Context manager timing a block; a shared no-op when disabled."""
+    return _Timer(name) if _ENABLED else _NULL_TIMER
+
+
+def timed(name: str):
+    """Decorator: record the latency of every call under `name`."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - t0)
+        return wrapper
+    return deco
+
+
+# =========================
+# Export
+# =========================
+def _metric_name(name: str) -> str:
+    return PREFIX + "".join(ch if ch.isalnum() else "_" for ch in name)
+
+
+def snapshot() -> dict:
+    """JSON-serializable view of all counters and histograms."""
+    return {
+        "counters": dict(_counters),
+        "histograms": {
+            name: {
+                "count": h.count,
+                "sum_s": h.sum,
+                "mean_ms": (h.sum * 1000 / h.count) if h.count else 0.0,
+                "buckets": {str(le): c for le, c in zip(BUCKETS + ("+Inf",), h.counts)},
+            }
+            for name, h in _histograms.items()
+        },
+    }
+
+
+def to_prometheus() -> str:
+    """Prometheus text exposition format (cumulative buckets)."""
+    lines = []
+    for name, value in sorted(_counters.items()):
+        m = _metric_name(name) + "_total"
+        lines.append(f"# TYPE {m} counter")
+        lines.append(f"{m} {value}")
+    for name, h in sorted(_histograms.items()):
+        m = _metric_name(name) + "_seconds"
+        lines.append(f"# TYPE {m} histogram")
+        running = 0
+        for le, c in zip(BUCKETS, h.counts):
+            running += c
+            lines.append(f'{m}_bucket{{le="{le}"}} {running}')
+        lines.append(f'{m}_bucket{{le="+Inf"}} {h.count}')
+        lines.append(f"{m}_sum {h.sum:.9f}")
+        lines.append(f"{m}_count {h.count}")
+    return "\n".join(lines) + "\n"
+
+
+def write_reports(directory: Optional[str] = None) -> None:
+    """Write metrics.prom and metrics.json into `directory` (default: DRPG_METRICS_DIR or cwd)."""
+    import json
+    directory = directory or os.environ.get("DRPG_METRICS_DIR", ".")
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "metrics.prom"), "w", encoding="utf-8") as f:
+        f.write(to_prometheus())
+    with open(os.path.join(directory, "metrics.json"), "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f, indent=2)
+
+
+def install_signal_dump() -> bool:
+    """On POSIX, write the reports whenever the process receives SIGUSR1."""
+    import signal
+    if not hasattr(signal, "SIGUSR1"):
+        return False
+    signal.signal(signal.SIGUSR1, lambda *_: write_reports())
+    return True
@@ -1,10 +1,12 @@
 import math
 from dataclasses import dataclass, field
 import random
-from skills import ALL_SKILLS, Skill 
+import progression
+from progression import LevelUp
+from skills import default_skill_ids, skill_ids, skills_for, skill_by_name, has_skill
 
 
-@dataclass
+@dataclass(slots=True)
 class Player:
     row: int
     col: int
@@ -12,7 +14,7 @@ class Player:
     hp_max: int = 15
     sp_max: int = 10
     sp: int = 10
-    skills: list = field(default_factory = lambda: ALL_SKILLS[:])
+    skill_ids: tuple = field(default_factory=default_skill_ids)   # compact skill IDs; see skills.Skill
     atk_min: int = 3
     atk_max: int = 5
     level: int = 1
@@ -23,39 +25,61 @@ class Player:
     crit_chance: float = 0.15       # 15% base crit chance
     crit_multiplier: float = 1.5    # crit deals 1.5x damage
 
+    @property
+    def skills(self) -> tuple:
+        """Learned skills, resolved from the shared registry."""
+        return skills_for(self.skill_ids)
+
+    @skills.setter
+    def skills(self, value) -> None:
+        self.skill_ids = skill_ids(value)
+
     def is_alive(self) -> bool:
         return self.hp > 0
 
-    def gain_exp(self, amount: int):
-        """Gain EXP and handle level-up if threshold reached."""
-        self.exp += amount
-        while self.exp >= self.exp_to_next():
-            self.exp -= self.exp_to_next()
-            self.level_up()
+    def gain_exp(self, amount: int) -> LevelUp:
+        """
+        Gain EXP and apply any level-ups in one step via the progression
+        tables. Silent: callers print format_level_up(delta) if they want to.
+        """
+        total = progression.cum_exp(self.level) + self.exp + amount
+        new_level = max(self.level, progression.level_for_total_exp(total))
+        delta = self._advance(new_level - self.level)
+        self.exp = total - progression.cum_exp(self.level)
+        return delta
 
     def exp_to_next(self) -> int:
         """EXP required to reach next level."""
-        return 10 * self.level
+        return progression.exp_to_next(self.level)
 
-    def level_up(self):
+    def level_up(self) -> LevelUp:
         """Increase player stats when leveling up."""
-        self.level += 1
-        self.hp_max += 5
-        self.sp_max += 8
-        self.atk_min += 3
-        self.atk_max += 4
-        self.crit_chance = min(self.crit_chance + 0.03, 1)
-        self.hp = self.hp_max
-        self.sp = self.sp_max
-        print()
-        print(f"*** Level Up! You are now Level {self.level}! ***")
-        print(f"""Stats:        HP: {self.hp_max - 5} → {self.hp_max}, 
-              SP={self.sp_max - 8} → {self.sp_max}
-              ATK={self.atk_min - 3}-{self.atk_max - 4} → {self.atk_min}-{self.atk_max}, 
-              Crit={self.crit_chance - 0.03} → {self.crit_chance}
-              You have recoverd your HP and SP!
-              """)
-    
+        return self._advance(1)
+
+    def advance_to_level(self, level: int) -> LevelUp:
+        """Jump straight to `level` (no-op if already there) with 0 EXP."""
+        delta = self._advance(max(0, level - self.level))
+        self.exp = 0
+        return delta
+
+    def _advance(self, levels: int) -> LevelUp:
+        """Apply `levels` level-ups at once; restores HP/SP if any were gained."""
+        before = (self.hp_max, self.sp_max, self.atk_min, self.atk_max, self.crit_chance)
+        old_level = self.level
+        if levels > 0:
+            hp, sp, a1, a2, crit = progression.level_gains(levels)
+            self.level += levels
+            self.hp_max += hp
+            self.sp_max += sp
+            self.atk_min += a1
+            self.atk_max += a2
+            self.crit_chance = min(self.crit_chance + crit, progression.CRIT_CAP)
+            self.hp = self.hp_max
+            self.sp = self.sp_max
+        after = (self.hp_max, self.sp_max, self.atk_min, self.atk_max, self.crit_chance)
+        return LevelUp(levels=max(0, levels), old_level=old_level, new_level=self.level,
+                       before=before, after=after)
+
     # ---  roll player's damage with crit ---
     def roll_damage(self) -> tuple[int, bool]:
         """Return (damage, is_crit)."""
@@ -88,9 +112,9 @@ class Player:
             self.sp = min(self.sp, self.sp_max)
         if 'atk_min' in delta:
             self.atk_min = max(1, self.atk_min + delta['atk_min'])
-        if 'atk_max' in delta:
+        if 'atk_min' in delta or 'atk_max' in delta:
             # Ensure atk_max stays strictly >= atk_min + 1 for a valid range
-            self.atk_max = max(self.atk_min + 1, self.atk_max + delta['atk_max'])
+            self.atk_max = max(self.atk_min + 1, self.atk_max + delta.get('atk_max', 0))
         if 'crit_chance' in delta:
             # Keep crit chance in a sane range
             self.crit_chance = min(0.8, max(0.0, self.crit_chance + delta['crit_chance']))
@@ -130,7 +154,7 @@ class Player:
     def from_dict(cls, data: dict) -> "Player":
         """
         Create a Player from a saved dict.
-        Skills are rebuilt by matching names from ALL_SKILLS.
+        Skills are resolved by name through the skill registry.
         """
         # The initial position is filled with the saved row/col; the remaining values ​​are filled one by one
         p = cls(row=data.get("row", 1), col=data.get("col", 1))
@@ -142,8 +166,7 @@ class Player:
         p.sp_potions = data.get("sp_potions", 0)
         p.crit_chance = data.get("crit_chance", 0.0)
 
-        # Rebuild skills: match by name from ALL_SKILLS (ignore if not found)
+        # Rebuild skills: match by name in the registry (ignore if not found)
         names = data.get("skills", [])
-        name2skill = {s.name: s for s in ALL_SKILLS}
-        p.skills = [name2skill[n] for n in names if n in name2skill]
+        p.skill_ids = tuple(skill_by_name(n).id for n in names if has_skill(n))
         return p
\ No newline at end of file
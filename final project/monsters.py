@@ -1,10 +1,13 @@
 # monsters.py
 # Monster templates + spawning logic
+from array import array
 from dataclasses import dataclass
 import random
-from typing import List, Dict, Tuple
+from typing import List, Dict, Sequence, Tuple, Union
 
-@dataclass
+import content
+
+@dataclass(slots=True)
 class Monster:
     name: str
     level: int
@@ -12,25 +15,37 @@ class Monster:
     atk_min: int
     atk_max: int
     elite: bool = False
+    on_hit: tuple = ()   # (effect name, chance) applied to the player on a hit; see effects.py
 
     def is_alive(self) -> bool:
         return self.hp > 0
 
-# Monster database (extend freely)
-MONSTER_DB: List[Dict] = [
-    {"name": "Cute Slime",     "base_hp": 6,  "base_atk_min": 1, "base_atk_max": 3, "floors": [1,2],     "weight": 5},
-    {"name": "Bat Ghost",       "base_hp": 7,  "base_atk_min": 1, "base_atk_max": 4, "floors": [1,2,3],  "weight": 4},
-    {"name": "Skeleton",  "base_hp": 10, "base_atk_min": 2, "base_atk_max": 5, "floors": [2,3,4],  "weight": 4},
-    {"name": "Huge Goblin",    "base_hp": 12, "base_atk_min": 2, "base_atk_max": 6, "floors": [3,4,5],  "weight": 3},
-    {"name": "Specter",     "base_hp": 14, "base_atk_min": 3, "base_atk_max": 7, "floors": [4,5],    "weight": 2},
-]
+# Monster templates come from the content packs (content/base/monsters.json);
+# MONSTER_DB is still importable from here, resolved on first use.
+def templates() -> List[Dict]:
+    return content.current().monsters
+
+
+def template_index(name: str) -> int:
+    """Index of the template called `name` (KeyError if no pack defines it)."""
+    return content.current().monster_index[name]
+
+
+def __getattr__(name: str):
+    if name == "MONSTER_DB":
+        return templates()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Group encounters
+MAX_GROUP = 8
+GROUP_GROWTH = 0.08  # per floor: chance that one more monster joins the group
 
 # Elite tuning
 ELITE_CHANCE  = 0.4
 ELITE_HP_MULT = 1.35
 ELITE_ATK_MULT = 1.25
 
-def _weighted_choice(items: List[Dict], weights: List[float]) -> Dict:
+def _weighted_choice(items: Sequence, weights: Sequence[float]):
     total = sum(weights)
     r = random.uniform(0, total)
     upto = 0.0
@@ -40,12 +55,14 @@ def _weighted_choice(items: List[Dict], weights: List[float]) -> Dict:
         upto += w
     return items[-1]
 
+def _pick_index_for_floor(floor: int) -> int:
+    """select which monster will appear (pools are precomputed per floor by content.py)"""
+    c = content.current()
+    indices, weights = c.floor_pools.get(floor, c.any_pool)
+    return _weighted_choice(indices, weights)
+
 def _pick_template_for_floor(floor: int) -> Dict:
-    """select which monster will appear"""
-    pool = [m for m in MONSTER_DB if floor in m["floors"]]
-    if not pool:
-        pool = MONSTER_DB
-    return _weighted_choice(pool, [m["weight"] for m in pool])
+    return templates()[_pick_index_for_floor(floor)]
 
 def _scale_stats(tpl: Dict, level: int, elite: bool) -> Tuple[int, int, int]:
     """Linear scaling; elites get multiplicative boosts."""
@@ -67,7 +84,24 @@ def generate_monster(floor: int) -> Monster:
     level = random.randint(max(1, floor), max(1, floor + 1))
     elite = (random.random() < ELITE_CHANCE)
     hp, a1, a2 = _scale_stats(tpl, level, elite)
-    return Monster(name=tpl["name"], level=level, hp=hp, atk_min=a1, atk_max=a2, elite=elite)
+    return Monster(name=tpl["name"], level=level, hp=hp, atk_min=a1, atk_max=a2, elite=elite,
+                   on_hit=tpl.get("on_hit", ()))
+
+
+def roll_monster_spec(floor: int) -> Tuple[int, int, bool]:
+    """Same rolls as generate_monster, as (template index, level, elite) for compact storage."""
+    index = _pick_index_for_floor(floor)
+    level = random.randint(max(1, floor), max(1, floor + 1))
+    elite = (random.random() < ELITE_CHANCE)
+    return index, level, elite
+
+
+def monster_from_spec(tpl_index: int, level: int, elite: bool) -> Monster:
+    """Build the Monster for a stored (template index, level, elite) triple."""
+    tpl = templates()[tpl_index]
+    hp, a1, a2 = _scale_stats(tpl, level, elite)
+    return Monster(name=tpl["name"], level=level, hp=hp, atk_min=a1, atk_max=a2, elite=elite,
+                   on_hit=tpl.get("on_hit", ()))
 
 
 def generate_mimic_monster(floor: int) -> Monster:
@@ -91,5 +125,78 @@ def generate_mimic_monster(floor: int) -> Monster:
         hp=hp,
         atk_min=a1,
         atk_max=a2,
-        elite=elite
+        elite=elite,
+        on_hit=tpl.get("on_hit", ()),
     )
+
+
+# =========================
+# Groups
+# =========================
+class MonsterGroup:
+    """
+    Several monsters fought at once, stored column-wise: one array per
+    stat, indexed by member. Damage to the whole group and the group's
+    attack phase are single map/sum passes over these columns (see
+    combat.group_strike / combat.group_turn) rather than a loop over
+    Monster objects. Status effects (stuns included) live in the battle's
+    StatusEngine under combat.member_key(i).
+    """
+    __slots__ = ("names", "levels", "elite", "hp", "atk_min", "atk_max", "on_hit")
+
+    def __init__(self, monsters: Sequence[Monster]):
+        if not 1 <= len(monsters) <= MAX_GROUP:
+            raise ValueError(f"a group has 1-{MAX_GROUP} monsters, got {len(monsters)}")
+        self.names = [m.name for m in monsters]
+        self.levels = array("i", [m.level for m in monsters])
+        self.elite = bytes(bool(m.elite) for m in monsters)
+        self.hp = array("i", [m.hp for m in monsters])
+        self.atk_min = array("i", [m.atk_min for m in monsters])
+        self.atk_max = array("i", [m.atk_max for m in monsters])
+        self.on_hit = tuple(m.on_hit for m in monsters)
+
+    def __len__(self) -> int:
+        return len(self.hp)
+
+    @property
+    def name(self) -> str:
+        return f"group of {len(self)}"
+
+    def is_alive(self) -> bool:
+        return max(self.hp) > 0
+
+    def alive(self) -> List[int]:
+        """Indices of the members still standing."""
+        return [i for i, hp in enumerate(self.hp) if hp > 0]
+
+    def member(self, i: int) -> Monster:
+        """Member i as a standalone Monster (a copy; for previews and display)."""
+        return Monster(name=self.names[i], level=self.levels[i], hp=self.hp[i],
+                       atk_min=self.atk_min[i], atk_max=self.atk_max[i],
+                       elite=bool(self.elite[i]), on_hit=self.on_hit[i])
+
+
+def roll_group_size(floor: int, group_max: int = MAX_GROUP) -> int:
+    """
+    1 + one more monster with chance GROUP_GROWTH * (floor - 1), repeatedly,
+    up to group_max. Floor 1 is always a single monster.
+    """
+    cap = max(1, min(group_max, MAX_GROUP))
+    grow = GROUP_GROWTH * (floor - 1)
+    size = 1
+    while size < cap and grow > 0 and random.random() < grow:
+        size += 1
+    return size
+
+
+def generate_encounter(floor: int, group_max: int = MAX_GROUP) -> Union[Monster, MonsterGroup]:
+    """
+    A random encounter: a single Monster (as generate_monster) or, when
+    the size roll says so, a MonsterGroup of independently rolled members.
+    Group members are never elite.
+    """
+    size = roll_group_size(floor, group_max)
+    if size == 1:
+        return generate_monster(floor)
+    return MonsterGroup([monster_from_spec(i, lv, False)
+                         for i, lv, _elite in (roll_monster_spec(floor) for _ in range(size))])
@@ -0,0 +1,106 @@
+"""
+Precomputed progression tables.
+
+- exp_to_next(L): EXP needed to go from level L to L+1 (10 * L)
+- cum_exp(L):     total EXP needed to reach level L from level 1
+- level_gains(n): cumulative stat gains for n level-ups
+Tables are built once for TABLE_LEVELS levels and grown on demand, so
+any EXP amount resolves to a level with a constant number of lookups.
+"""
+
+from dataclasses import dataclass
+from math import isqrt
+from typing import List, Tuple
+
+EXP_PER_LEVEL = 10      # exp_to_next(L) = EXP_PER_LEVEL * L
+
+# Stat gains per level-up
+HP_PER_LEVEL = 5
+SP_PER_LEVEL = 8
+ATK_MIN_PER_LEVEL = 3
+ATK_MAX_PER_LEVEL = 4
+CRIT_PER_LEVEL = 0.03
+CRIT_CAP = 1
+
+TABLE_LEVELS = 128
+
+# Index = level (index 0 unused)
+_EXP_TO_NEXT: List[int] = [0]
+_CUM_EXP: List[int] = [0]
+# Index = number of level-ups: (hp_max, sp_max, atk_min, atk_max, crit)
+_GAINS: List[Tuple[int, int, int, int, float]] = []
+
+
+def _grow(level: int) -> None:
+    """Extend all tables to cover `level`."""
+    while len(_CUM_EXP) <= level:
+        L = len(_CUM_EXP)
+        _CUM_EXP.append(_CUM_EXP[-1] + _EXP_TO_NEXT[-1])
+        _EXP_TO_NEXT.append(EXP_PER_LEVEL * L)
+        n = L - 1
+        _GAINS.append((HP_PER_LEVEL * n, SP_PER_LEVEL * n,
+                       ATK_MIN_PER_LEVEL * n, ATK_MAX_PER_LEVEL * n, CRIT_PER_LEVEL * n))
+
+_grow(TABLE_LEVELS)
+
+
+def exp_to_next(level: int) -> int:
+    """EXP required to go from `level` to `level + 1`."""
+    if level >= len(_EXP_TO_NEXT):
+        _grow(level)
+    return _EXP_TO_NEXT[level]
+
+
+def cum_exp(level: int) -> int:
+    """Total EXP needed to reach `level` starting from level 1 with 0 EXP."""
+    if level >= len(_CUM_EXP):
+        _grow(level)
+    return _CUM_EXP[level]
+
+
+def level_gains(levels: int) -> Tuple[int, int, int, int, float]:
+    """Cumulative (hp_max, sp_max, atk_min, atk_max, crit) gained over `levels` level-ups."""
+    if levels >= len(_GAINS):
+        _grow(levels + 1)
+    return _GAINS[levels]
+
+
+def level_for_total_exp(total: int) -> int:
+    """Highest level whose cumulative EXP threshold is <= total."""
+    # cum_exp(L) = EXP_PER_LEVEL * L * (L - 1) / 2, so solve the quadratic,
+    # then correct the isqrt guess by at most a step against the table.
+    q = (2 * max(0, total)) // EXP_PER_LEVEL
+    level = max(1, (1 + isqrt(1 + 4 * q)) // 2)
+    while cum_exp(level + 1) <= total:
+        level += 1
+    while level > 1 and cum_exp(level) > total:
+        level -= 1
+    return level
+
+
+@dataclass(frozen=True)
+class LevelUp:
+    """What a grant of EXP changed; levels == 0 when no level was gained."""
+    levels: int
+    old_level: int
+    new_level: int
+    before: Tuple[int, int, int, int, float]   # (hp_max, sp_max, atk_min, atk_max, crit)
+    after: Tuple[int, int, int, int, float]
+
+    def __bool__(self) -> bool:
+        return self.levels > 0
+
+
+def format_level_up(delta: LevelUp) -> str:
+    """Interactive level-up banner built from a LevelUp delta."""
+    if not delta:
+        return ""
+    hp0, sp0, a10, a20, c0 = delta.before
+    hp1, sp1, a11, a21, c1 = delta.after
+    return (f"\n*** Level Up! You are now Level {delta.new_level}! ***\n"
+            f"""Stats:        HP: {hp0} → {hp1},
+              SP={sp0} → {sp1}
+              ATK={a10}-{a20} → {a11}-{a21},
+              Crit={c0} → {c1}
+              You have recoverd your HP and SP!
+              """)
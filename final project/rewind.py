@@ -0,0 +1,105 @@
+"""
+Rewind: per-turn snapshots with structural sharing.
+
+A Snapshot holds
+  - the player as an immutable record (a tuple of its fields),
+  - the floor's FloorGrid object with its frozen terrain and entity images
+    (FloorGrid.freeze / EntityLayer.freeze). Those images are cached and
+    only rebuilt for what changed, so consecutive snapshots share them:
+    after an ordinary move a snapshot allocates the player record and
+    nothing for the map,
+  - the roaming pack's columns, when roaming monsters are on.
+History keeps the last N snapshots of each kind in its own deque, so a
+long battle's per-turn snapshots never push move snapshots out: "rewind
+N moves" reaches N moves back whatever happened in between. Rewinding
+restores one in place, rewriting only the rows and layers that differ; snapshots from an
+earlier floor keep that floor's FloorGrid alive, so going back across a
+staircase works too.
+"""
+
+from collections import deque
+from dataclasses import fields
+from typing import Dict, NamedTuple, Optional
+
+from models import Player
+
+DEFAULT_DEPTH = 50
+PLAYER_FIELDS = tuple(f.name for f in fields(Player))
+
+
+def player_record(player: Player) -> tuple:
+    return tuple(getattr(player, name) for name in PLAYER_FIELDS)
+
+
+def restore_player(player: Player, record: tuple) -> None:
+    for name, value in zip(PLAYER_FIELDS, record):
+        setattr(player, name, value)
+
+
+class Snapshot(NamedTuple):
+    kind: str                   # "move" | "battle"
+    floor: int
+    grid: object                # the FloorGrid itself
+    terrain: tuple              # grid.freeze()
+    entities: tuple             # grid.entities.freeze()
+    monsters: Optional[tuple]   # grid.monsters.state(), if any
+    player: tuple               # player_record()
+    tip: str
+
+
+def take_snapshot(ctx, kind: str = "move") -> Snapshot:
+    g = ctx.grid
+    pack = g.monsters
+    return Snapshot(kind, ctx.floor, g, g.freeze(), g.entities.freeze(),
+                    pack.state() if pack is not None else None,
+                    player_record(ctx.player), ctx.tip)
+
+
+def restore(ctx, snap: Snapshot) -> None:
+    g = snap.grid
+    g.thaw(snap.terrain)
+    g.entities.thaw(snap.entities)
+    if snap.monsters is not None and g.monsters is not None:
+        g.monsters.restore(snap.monsters)
+    ctx.grid = g
+    ctx.floor = snap.floor
+    restore_player(ctx.player, snap.player)
+    ctx.prev_pos = (ctx.player.row, ctx.player.col)
+    ctx.tip = snap.tip
+
+
+class History:
+    """The last `depth` snapshots of each kind; the newest one is the current state."""
+
+    def __init__(self, depth: int = DEFAULT_DEPTH):
+        self.depth = depth
+        self._kinds: Dict[str, deque] = {}    # kind -> deque of (seq, Snapshot)
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return sum(len(snaps) for snaps in self._kinds.values())
+
+    def record(self, ctx, kind: str = "move") -> None:
+        snaps = self._kinds.get(kind)
+        if snaps is None:
+            snaps = self._kinds[kind] = deque(maxlen=self.depth + 1)
+        self._seq += 1
+        snaps.append((self._seq, take_snapshot(ctx, kind)))
+
+    def rewind(self, ctx, turns: int = 1, kind: str = "move") -> int:
+        """
+        Restore the state `turns` snapshots of `kind` back (newer snapshots of
+        any kind are dropped). Returns how many turns were actually undone.
+        """
+        snaps = self._kinds.get(kind, ())
+        steps = min(turns, len(snaps) - 1)
+        if steps <= 0:
+            return 0
+        for _ in range(steps):
+            snaps.pop()
+        seq, snap = snaps[-1]
+        for other in self._kinds.values():
+            while other and other[-1][0] > seq:
+                other.pop()
+        restore(ctx, snap)
+        return steps
@@ -0,0 +1,201 @@
+"""
+Roaming monsters: monsters placed on the map that wander and chase the player.
+
+All monsters of a floor live in one RoamingPack as parallel arrays
+(flat cell index, template index, level, elite). A tick moves every
+monster with a single gather through a step table, where step[cell] is
+the cell a monster standing on `cell` moves to:
+    pos = array("i", map(step.__getitem__, pos))
+The step table is a flow field toward the player: a BFS from the player's
+cell, limited to chase_radius, whose parent links point one step closer.
+It is rebuilt only when the player has moved, and only the cells it
+touched are reset, so a tick costs O(radius^2) plus one C-level pass
+over the monster arrays, whatever the floor size. Monsters outside the
+radius stay put (step[cell] == cell), except a random few that wander.
+
+Enable with "encounters": {"mode": "roaming"} in config.json; walking
+into a monster (or being caught by one) starts the battle.
+"""
+
+import random
+from array import array
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+
+from entities import tile_at
+from metrics import timed
+from monsters import Monster, roll_monster_spec, monster_from_spec
+
+MIN_SPAWN_DISTANCE = 4  # Manhattan distance from the player at spawn
+
+
+class FlowField:
+    """Cached step table toward one target cell, over a floor's walkable terrain."""
+
+    def __init__(self, grid, radius: int):
+        self.h, self.w = len(grid), len(grid[0])
+        self.walkable = bytearray(ch != "#" for row in grid for ch in row)
+        self.radius = radius
+        self.target = -1
+        self.step = array("i", range(self.h * self.w))
+        self._touched: List[int] = []
+
+    def neighbors(self, i: int) -> Iterator[int]:
+        w, walk = self.w, self.walkable
+        r, c = divmod(i, w)
+        if r > 0 and walk[i - w]:
+            yield i - w
+        if r < self.h - 1 and walk[i + w]:
+            yield i + w
+        if c > 0 and walk[i - 1]:
+            yield i - 1
+        if c < w - 1 and walk[i + 1]:
+            yield i + 1
+
+    def toward(self, target: int) -> array:
+        """The step table for `target`; rebuilt only if the target moved."""
+        if target == self.target:
+            return self.step
+        step = self.step
+        for i in self._touched:
+            step[i] = i
+        touched = [target]
+        depth = {target: 0}
+        dq = deque([target])
+        while dq:
+            cur = dq.popleft()
+            d = depth[cur]
+            if d >= self.radius:
+                continue
+            for n in self.neighbors(cur):
+                if n not in depth:
+                    depth[n] = d + 1
+                    step[n] = cur
+                    touched.append(n)
+                    dq.append(n)
+        self._touched = touched
+        self.target = target
+        return step
+
+
+class RoamingPack:
+    """All roaming monsters of one floor, stored column-wise."""
+    __slots__ = ("width", "pos", "tpl", "level", "elite")
+
+    def __init__(self, width: int):
+        self.width = width
+        self.pos = array("i")     # flat cell index r * width + c
+        self.tpl = array("b")     # template index (monsters.templates())
+        self.level = array("h")
+        self.elite = array("b")
+
+    def add(self, r: int, c: int, tpl: int, level: int, elite: bool) -> None:
+        self.pos.append(r * self.width + c)
+        self.tpl.append(tpl)
+        self.level.append(level)
+        self.elite.append(int(elite))
+
+    def remove(self, i: int) -> None:
+        """Swap-remove monster i (order is not meaningful)."""
+        for col in (self.pos, self.tpl, self.level, self.elite):
+            col[i] = col[-1]
+            col.pop()
+
+    def __len__(self) -> int:
+        return len(self.pos)
+
+    def cells(self) -> Iterator[Tuple[int, int]]:
+        w = self.width
+        for p in self.pos:
+            yield divmod(p, w)
+
+    def index_at(self, r: int, c: int) -> Optional[int]:
+        try:
+            return self.pos.index(r * self.width + c)
+        except ValueError:
+            return None
+
+    def monster(self, i: int) -> Monster:
+        return monster_from_spec(self.tpl[i], self.level[i], bool(self.elite[i]))
+
+    def state(self) -> tuple:
+        """Copy of the columns, for snapshots (O(monsters))."""
+        return (self.pos.tobytes(), self.tpl.tobytes(), self.level.tobytes(), self.elite.tobytes())
+
+    def restore(self, state: tuple) -> None:
+        for col, raw in zip((self.pos, self.tpl, self.level, self.elite), state):
+            del col[:]
+            col.frombytes(raw)
+
+    @timed("roaming.tick")
+    def tick(self, field: FlowField, target: int, wander: int = 0) -> None:
+        """Advance every monster one step: chase within the field, else maybe wander."""
+        step = field.toward(target)
+        pos = self.pos
+        if wander and pos:
+            for i in random.sample(range(len(pos)), min(wander, len(pos))):
+                p = pos[i]
+                if step[p] == p:  # idle: not chasing
+                    opts = list(field.neighbors(p))
+                    if opts:
+                        pos[i] = random.choice(opts)
+        self.pos = array("i", map(step.__getitem__, pos))
+
+
+def spawn_pack(grid, floor: int, count: int, player_pos: Tuple[int, int]) -> RoamingPack:
+    """Place `count` monsters on free floor cells away from the player."""
+    pr, pc = player_pos
+    free = [(r, c) for r in range(len(grid)) for c in range(len(grid[0]))
+            if tile_at(grid, r, c) == "." and abs(r - pr) + abs(c - pc) >= MIN_SPAWN_DISTANCE]
+    pack = RoamingPack(len(grid[0]))
+    for r, c in random.sample(free, min(count, len(free))):
+        pack.add(r, c, *roll_monster_spec(floor))
+    return pack
+
+
+class RoamingEncounters:
+    """Encounter policy: a pack per floor, ticked once per player step."""
+
+    def __init__(self, per_floor: int = 6, chase_radius: int = 8, wander_rate: float = 0.3):
+        self.per_floor = per_floor
+        self.chase_radius = chase_radius
+        self.wander_rate = wander_rate
+        self.pack: Optional[RoamingPack] = None
+        self.field: Optional[FlowField] = None
+        self._grid = None
+        self._engaged: Optional[int] = None   # pack index of the monster being fought
+
+    def _new_floor(self, ctx) -> None:
+        """Switch to ctx.grid: keep its pack if it has one (e.g. rewound back to it), else spawn."""
+        self._grid = ctx.grid
+        self.field = FlowField(ctx.grid, self.chase_radius)
+        self._engaged = None
+        pack = getattr(ctx.grid, "monsters", None)
+        if pack is not None:
+            self.pack = pack
+            return
+        self.pack = spawn_pack(ctx.grid, ctx.floor, self.per_floor, (ctx.player.row, ctx.player.col))
+        try:
+            ctx.grid.monsters = self.pack  # drawn by world.render
+        except AttributeError:
+            pass  # plain list grid: nothing to draw on
+
+    def __call__(self, ctx) -> Optional[Monster]:
+        if ctx.grid is not self._grid:
+            self._new_floor(ctx)
+        p = ctx.player
+        i = self.pack.index_at(p.row, p.col)  # walked into a monster
+        if i is None:
+            wander = int(len(self.pack) * self.wander_rate + random.random())
+            self.pack.tick(self.field, p.row * self.field.w + p.col, wander)
+            i = self.pack.index_at(p.row, p.col)  # a monster caught up
+        if i is None:
+            return None
+        self._engaged = i
+        return self.pack.monster(i)
+
+    def resolved(self, ctx, monster: Monster, outcome: str) -> None:
+        """Battle over: a defeated monster leaves the map; after an escape it stays."""
+        if outcome == "win" and self._engaged is not None:
+            self.pack.remove(self._engaged)
+        self._engaged = None
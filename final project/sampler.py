@@ -0,0 +1,141 @@
+"""
+Built-in sampling profiler.
+
+A daemon thread wakes every `interval` seconds, grabs the target
+thread's Python stack through sys._current_frames() and counts it in
+collapsed-stack form ("frame;frame;frame count"), which flamegraph.pl and
+speedscope read directly.
+
+Where the OS exposes a per-thread CPU clock (time.pthread_getcpuclockid),
+each sample is weighted by the CPU time the target used since the last
+sample, so time spent blocked in input() does not show up. Elsewhere
+samples are weighted by wall time. by_module() turns the samples into a
+CPU-time breakdown by game module.
+
+Usage:
+    with Sampler() as prof:
+        run_something()
+    prof.write_collapsed("profile.folded")
+    print(prof.format_summary())
+"""
+
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INTERVAL = 0.005
+MODULES = ("world", "entities", "battle", "combat", "monsters", "events", "save_load", "models", "tiles", "main")
+
+
+def _frame_label(code) -> str:
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}"
+
+
+class Sampler:
+    """Samples one thread (default: the caller's) on a background thread."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.stacks: Dict[str, float] = {}   # collapsed stack -> weight (µs)
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._cpu_clock = self._cpu_clock_for(self.thread_id)
+
+    @staticmethod
+    def _cpu_clock_for(thread_id: int):
+        try:
+            clk = time.pthread_getcpuclockid(thread_id)
+            time.clock_gettime(clk)
+            return clk
+        except (AttributeError, OSError, OverflowError):
+            return None
+
+    def _now(self) -> float:
+        if self._cpu_clock is not None:
+            return time.clock_gettime(self._cpu_clock)
+        return time.perf_counter()
+
+    def _run(self) -> None:
+        last = self._now()
+        while not self._stop.wait(self.interval):
+            now = self._now()
+            weight = (now - last) * 1e6
+            last = now
+            if weight <= 0:
+                continue  # target was idle (blocked in I/O) since the last sample
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            parts = []
+            while frame is not None:
+                parts.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            key = ";".join(reversed(parts))
+            self.stacks[key] = self.stacks.get(key, 0.0) + weight
+            self.samples += 1
+
+    def start(self) -> "Sampler":
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="drpg-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    # =========================
+    # Output
+    # =========================
+    def collapsed(self) -> str:
+        """Flamegraph-compatible collapsed stacks; counts are microseconds."""
+        return "".join(f"{stack} {int(w)}\n" for stack, w in sorted(self.stacks.items()) if int(w) > 0)
+
+    def write_collapsed(self, path: str) -> str:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+        return path
+
+    def by_module(self) -> Dict[str, float]:
+        """Seconds attributed to each game module (innermost game frame of each sample)."""
+        out: Dict[str, float] = {}
+        for stack, w in self.stacks.items():
+            owner = "other"
+            for label in reversed(stack.split(";")):
+                module = label.split(":", 1)[0]
+                if module in MODULES:
+                    owner = module
+                    break
+            out[owner] = out.get(owner, 0.0) + w / 1e6
+        return out
+
+    def format_summary(self) -> str:
+        mods = self.by_module()
+        total = sum(mods.values()) or 1.0
+        kind = "CPU" if self._cpu_clock is not None else "wall"
+        lines = [f"{kind} time by module ({self.samples} samples):"]
+        for module, secs in sorted(mods.items(), key=lambda kv: -kv[1]):
+            lines.append(f"  {module:<10}{secs * 1000:>10.1f} ms {secs / total:>7.1%}")
+        return "\n".join(lines)
+
+
+def profile_path(prefix: str, directory: Optional[str] = None) -> str:
+    """A fresh collapsed-stack file name, e.g. profile-main-12345-1700000000.folded."""
+    directory = directory or os.environ.get("DRPG_PROFILE_DIR", ".")
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"profile-{prefix}-{os.getpid()}-{int(time.time())}.folded")
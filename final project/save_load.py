@@ -1,29 +1,43 @@
 
 """
 Simple JSON-based save/load utilities.
-We save: floor number, player snapshot, current grid (map).
+We save: floor number, player snapshot, current grid (terrain), its entities
+and the fog of war's explored bitmap (packed bits, base64).
+Saves from before the entity layer (chests/exit baked into the grid) are
+migrated on load.
 """
 
 import json
 import os
 from typing import Optional, Tuple, List
+import messages
 from models import Player
+from metrics import timed
+from entities import EntityLayer, FloorGrid, layer_of
+from fog import Fog, fog_enabled
 
 SAVE_PATH = "save.json"
 
+@timed("save_load.save_game")
 def save_game(player: Player, floor: int, grid: List[List[str]], path: str = SAVE_PATH) -> None:
     """
     Serialize the current game state into a JSON file.
     """
+    layer = layer_of(grid)
     data = {
         "floor": floor,
         "player": player.to_dict(),
         "grid": grid,
+        "entities": layer.to_list() if layer is not None else [],
     }
+    fog = getattr(grid, "fog", None)
+    if fog is not None:
+        data["fog"] = fog.to_dict()
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2)
-    print(f"[Save] Game saved to {os.path.abspath(path)}")
+    messages.info("[Save] Game saved to {}", os.path.abspath(path))
 
+@timed("save_load.load_game")
 def load_game(path: str = SAVE_PATH) -> Optional[Tuple[Player, int, List[List[str]]]]:
     """
     Load the game state from a JSON file.
@@ -38,12 +52,18 @@ def load_game(path: str = SAVE_PATH) -> Optional[Tuple[Player, int, List[List[st
         # Basic checks
         if not isinstance(grid, list) or not grid or not isinstance(grid[0], list):
             raise ValueError("Invalid grid in save file.")
+        if "entities" in data:
+            grid = FloorGrid(grid, EntityLayer.from_list(data["entities"]))
+        else:
+            grid = FloorGrid.from_legacy(grid)
+        if "fog" in data and fog_enabled():
+            grid.fog = Fog.from_dict(data["fog"], grid)
         return player, floor, grid
     except FileNotFoundError:
-        print("[Load] No save file found.")
+        messages.warn("[Load] No save file found.")
         return None
     except Exception as e:
-        print(f"[Load] Failed to load save: {e}")
+        messages.warn("[Load] Failed to load save: {}", e)
         return None
 
 def has_save(path: str = SAVE_PATH) -> bool:
@@ -54,6 +74,6 @@ def delete_save(path: str = SAVE_PATH) -> None:
     """clear save"""
     try:
         os.remove(path)
-        print("[Save] Save file deleted.")
+        messages.info("[Save] Save file deleted.")
     except FileNotFoundError:
         pass
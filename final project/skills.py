@@ -1,35 +1,133 @@
 
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import content
+
+# Registry of interned skills: index == Skill.id
+_BY_ID: List["Skill"] = []
+_BY_NAME: Dict[str, "Skill"] = {}
+
+
 class Skill:
-    def __init__(self, name: str, cost: int, multiplier: float, desc: str = "", stun: bool = False):
-        """
-        Represents a combat skill that the player can use in battle.
-
-        Parameters
-        ----------
-        name : str
-            The display name of the skill (e.g., "Power Strike").
-        cost : int
-            The SP (Skill Points) cost required to use the skill.
-        multiplier : float
-            Damage multiplier relative to the player's normal attack.
-            For example, 1.5 means 150% of normal damage.
-        desc : str, optional
-            A short description of the skill shown in the skill menu.
-            Defaults to an empty string.
-        stun : bool, optional
-            Whether this skill stuns the enemy for 1 turn.
-            Defaults to False.
-        """
-
-        self.name = name
-        self.cost = cost
-        self.multiplier = multiplier
-        self.desc = desc
-        self.stun = stun
-
-# skills pool
-ALL_SKILLS = [
-    Skill("Power Strike", 3, 2.0, "A strong blow (x2 damage)."),
-    Skill("Double Slash", 5, 4, "Two quick slashes (x4 damage)."),
-    Skill("Guard Break", 4, 0.6, "less damage(x0.6) but stuns the enemy.", stun=True),
-]
+    """
+    Represents a combat skill that the player can use in battle.
+
+    Skills are immutable flyweights: constructing a Skill with the same
+    parameters returns the already-registered instance, and each one gets
+    a small integer `id` that players store instead of the object.
+
+    Parameters
+    ----------
+    name : str
+        The display name of the skill (e.g., "Power Strike").
+    cost : int
+        The SP (Skill Points) cost required to use the skill.
+    multiplier : float
+        Damage multiplier relative to the player's normal attack.
+        For example, 1.5 means 150% of normal damage.
+    desc : str, optional
+        A short description of the skill shown in the skill menu.
+        Defaults to an empty string.
+    stun : bool, optional
+        Whether this skill stuns the enemy for 1 turn; shorthand for the
+        ("stun", "enemy") effect. Defaults to False.
+    effects : tuple of (effect name, "enemy" | "self"), optional
+        Status effects (see effects.EFFECTS) the skill applies when used.
+        Enemy effects only land if the enemy survives the hit.
+    aoe : bool, optional
+        Whether the skill hits every enemy of a group (monsters.MonsterGroup)
+        instead of one target. Against a single monster it is an ordinary hit.
+    """
+
+    __slots__ = ("id", "name", "cost", "multiplier", "desc", "stun", "effects", "aoe")
+
+    def __new__(cls, name: str, cost: int, multiplier: float, desc: str = "", stun: bool = False,
+                effects: Tuple[Tuple[str, str], ...] = (), aoe: bool = False):
+        effects = tuple(tuple(e) for e in effects)
+        if stun and ("stun", "enemy") not in effects:
+            effects = (("stun", "enemy"),) + effects
+        values = (name, cost, multiplier, desc, stun, effects, aoe)
+        existing = _BY_NAME.get(name)
+        if existing is not None:
+            if existing._values() != values:
+                raise ValueError(f"Skill {name!r} is already registered with different values")
+            return existing
+
+        self = object.__new__(cls)
+        for attr, v in zip(cls.__slots__[1:], values):
+            object.__setattr__(self, attr, v)
+        object.__setattr__(self, "id", len(_BY_ID))
+        _BY_ID.append(self)
+        _BY_NAME[name] = self
+        return self
+
+    def _values(self) -> tuple:
+        return (self.name, self.cost, self.multiplier, self.desc, self.stun, self.effects, self.aoe)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Skill instances are immutable")
+
+    def __delattr__(self, key):
+        raise AttributeError("Skill instances are immutable")
+
+    def __reduce__(self):
+        # Pickle by name so worker processes resolve to their own interned copy.
+        return (skill_by_name, (self.name,))
+
+    def __repr__(self) -> str:
+        return f"Skill(#{self.id} {self.name!r}, cost={self.cost}, mult={self.multiplier})"
+
+
+def skill_by_id(skill_id: int) -> Skill:
+    return _BY_ID[skill_id]
+
+
+def skill_by_name(name: str) -> Skill:
+    if name not in _BY_NAME:
+        all_skills()
+    return _BY_NAME[name]
+
+
+def has_skill(name: str) -> bool:
+    if name not in _BY_NAME:
+        all_skills()
+    return name in _BY_NAME
+
+
+def skill_ids(skills: Iterable[Skill]) -> Tuple[int, ...]:
+    """Compact ID tuple for a sequence of skills."""
+    return tuple(s.id for s in skills)
+
+
+@lru_cache(maxsize=None)
+def skills_for(ids: Tuple[int, ...]) -> Tuple[Skill, ...]:
+    """Resolve an ID tuple to skills; identical tuples share one result."""
+    return tuple(_BY_ID[i] for i in ids)
+
+
+# skills pool: defined by the content packs (see content.py), registered on first use
+_pool: Optional[Tuple[str, List[Skill]]] = None
+
+
+def all_skills() -> List[Skill]:
+    """Every skill of the loaded content packs, in pack order."""
+    global _pool
+    c = content.current()
+    if _pool is None or _pool[0] != c.key:
+        _pool = (c.key, [Skill(*args) for args in c.skills])
+    return _pool[1]
+
+
+def default_skill_ids() -> Tuple[int, ...]:
+    """What a new player starts with."""
+    return skill_ids(all_skills())
+
+
+def __getattr__(name: str):
+    # ALL_SKILLS / DEFAULT_SKILL_IDS stay importable without loading content at import time
+    if name == "ALL_SKILLS":
+        return all_skills()
+    if name == "DEFAULT_SKILL_IDS":
+        return default_skill_ids()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
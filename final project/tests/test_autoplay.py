@@ -0,0 +1,69 @@
+# tests/test_autoplay.py
+"""
+Tests for the headless full-run autoplayer.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from autoplay import play_run, run_batch, FINAL_FLOOR
+from config import CFG
+from entities import FloorGrid
+from events import chest_event
+from models import Player
+from tiles import REGISTRY
+
+
+class TestPlayRun(unittest.TestCase):
+    def test_same_seed_same_run(self):
+        a, b = play_run(7), play_run(7)
+        self.assertEqual((a.cleared, a.floor, a.steps, a.level_at), (b.cleared, b.floor, b.steps, b.level_at))
+
+    def test_run_ends_cleared_or_dead(self):
+        run = play_run(3)
+        self.assertTrue(run.cleared or 1 <= run.floor <= FINAL_FLOOR)
+        self.assertEqual(run.level_at[0], 1)
+
+    def test_uses_the_game_loop_tile_handlers(self):
+        REGISTRY.reset_stats()
+        out = io.StringIO()
+        with redirect_stdout(out), patch("builtins.input", side_effect=AssertionError("prompted")):
+            play_run(11)
+        self.assertGreater(REGISTRY.stats()["chest"]["calls"], 0)
+        self.assertEqual(out.getvalue(), "")
+
+
+class TestHeadlessChest(unittest.TestCase):
+    def test_injected_fight_and_choice(self):
+        grid = FloorGrid([["#"] * 3, ["#", ".", "#"], ["#"] * 3])
+        grid.entities.add("chest", 1, 1)
+        p = Player(row=1, col=1)
+        old = dict(CFG["treasure"])
+        try:
+            CFG["treasure"]["mimic_chance"] = 1.0
+            msg, consumed = chest_event(p, 1, grid, 1, 1, fight=lambda _p, _m: "escape",
+                                        choose=lambda _p: "heal")
+            self.assertFalse(consumed)
+            CFG["treasure"]["mimic_chance"] = 0.0
+            msg, consumed = chest_event(p, 1, grid, 1, 1, choose=lambda _p: "heal")
+            self.assertTrue(consumed)
+            self.assertEqual(msg, "You feel refreshed.")
+        finally:
+            CFG["treasure"] = old
+
+
+class TestRunBatch(unittest.TestCase):
+    def test_aggregate_is_consistent(self):
+        s = run_batch(12, workers=1, base_seed=100)
+        deaths = sum(s["death_floor_histogram"].values())
+        self.assertAlmostEqual(s["clear_rate"], (12 - deaths) / 12)
+        self.assertEqual(s["reached_floor"][1], 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+# tests/test_autoresolve.py
+"""
+Tests for auto-resolve: which fights qualify, what the player pays, the
+cached outcome tables, and the hook in battle().
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import random
+import unittest
+from unittest.mock import patch
+
+import autoresolve
+import io_port
+import messages
+from battle import battle
+from config import CFG
+from models import Player
+from monsters import MonsterGroup, monster_from_spec, template_index
+
+
+def _strong():
+    return Player(row=0, col=0, hp=80, hp_max=80, atk_min=20, atk_max=25)
+
+
+def _slime(level=1):
+    return monster_from_spec(template_index("Cute Slime"), level, False)
+
+
+class TestTryResolve(unittest.TestCase):
+    def setUp(self):
+        self.cfg = patch.dict(CFG["autoresolve"], {"enabled": True, "max_loss": 0.01, "samples": 50})
+        self.cfg.start()
+
+    def tearDown(self):
+        self.cfg.stop()
+
+    def test_disabled_by_default(self):
+        with patch.dict(CFG["autoresolve"], {"enabled": False}):
+            self.assertIsNone(autoresolve.try_resolve(_strong(), _slime()))
+
+    def test_easy_fight_is_settled(self):
+        p, m = _strong(), _slime()
+        random.seed(3)
+        res = autoresolve.try_resolve(p, m)
+        self.assertIsNotNone(res)
+        self.assertEqual(m.hp, 0)
+        self.assertEqual(p.exp, 5)
+        self.assertTrue(res.summary.startswith("Auto-resolved: Cute Slime (Lv 1) defeated"))
+        self.assertNotIn("\n", res.summary)
+        self.assertEqual(p.hp_max - p.hp, -int(res.summary.split("HP ")[1].split(",")[0]))
+
+    def test_risky_fight_is_played(self):
+        p = Player(row=0, col=0, hp=3, potions=0)
+        m = monster_from_spec(template_index("Specter"), 5, True)
+        self.assertIsNone(autoresolve.try_resolve(p, m))
+        self.assertEqual((p.hp, p.exp), (3, 0))
+
+    def test_groups_mimics_and_wounded_monsters_are_played(self):
+        mimic = _slime()
+        mimic.name = "Cute Slime Mimic"
+        wounded = _slime()
+        wounded.hp -= 1
+        for m in (MonsterGroup([_slime(), _slime()]), mimic, wounded):
+            self.assertIsNone(autoresolve.try_resolve(_strong(), m))
+
+    def test_tables_are_cached_and_leave_the_rng_alone(self):
+        autoresolve.outcome_table.cache_clear()
+        random.seed(1)
+        state = random.getstate()
+        first = autoresolve._table_for(_strong(), _slime())
+        self.assertEqual(random.getstate(), state)
+        self.assertIs(autoresolve._table_for(_strong(), _slime()), first)
+        self.assertEqual(autoresolve.outcome_table.cache_info().hits, 1)
+        self.assertEqual(len(first.rows), 50)
+        self.assertEqual(first.loss_p, 0.0)
+
+
+class TestBattleHook(unittest.TestCase):
+    def test_battle_returns_without_a_prompt(self):
+        sink = messages.BufferSink()
+        with patch.dict(CFG["autoresolve"], {"enabled": True, "samples": 20}), \
+                messages.use(messages.Messages([sink])), io_port.use(io_port.ScriptPort([])):
+            self.assertEqual(battle(_strong(), _slime()), "win")
+        self.assertIn("Auto-resolved", sink.text())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# tests/test_batch.py
+"""
+Tests for the scripted batch driver: the real game loop on a ScriptPort,
+with no sleeps, clears or terminal.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import unittest
+from unittest.mock import patch
+
+import io_port
+from batch import run_batch, run_script
+from config import CFG
+
+NO_FIGHTS = {"encounters": {"rate": 0.0}}
+
+
+class TestScriptPort(unittest.TestCase):
+    def test_answers_in_order_then_eof(self):
+        port = io_port.ScriptPort(["a", ""], echo=False)
+        with io_port.use(port):
+            self.assertEqual(io_port.ask("> "), "a")
+            io_port.wait("Press Enter")          # takes no line
+            self.assertEqual(io_port.ask("> "), "")
+            with self.assertRaises(EOFError):
+                io_port.ask("> ")
+        self.assertEqual(port.asked, 2)
+
+    def test_read_script(self):
+        self.assertEqual(io_port.read_script("# moves\nddd\n\nq\n"), ["ddd", "", "q"])
+
+
+class TestRunScript(unittest.TestCase):
+    def test_quit(self):
+        res = run_script(["d", "q"], seed=1, overrides=NO_FIGHTS)
+        self.assertEqual((res.outcome, res.floor, res.prompts), ("quit", 1, 2))
+        self.assertIn("You have quit the game. Goodbye!", res.transcript)
+        self.assertIn("> q", res.transcript)     # prompts and answers are echoed
+
+    def test_no_sleep_clear_or_save_in_cwd(self):
+        fight = {"encounters": {"rate": 1.0}}
+        script = ["t"] + ["d", "a", "a", "a", "a", "a", "a"] * 5
+        with patch("time.sleep", side_effect=AssertionError("slept")), \
+             patch("os.system", side_effect=AssertionError("cleared")), \
+             patch("builtins.input", side_effect=AssertionError("read stdin")):
+            res = run_script(script, seed=3, overrides=fight)
+        self.assertIn("Game saved.", res.transcript)
+        self.assertIn("appeared!", res.transcript)
+        self.assertFalse(os.path.exists("save.json"))
+
+    def test_script_running_out_is_eof(self):
+        self.assertEqual(run_script(["d"], overrides=NO_FIGHTS).outcome, "eof")
+
+    def test_same_seed_same_session(self):
+        script = ["dddd", "ssss", "aaaa", "wwww"] * 3 + ["a"] * 20
+        a, b = run_script(script, seed=7), run_script(script, seed=7)
+        self.assertEqual((a.outcome, a.transcript), (b.outcome, b.transcript))
+
+    def test_overrides_are_restored(self):
+        rate = CFG["encounters"]["rate"]
+        run_script(["q"], overrides=NO_FIGHTS)
+        self.assertEqual(CFG["encounters"]["rate"], rate)
+
+
+class TestRunBatch(unittest.TestCase):
+    def test_workers_match_in_process(self):
+        scripts = {"walk": ["dddd", "ssss", "q"], "quit": ["q"]}
+        serial = run_batch(scripts, range(3), workers=1, overrides=NO_FIGHTS)
+        parallel = run_batch(scripts, range(3), workers=2, overrides=NO_FIGHTS)
+        self.assertEqual(len(serial), 6)
+        self.assertEqual([(r.name, r.seed, r.outcome, r.transcript) for r in serial],
+                         [(r.name, r.seed, r.outcome, r.transcript) for r in parallel])
+
+
+if __name__ == "__main__":
+    unittest.main()
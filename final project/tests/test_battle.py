@@ -17,7 +17,7 @@ import unittest
 
 from unittest.mock import patch
 from models import Player
-from monsters import Monster
+from monsters import Monster, MonsterGroup
 from battle import battle
 
 
@@ -105,7 +105,23 @@ class TestBattle(unittest.TestCase):
         printed = " ".join(" ".join(map(str, c.args)) for c in mock_print.call_args_list)
         self.assertIn("ESCAPE FAILED", printed.upper())
 
-    
+
+    def test_group_battle_asks_for_targets(self):
+        """Attack member 2, then member 1; both must fall and EXP is summed."""
+        player = Player(row=1, col=1)
+        player.crit_chance = 0.0   # crits print a different hit line
+        group = MonsterGroup([Monster(name="Slime", level=1, hp=1, atk_min=0, atk_max=0),
+                              Monster(name="Bat", level=1, hp=1, atk_min=0, atk_max=0)])
+
+        with patch("builtins.input", side_effect=["a", "2", "a"]), \
+             patch("builtins.print", wraps=builtins.print) as mock_print:
+            result = battle(player, group)
+
+        printed = " ".join(" ".join(map(str, c.args)) for c in mock_print.call_args_list)
+        self.assertEqual(result, "win")
+        self.assertIn("You hit the Bat", printed)
+        self.assertIn("You hit the Slime", printed)     # last one standing: no target prompt
+        self.assertIn("+10 EXP", printed)                # 5 + 5
 
 
 if __name__ == "__main__":
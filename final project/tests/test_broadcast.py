@@ -0,0 +1,221 @@
+# tests/test_broadcast.py
+"""
+Tests for the spectator broadcast: frame encoding, and a hub with real
+viewers on localhost.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import socket
+import time
+import unittest
+from unittest.mock import patch
+
+import broadcast
+import messages
+from broadcast import (BroadcastHub, BroadcastSink, FrameReader, Screen, _Viewer, diff_rows,
+                       encode_delta, encode_keyframe)
+from entities import EntityLayer, FloorGrid
+from models import Player
+from world import compose_rows, render, status_line
+
+MAZE = ["#####",
+        "#...#",
+        "#.#.#",
+        "#...#",
+        "#####"]
+
+
+def _grid():
+    return FloorGrid([list(row) for row in MAZE], EntityLayer())
+
+
+def _player():
+    return Player(row=1, col=1)
+
+
+def _wait(pred, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not pred():
+        if time.monotonic() > end:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+
+class _StubSocket:
+    """Takes `limit` bytes, then would block."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.data = bytearray()
+
+    def send(self, buf):
+        n = min(len(buf), self.limit - len(self.data))
+        if n <= 0:
+            raise BlockingIOError
+        self.data += bytes(buf[:n])
+        return n
+
+    def close(self):
+        pass
+
+
+class _Client:
+    def __init__(self, hub):
+        self.sock = socket.create_connection(hub.address, timeout=2.0)
+        self.reader, self.screen = FrameReader(), Screen()
+        self.kinds = []
+
+    def read_until(self, seq):
+        while self.screen.seq < seq:
+            data = self.sock.recv(65536)
+            if not data:
+                raise AssertionError("hub closed the connection")
+            for kind, s, payload in self.reader.feed(data):
+                self.kinds.append(kind)
+                self.screen.apply(kind, s, payload)
+        return self.screen
+
+    def close(self):
+        self.sock.close()
+
+
+class TestFrames(unittest.TestCase):
+    def test_keyframe_roundtrip(self):
+        rows = ["#@#", "#.#"]
+        screen = Screen()
+        for kind, seq, payload in FrameReader().feed(encode_keyframe(3, rows, "HP 5/5", "tip")):
+            screen.apply(kind, seq, payload)
+        self.assertEqual((screen.map_rows(), screen.status, screen.tip, screen.seq),
+                         (rows, "HP 5/5", "tip", 3))
+
+    def test_delta_applies_cells_and_optional_fields(self):
+        screen = Screen()
+        frames = encode_keyframe(1, ["#@.#"], "s1", "t1") + \
+            encode_delta(2, diff_rows(["#@.#"], ["#.@#"]), None, "t2", ["You hit it."])
+        reader = FrameReader()
+        # fed a byte at a time: frames are reassembled across reads
+        for i in range(len(frames)):
+            for kind, seq, payload in reader.feed(frames[i:i + 1]):
+                screen.apply(kind, seq, payload)
+        self.assertEqual((screen.map_rows(), screen.status, screen.tip, screen.events),
+                         (["#.@#"], "s1", "t2", ["You hit it."]))
+
+    def test_delta_size_is_proportional_to_change(self):
+        old = ["." * 60] * 30
+        new = list(old)
+        new[5] = "." * 10 + "@" + "." * 49
+        frame = encode_delta(1, diff_rows(old, new), None, None, [])
+        self.assertEqual(len(frame), broadcast.HEADER.size + 1 + 2 + broadcast.CELL.size + 2)
+
+
+class TestHub(unittest.TestCase):
+    def setUp(self):
+        self.hub = BroadcastHub()
+        self.clients = []
+
+    def tearDown(self):
+        for c in self.clients:
+            c.close()
+        self.hub.close()
+
+    def _join(self, n=1):
+        want = self.hub.viewers + n
+        new = [_Client(self.hub) for _ in range(n)]
+        self.clients.extend(new)
+        _wait(lambda: self.hub.viewers == want)
+        return new
+
+    def test_viewers_follow_moves(self):
+        grid, p = _grid(), _player()
+        a, b = self._join(2)
+        self.hub.publish(grid, p, 1, "start")
+        p.col = 2
+        frame = self.hub.publish(grid, p, 1, "start")
+        self.assertEqual(frame[:1], b"D")
+        for c in (a, b):
+            screen = c.read_until(2)
+            self.assertEqual(screen.map_rows(), compose_rows(grid, p))
+            self.assertEqual(screen.status, status_line(p, 1))
+        self.assertEqual(a.kinds, ["K", "D"])
+
+    def test_frame_encoded_once_for_all_viewers(self):
+        grid, p = _grid(), _player()
+        self._join(3)
+        self.hub.publish(grid, p, 1)
+        p.col = 2
+        with patch("broadcast.encode_delta", wraps=broadcast.encode_delta) as enc:
+            self.hub.publish(grid, p, 1)
+        self.assertEqual(enc.call_count, 1)
+
+    def test_no_change_sends_nothing(self):
+        grid, p = _grid(), _player()
+        self.hub.publish(grid, p, 1)
+        self.assertIsNone(self.hub.publish(grid, p, 1))
+
+    def test_late_joiner_gets_a_keyframe(self):
+        grid, p = _grid(), _player()
+        self.hub.publish(grid, p, 1, "tip")
+        p.row = 2
+        self.hub.publish(grid, p, 1, "tip")
+        (late,) = self._join(1)
+        screen = late.read_until(2)
+        self.assertEqual(late.kinds, ["K"])
+        self.assertEqual((screen.map_rows(), screen.tip), (compose_rows(grid, p), "tip"))
+
+    def test_messages_become_events_but_not_the_map(self):
+        grid, p = _grid(), _player()
+        (c,) = self._join(1)
+        self.hub.publish(grid, p, 1)
+        with messages.use(messages.Messages([BroadcastSink(self.hub)])):
+            render(grid, p, 1)
+            messages.info("The {} hits you for {} damage.", "Bat", 3)
+        self.hub.publish(grid, p, 1)
+        self.assertEqual(c.read_until(2).events, ["The Bat hits you for 3 damage."])
+
+    def test_slow_viewer_is_resynced(self):
+        grid, p = _grid(), _player()
+        (c,) = self._join(1)
+        self.hub.publish(grid, p, 1)
+        with patch("broadcast.MAX_BACKLOG", 0):
+            p.col = 3
+            self.hub.publish(grid, p, 1)
+        self.assertEqual(c.read_until(2).map_rows(), compose_rows(grid, p))
+        self.assertEqual(c.kinds, ["K", "K"])
+
+    def test_resync_finishes_a_partly_sent_frame(self):
+        grid, p = _grid(), _player()
+        self.hub.publish(grid, p, 1)
+        stub = _StubSocket(10)
+        v = _Viewer(stub)                                   # driven by hand, not by the hub thread
+        self.hub._send(v, self.hub._current_keyframe())
+        p.col = 3
+        frame = self.hub.publish(grid, p, 1)
+        with patch("broadcast.MAX_BACKLOG", 0):
+            self.hub._send(v, frame)                        # overflows mid-frame
+        stub.limit = 1 << 20
+        self.hub._flush(v)
+        reader, screen = FrameReader(), Screen()
+        frames = list(reader.feed(bytes(stub.data)))
+        self.assertEqual([kind for kind, _seq, _payload in frames], ["K", "K"])
+        self.assertEqual(len(reader._buf), 0)
+        for frame in frames:
+            screen.apply(*frame)
+        self.assertEqual(screen.map_rows(), compose_rows(grid, p))
+
+    def test_queued_output_is_flushed_without_another_publish(self):
+        grid, p = _grid(), _player()
+        (c,) = self._join(1)
+        self.hub.publish(grid, p, 1)
+        for _ in range(200):                                # a frame far larger than a socket buffer
+            self.hub.event("x" * 60000)
+        with patch("broadcast.MAX_BACKLOG", 1 << 25):
+            p.col = 2
+            self.hub.publish(grid, p, 1)
+        c.sock.settimeout(5.0)
+        self.assertEqual(len(c.read_until(2).events), 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,7 @@
 Tests for chest interactions:
 1) A normal chest where the player chooses to heal.
 2) A Mimic chest encounter with a forced successful escape.
+3) Chest stat boosts keep a valid attack range.
 
 We temporarily modify CFG["treasure"] values and restore them afterwards,
 so normal gameplay settings are unaffected.
@@ -74,5 +75,12 @@ class TestChestEvent(unittest.TestCase):
             CFG["treasure"] = old_cfg
 
 
+class TestBoostRange(unittest.TestCase):
+    def test_atk_min_boost_keeps_valid_range(self):
+        p = Player(row=1, col=1)
+        p.apply_permanent_boosts({"atk_min": p.atk_max - p.atk_min + 2})
+        self.assertGreater(p.atk_max, p.atk_min)
+
+
 if __name__ == "__main__":
     unittest.main()
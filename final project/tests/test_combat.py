@@ -0,0 +1,189 @@
+# tests/test_combat.py
+"""
+Tests for the headless battle rules used by simulators.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import unittest
+from unittest.mock import patch
+
+from combat import (resolve_battle, attack_policy, default_policy, exp_reward, damage_stats,
+                    damage_distribution, strike_preview, _preview_table,
+                    group_strike, after_group_hit, group_turn, group_end_round, member_key, weakest)
+from effects import StatusEngine
+from models import Player
+from monsters import Monster, MonsterGroup, roll_group_size, generate_encounter
+from skills import skill_by_name
+
+
+class TestResolveBattle(unittest.TestCase):
+    def test_win_awards_exp(self):
+        p = Player(row=1, col=1)
+        m = Monster(name="Dummy", level=2, hp=1, atk_min=0, atk_max=0, elite=True)
+        res = resolve_battle(p, m, attack_policy)
+        self.assertEqual(res.outcome, "win")
+        self.assertEqual(res.exp, exp_reward(m))
+        self.assertEqual(res.exp, int((3 + 2 * 2) * 1.6))
+        self.assertEqual((p.level, p.exp), (2, res.exp - 10))
+
+    def test_lose_against_overwhelming_monster(self):
+        p = Player(row=1, col=1)
+        m = Monster(name="Ogre", level=5, hp=999, atk_min=50, atk_max=50)
+        with patch.object(Player, "roll_damage", return_value=(1, False)):
+            res = resolve_battle(p, m, attack_policy)
+        self.assertEqual(res.outcome, "lose")
+        self.assertEqual(res.turns, 1)
+        self.assertEqual(res.hp_lost, 15)
+
+    def test_crit_stuns_monster(self):
+        """A crit each turn keeps the monster from ever acting."""
+        p = Player(row=1, col=1)
+        m = Monster(name="Wall", level=1, hp=10, atk_min=5, atk_max=5)
+        with patch.object(Player, "roll_damage", return_value=(1, True)):
+            res = resolve_battle(p, m, attack_policy)
+        self.assertEqual(res.outcome, "win")
+        self.assertEqual(res.hp_lost, 0)
+
+    def test_default_policy_spends_sp(self):
+        p = Player(row=1, col=1)
+        m = Monster(name="Sack", level=1, hp=40, atk_min=0, atk_max=0)
+        res = resolve_battle(p, m)
+        self.assertEqual(res.outcome, "win")
+        self.assertGreater(res.sp_used, 0)
+
+
+class TestDamagePreview(unittest.TestCase):
+    def test_distribution_matches_enumeration(self):
+        p = Player(row=1, col=1)
+        p.atk_min, p.atk_max, p.crit_chance, p.crit_multiplier = 3, 5, 0.25, 1.5
+        dist = dict(damage_distribution(damage_stats(p), 2.0))
+        # bases 3,4,5 -> x2: 6,8,10; crits int(4.5)=4,6,int(7.5)=7 -> x2: 8,12,14
+        want = {6: 0.25, 8: 0.25 + 1 / 12, 10: 0.25, 12: 1 / 12, 14: 1 / 12}
+        self.assertEqual(set(dist), set(want))
+        for d, pr in want.items():
+            self.assertAlmostEqual(dist[d], pr)
+
+    def test_expected_damage_and_kill_chance(self):
+        p = Player(row=1, col=1)
+        p.atk_min, p.atk_max, p.crit_chance = 2, 4, 0.0
+        m = Monster(name="Dummy", level=1, hp=4, atk_min=1, atk_max=1)
+        avg, kill = strike_preview(p, m)
+        self.assertAlmostEqual(avg, 3.0)
+        self.assertAlmostEqual(kill, 1 / 3)
+        m.hp = 3
+        self.assertAlmostEqual(strike_preview(p, m)[1], 2 / 3)
+        m.hp = 5
+        self.assertEqual(strike_preview(p, m)[1], 0.0)
+
+    def test_status_bonus_shifts_the_preview(self):
+        p = Player(row=1, col=1)
+        p.atk_min, p.atk_max, p.crit_chance = 2, 4, 0.0
+        m = Monster(name="Dummy", level=1, hp=6, atk_min=1, atk_max=1)
+        self.assertEqual(strike_preview(p, m)[1], 0.0)
+        avg, kill = strike_preview(p, m, bonus=2)                    # rage
+        self.assertAlmostEqual(avg, 5.0)
+        self.assertAlmostEqual(kill, 1 / 3)
+        self.assertAlmostEqual(strike_preview(p, m, bonus=-3)[0], 1 / 3)  # weaken, floored at 0
+
+    def test_cached_until_stats_change(self):
+        p = Player(row=1, col=1)
+        m = Monster(name="Dummy", level=1, hp=9, atk_min=1, atk_max=1)
+        strike_preview(p, m)
+        hits = _preview_table.cache_info().hits
+        m.hp = 3
+        strike_preview(p, m)                     # monster HP is not part of the key
+        self.assertEqual(_preview_table.cache_info().hits, hits + 1)
+        p.apply_permanent_boosts({"atk_max": 2})
+        misses = _preview_table.cache_info().misses
+        strike_preview(p, m)
+        self.assertEqual(_preview_table.cache_info().misses, misses + 1)
+
+
+def _dummies(*hps, atk=(1, 1)):
+    return MonsterGroup([Monster(name=f"Dummy{i}", level=1, hp=hp, atk_min=atk[0], atk_max=atk[1])
+                         for i, hp in enumerate(hps)])
+
+
+class TestGroups(unittest.TestCase):
+    def setUp(self):
+        self.p = Player(row=1, col=1)
+        self.p.crit_chance = 0.0
+        self.p.atk_min = self.p.atk_max = 5
+
+    def test_aoe_hits_every_living_member(self):
+        g = _dummies(10, 0, 3)
+        dmg, _crit, hit = group_strike(self.p, g, 0, skill_by_name("Whirlwind"))
+        self.assertEqual((dmg, hit), (5, [0, 2]))
+        self.assertEqual(list(g.hp), [5, 0, -2])
+        self.assertEqual(g.alive(), [0])
+
+    def test_single_target(self):
+        g = _dummies(10, 10)
+        group_strike(self.p, g, 1)
+        self.assertEqual(list(g.hp), [10, 5])
+        self.assertEqual(weakest(g), 1)
+
+    def test_retaliation_skips_dead_and_stunned(self):
+        g = _dummies(5, 0, 5, 5, atk=(2, 2))
+        s = StatusEngine()
+        with patch("random.random", return_value=0.0):
+            after_group_hit(s, g, [2], None, True)   # crit stuns member 2
+        hp = self.p.hp
+        dmg, _inflicted = group_turn(s, g, self.p)
+        self.assertEqual(dmg, [2, 0, 0, 2])
+        self.assertEqual(self.p.hp, hp - 4)
+        group_end_round(s, self.p, g)
+        self.assertEqual(group_turn(s, g, self.p)[0], [2, 0, 2, 2])
+
+    def test_group_stuns_live_in_the_status_engine(self):
+        g = _dummies(5, 5)
+        s = StatusEngine()
+        after_group_hit(s, g, [0, 1], skill_by_name("Guard Break"), False)
+        self.assertEqual([s.active(member_key(i)) for i in range(2)], [["stun"], ["stun"]])
+        events = group_end_round(s, self.p, g)
+        self.assertIn((member_key(0), "expired", "stun"), events)
+        self.assertFalse(s.stunned(member_key(0)))
+
+    def test_poison_ticks_each_member(self):
+        g = _dummies(10, 10)
+        s = StatusEngine()
+        skill = skill_by_name("Venom Edge")
+        after_group_hit(s, g, [0], skill, False)
+        group_end_round(s, self.p, g)
+        self.assertEqual(list(g.hp), [8, 10])
+
+    def test_group_exp_is_the_sum(self):
+        members = [Monster(name="A", level=2, hp=1, atk_min=0, atk_max=0),
+                   Monster(name="B", level=3, hp=1, atk_min=0, atk_max=0, elite=True)]
+        self.assertEqual(exp_reward(MonsterGroup(members)), sum(map(exp_reward, members)))
+
+    def test_resolve_group_battle(self):
+        g = _dummies(4, 4, 4, atk=(0, 0))
+        res = resolve_battle(self.p, g, award_exp=False)
+        self.assertEqual(res.outcome, "win")
+        self.assertEqual(res.turns, 1)     # Whirlwind: 5 damage to all three
+        self.assertEqual(res.exp, 3 * exp_reward(Monster("A", 1, 1, 0, 0)))
+
+    def test_default_policy_prefers_aoe_against_groups_only(self):
+        g = _dummies(10, 10)
+        self.assertEqual(default_policy(self.p, g), ("s", skill_by_name("Whirlwind")))
+        self.assertNotEqual(default_policy(self.p, g.member(0)), ("s", skill_by_name("Whirlwind")))
+
+    def test_size_rolls(self):
+        with patch("random.random", side_effect=AssertionError("no roll")):
+            self.assertEqual(roll_group_size(1), 1)         # floor 1: always single
+            self.assertEqual(roll_group_size(5, group_max=1), 1)
+        with patch("random.random", return_value=0.0):
+            self.assertEqual(roll_group_size(5), 8)
+            g = generate_encounter(5, group_max=3)
+        self.assertIsInstance(g, MonsterGroup)
+        self.assertEqual(len(g), 3)
+        self.assertFalse(any(g.elite))
+        with self.assertRaises(ValueError):
+            MonsterGroup([])
+
+
+if __name__ == "__main__":
+    unittest.main()
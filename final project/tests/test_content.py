@@ -0,0 +1,155 @@
+# tests/test_content.py
+"""
+Tests for content packs: the shipped base pack, layering of server packs,
+validation errors, and the compiled cache.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import config
+import content
+from content import ContentError, load
+from monsters import generate_monster, templates
+from skills import all_skills
+
+
+class _Packs:
+    """A temporary pack root holding a copy of the base pack plus extra packs."""
+
+    def __init__(self):
+        self.root = tempfile.mkdtemp()
+        shutil.copytree(os.path.join(content.HERE, "content", "base"), os.path.join(self.root, "base"))
+
+    def write(self, pack: str, kind: str, data) -> None:
+        os.makedirs(os.path.join(self.root, pack), exist_ok=True)
+        with open(os.path.join(self.root, pack, kind + ".json"), "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def section(self, *packs: str) -> dict:
+        return {"dir": self.root, "packs": list(packs or ("base",))}
+
+    def close(self) -> None:
+        shutil.rmtree(self.root)
+
+
+class TestBasePack(unittest.TestCase):
+    def test_defines_the_game(self):
+        c = content.current()
+        self.assertIs(templates(), c.monsters)
+        self.assertEqual([s.name for s in all_skills()][:3], ["Power Strike", "Double Slash", "Guard Break"])
+        self.assertEqual(c.monsters[c.monster_index["Bat Ghost"]]["on_hit"], ("weaken", 0.25))
+        self.assertEqual(c.treasure["mimic_chance"], 0.30)
+
+    def test_floor_pools_are_indexed(self):
+        c = content.current()
+        idx, weights = c.floor_pools[1]
+        self.assertEqual([c.monsters[i]["name"] for i in idx], ["Cute Slime", "Bat Ghost"])
+        self.assertEqual(weights, (5, 4))
+        self.assertIn(generate_monster(1).name, ("Cute Slime", "Bat Ghost"))
+
+
+class TestLayering(unittest.TestCase):
+    def setUp(self):
+        self.packs = _Packs()
+        content.reset()
+
+    def tearDown(self):
+        self.packs.close()
+        content.reset()
+
+    def test_server_pack_overrides_by_name(self):
+        self.packs.write("server", "monsters", [
+            {"name": "Skeleton", "base_hp": 99, "base_atk_min": 1, "base_atk_max": 2, "floors": [2], "weight": 1},
+            {"name": "Wyrm", "base_hp": 40, "base_atk_min": 5, "base_atk_max": 9, "floors": [5, 6], "weight": 1},
+        ])
+        self.packs.write("server", "treasure", {"mimic_chance": 0.5})
+        c = load(self.packs.section("base", "server"), use_cache=False)
+        names = [m["name"] for m in c.monsters]
+        self.assertEqual(names.index("Skeleton"), 2)               # replaced in place
+        self.assertEqual(c.monsters[2]["base_hp"], 99)
+        self.assertEqual(names[-1], "Wyrm")                        # appended
+        self.assertEqual(c.floor_pools[6], ((len(names) - 1,), (1,)))
+        self.assertEqual((c.treasure["mimic_chance"], c.treasure["heal_rate"]), (0.5, 0.30))
+
+    def test_server_treasure_reaches_the_config(self):
+        self.packs.write("server", "treasure", {"mimic_chance": 0.9})
+        with patch.dict(config._DEFAULTS["content"], self.packs.section("base", "server")):
+            cfg = config.load_config()
+        self.assertEqual(cfg["treasure"]["mimic_chance"], 0.9)
+        self.assertEqual(cfg["treasure"]["heal_rate"], 0.30)
+
+    def test_validation_names_file_and_entry(self):
+        cases = [
+            [{"name": "X", "base_hp": 1, "base_atk_min": 1, "base_atk_max": 2, "floors": [1], "weight": 1,
+              "hp": 3}],
+            [{"name": "X", "base_hp": 1, "base_atk_min": 3, "base_atk_max": 2, "floors": [1], "weight": 1}],
+            [{"name": "X", "base_hp": 1, "base_atk_min": 1, "base_atk_max": 2, "floors": [1], "weight": 1,
+              "on_hit": ["frostbite", 0.5]}],
+            [{"name": "X", "base_hp": 1, "base_atk_min": 1, "base_atk_max": 2, "floors": [1], "weight": 1}] * 2,
+        ]
+        for bad in cases:
+            self.packs.write("bad", "monsters", bad)
+            with self.assertRaises(ContentError) as cm:
+                load(self.packs.section("base", "bad"), use_cache=False)
+            self.assertIn("monsters.json", str(cm.exception))
+
+    def test_bad_skill_and_treasure(self):
+        self.packs.write("bad", "skills", [{"name": "Zap", "cost": 2, "multiplier": 1.0,
+                                            "effects": [["stun", "everyone"]]}])
+        with self.assertRaises(ContentError):
+            load(self.packs.section("base", "bad"), use_cache=False)
+        self.packs.write("worse", "treasure", {"mimic_chanse": 0.1})
+        with self.assertRaises(ContentError):
+            load(self.packs.section("base", "worse"), use_cache=False)
+
+    def test_missing_pack(self):
+        with self.assertRaises(ContentError):
+            load(self.packs.section("base", "nope"))
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.packs = _Packs()
+        content.reset()
+
+    def tearDown(self):
+        self.packs.close()
+        content.reset()
+
+    def test_second_start_reads_the_cache(self):
+        first = load(self.packs.section())
+        content.reset()                                            # a fresh process
+        second = load(self.packs.section())
+        self.assertEqual((first.from_cache, second.from_cache), (False, True))
+        self.assertEqual(second.monsters, first.monsters)
+        self.assertEqual(second.skills, first.skills)
+
+    def test_edited_file_misses_the_cache(self):
+        first = load(self.packs.section())
+        self.packs.write("base", "treasure", {"mimic_chance": 0.1})
+        content.reset()
+        second = load(self.packs.section())
+        self.assertNotEqual(first.key, second.key)
+        self.assertFalse(second.from_cache)
+        self.assertEqual(second.treasure, {"mimic_chance": 0.1})
+
+    def test_corrupt_cache_is_recompiled(self):
+        section = self.packs.section()
+        first = load(section)
+        with open(content._cache_path(section, first.key), "wb") as f:
+            f.write(b"\x00garbage")
+        content.reset()
+        again = load(section)
+        self.assertFalse(again.from_cache)
+        self.assertEqual(again.monsters, first.monsters)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+# tests/test_effects.py
+"""
+Tests for the status effect engine and its place in the battle rules.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import unittest
+
+from effects import StatusEngine, PLAYER, MONSTER
+from combat import after_player_hit, monster_turn, end_round, resolve_battle, attack_policy
+from models import Player
+from monsters import Monster
+from skills import Skill
+
+
+class Dummy:
+    def __init__(self, hp, hp_max=None):
+        self.hp = hp
+        if hp_max is not None:
+            self.hp_max = hp_max
+
+
+class TestStatusEngine(unittest.TestCase):
+    def test_stun_lasts_one_round(self):
+        s = StatusEngine()
+        s.apply(MONSTER, "stun")
+        self.assertTrue(s.stunned(MONSTER))
+        events = s.end_round({MONSTER: Dummy(10)})
+        self.assertFalse(s.stunned(MONSTER))
+        self.assertEqual(events, [(MONSTER, "expired", "stun")])
+
+    def test_expiry_in_duration_order(self):
+        s = StatusEngine()
+        s.apply(PLAYER, "rage")       # 3 rounds
+        s.apply(PLAYER, "weaken")     # 2 rounds
+        self.assertEqual(s.atk_mod(PLAYER), 0)
+        s.end_round({})
+        self.assertEqual(s.end_round({}), [(PLAYER, "expired", "weaken")])
+        self.assertEqual(s.atk_mod(PLAYER), 2)
+        self.assertEqual(s.end_round({}), [(PLAYER, "expired", "rage")])
+        self.assertEqual(s.atk_mod(PLAYER), 0)
+        self.assertEqual(s.active(PLAYER), [])
+
+    def test_refresh_does_not_stack(self):
+        s = StatusEngine()
+        s.apply(PLAYER, "regen")
+        s.end_round({})
+        s.apply(PLAYER, "regen")      # refreshed: 3 more rounds from now, still +3
+        p = Dummy(1, hp_max=100)
+        for _ in range(3):
+            s.end_round({PLAYER: p})
+        self.assertEqual(p.hp, 10)
+        self.assertEqual(s.active(PLAYER), [])
+
+    def test_poison_stacks(self):
+        s = StatusEngine()
+        s.apply(MONSTER, "poison")
+        s.apply(MONSTER, "poison")
+        m = Dummy(20)
+        self.assertEqual(s.end_round({MONSTER: m}), [(MONSTER, "hp", -4)])
+        s.end_round({MONSTER: m})
+        events = s.end_round({MONSTER: m})
+        self.assertEqual(m.hp, 8)
+        self.assertIn((MONSTER, "expired", "poison"), events)
+        self.assertEqual(s.end_round({MONSTER: m}), [])
+
+    def test_ticks_are_clamped(self):
+        s = StatusEngine()
+        s.apply(PLAYER, "regen")
+        s.apply(MONSTER, "poison")
+        p, m = Dummy(9, hp_max=10), Dummy(1)
+        events = s.end_round({PLAYER: p, MONSTER: m})
+        self.assertEqual((p.hp, m.hp), (10, 0))
+        self.assertEqual(events, [(PLAYER, "hp", 1), (MONSTER, "hp", -1)])
+
+
+class TestBattleEffects(unittest.TestCase):
+    def setUp(self):
+        self.p = Player(row=1, col=1)
+        self.m = Monster("Dummy", 1, hp=30, atk_min=1, atk_max=1)
+
+    def test_crit_stun_skips_one_monster_turn(self):
+        s = StatusEngine()
+        self.assertEqual(after_player_hit(s, self.m, None, True), [(MONSTER, "stun")])
+        self.assertEqual(monster_turn(s, self.m, self.p), (None, None))
+        end_round(s, self.p, self.m)
+        dmg, _eff = monster_turn(s, self.m, self.p)
+        self.assertEqual(dmg, 1)
+
+    def test_enemy_effects_need_a_living_target(self):
+        s = StatusEngine()
+        sk = Skill("Test Venom", 0, 1.0, "", effects=(("poison", "enemy"), ("rage", "self")))
+        self.m.hp = 0
+        self.assertEqual(after_player_hit(s, self.m, sk, False), [(PLAYER, "rage")])
+
+    def test_stun_skill_and_crit_stun_once(self):
+        s = StatusEngine()
+        sk = Skill("Test Bash", 0, 1.0, "", stun=True)
+        self.assertEqual(after_player_hit(s, self.m, sk, True), [(MONSTER, "stun")])
+
+    def test_monster_on_hit(self):
+        s = StatusEngine()
+        self.m.on_hit = ("weaken", 1.0)
+        self.assertEqual(monster_turn(s, self.m, self.p), (1, "weaken"))
+        self.assertEqual(s.atk_mod(PLAYER), -2)
+
+    def test_knockout_skips_the_next_player_action(self):
+        s = StatusEngine()
+        self.m.on_hit = ("knockout", 1.0)
+        monster_turn(s, self.m, self.p)
+        end_round(s, self.p, self.m)
+        self.assertTrue(s.stunned(PLAYER))
+        end_round(s, self.p, self.m)
+        self.assertFalse(s.stunned(PLAYER))
+
+    def test_stunned_player_loses_actions(self):
+        calls = []
+
+        def policy(player, monster):
+            calls.append(1)
+            return "a"
+
+        # every hit refreshes the knockout, so the player only acts once
+        self.m.on_hit = ("knockout", 1.0)
+        self.m.hp, self.m.atk_min, self.m.atk_max = 10_000, 0, 0
+        self.p.crit_chance = 0.0
+        res = resolve_battle(self.p, self.m, policy, max_turns=6)
+        self.assertEqual((len(calls), res.turns), (1, 6))
+
+    def test_resolve_battle_with_poison(self):
+        sk = Skill("Test Slow Venom", 0, 0.0, "", effects=(("poison", "enemy"),))
+        self.m.hp, self.m.atk_min, self.m.atk_max = 6, 0, 0
+        res = resolve_battle(self.p, self.m, lambda p, m: ("s", sk), award_exp=False)
+        self.assertEqual(res.outcome, "win")
+        self.assertEqual(res.turns, 2)   # 2 stacks after round 1 tick -2, round 2 tick -4
+
+    def test_attack_policy_unchanged_without_effects(self):
+        res = resolve_battle(self.p, Monster("Dummy", 1, hp=1, atk_min=0, atk_max=0), attack_policy)
+        self.assertEqual((res.outcome, res.turns), ("win", 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
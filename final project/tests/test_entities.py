@@ -0,0 +1,143 @@
+# tests/test_entities.py
+"""
+Tests for the entity layer, its spatial queries and how the floor,
+chest, render and save code use it.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import io
+import json
+import random
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from config import CFG
+from entities import EntityLayer, FloorGrid, tile_at
+from events import chest_event
+from models import Player
+from save_load import save_game, load_game
+from world import load_floor, choose_spawn, render
+
+
+class TestEntityLayer(unittest.TestCase):
+    def test_point_rect_radius_queries(self):
+        layer = EntityLayer(bucket=4)
+        a = layer.add("chest", 2, 2)
+        b = layer.add("chest", 2, 2)
+        c = layer.add("exit", 9, 9)
+        self.assertEqual(layer.at(2, 2), [a, b])
+        self.assertIs(layer.first(9, 9), c)
+        self.assertEqual(set(layer.in_rect(0, 0, 5, 5)), {a, b})
+        self.assertEqual(set(layer.in_radius(8, 8, 1.5)), {c})
+        self.assertEqual(list(layer.in_radius(8, 8, 1.0)), [])
+        layer.move(c, 3, 3)
+        self.assertEqual(set(layer.in_rect(0, 0, 5, 5)), {a, b, c})
+        layer.remove(a)
+        self.assertEqual(len(layer), 2)
+        self.assertEqual(layer.of_kind("chest"), [b])
+
+    def test_queries_match_brute_force_at_scale(self):
+        rng = random.Random(5)
+        layer = EntityLayer()
+        for _ in range(3000):
+            layer.add("chest", rng.randrange(200), rng.randrange(200))
+        want = {e for e in layer if (e.row - 50) ** 2 + (e.col - 70) ** 2 <= 100}
+        self.assertEqual(set(layer.in_radius(50, 70, 10)), want)
+        self.assertEqual(len(layer), 3000)
+
+    def test_remove_keeps_kind_index_consistent(self):
+        layer = EntityLayer()
+        chests = [layer.add("chest", r, c) for r in range(20) for c in range(20)]
+        random.seed(1)
+        random.shuffle(chests)
+        for e in chests[:300]:
+            layer.remove(e)
+        left = layer.of_kind("chest")
+        self.assertEqual(len(left), 100)
+        self.assertEqual({id(e) for e in left}, {id(e) for e in chests[300:]})
+        self.assertEqual([e.slot for e in left], list(range(100)))
+
+    def test_freeze_rebuilds_only_changed_buckets(self):
+        layer = EntityLayer()
+        for i in range(64):
+            layer.add("chest", i, i)
+        before = layer.freeze()
+        e = layer.first(0, 0)
+        layer.move(e, 1, 2)  # stays in bucket (0, 0)
+        after = layer.freeze()
+        self.assertIsNot(before, after)
+        old = dict(before)
+        changed = [b for b, image in after if old.get(b) is not image]
+        self.assertEqual(changed, [(0, 0)])
+        layer.thaw(before)
+        self.assertEqual(layer.first(0, 0).kind, "chest")
+        self.assertIsNone(layer.first(1, 2))
+        self.assertEqual(len(layer.of_kind("chest")), 64)
+
+
+class TestFloorEntities(unittest.TestCase):
+    def setUp(self):
+        random.seed(3)
+        self.grid = load_floor(1)
+        self.player = Player(row=1, col=1)
+        self.player.row, self.player.col = choose_spawn(self.grid)
+
+    def test_objects_live_in_layer_not_terrain(self):
+        layer = self.grid.entities
+        self.assertEqual(len(layer.of_kind("exit")), 1)
+        self.assertEqual(len(layer.of_kind("chest")), int(CFG["treasure"]["chest_per_floor"]))
+        self.assertFalse(any(ch in "CE" for row in self.grid for ch in row))
+        e = layer.of_kind("exit")[0]
+        self.assertEqual(tile_at(self.grid, e.row, e.col), "E")
+
+    def test_render_draws_entities(self):
+        e = self.grid.entities.of_kind("exit")[0]
+        out = io.StringIO()
+        with redirect_stdout(out), patch.dict(CFG["world"], {"fog": False}):
+            render(self.grid, self.player, 1)
+        self.assertEqual(out.getvalue().splitlines()[e.row][e.col], "E")
+
+    def test_chest_event_removes_entity(self):
+        chest = self.grid.entities.of_kind("chest")[0]
+        old = CFG["treasure"]["mimic_chance"]
+        try:
+            CFG["treasure"]["mimic_chance"] = 0.0
+            with patch("builtins.input", return_value="1"), patch("builtins.print"):
+                _msg, consumed = chest_event(self.player, 1, self.grid, chest.row, chest.col)
+        finally:
+            CFG["treasure"]["mimic_chance"] = old
+        self.assertTrue(consumed)
+        self.assertIsNone(self.grid.entities.first(chest.row, chest.col))
+
+    def test_save_roundtrip_and_legacy_migration(self):
+        fd, path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            with patch("builtins.print"):
+                save_game(self.player, 1, self.grid, path=path)
+                _p, _f, g2 = load_game(path=path)
+            self.assertEqual(sorted((e.kind, e.pos) for e in g2.entities),
+                             sorted((e.kind, e.pos) for e in self.grid.entities))
+
+            # A pre-entity save: chests and exit baked into the grid, no "entities" key
+            legacy = [row[:] for row in self.grid]
+            for e in self.grid.entities:
+                legacy[e.row][e.col] = e.glyph
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"floor": 1, "player": self.player.to_dict(), "grid": legacy}, f)
+            with patch("builtins.print"):
+                _p, _f, g3 = load_game(path=path)
+            self.assertIsInstance(g3, FloorGrid)
+            self.assertEqual(sorted((e.kind, e.pos) for e in g3.entities),
+                             sorted((e.kind, e.pos) for e in self.grid.entities))
+            self.assertEqual(list(g3), list(self.grid))
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# tests/test_floorqa.py
+"""
+Tests for the floor generator QA tool: invariants, metrics and the
+failing-seed corpus.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from config import CFG
+from entities import FloorGrid
+from floorqa import check_floor, check_seed, run_batch, write_corpus, recheck, METRICS
+
+
+def _corridor() -> FloorGrid:
+    g = FloorGrid([["#"] * 9, ["#"] + ["."] * 7 + ["#"], ["#"] * 9])
+    g.entities.add("exit", 1, 7)
+    g.entities.add("chest", 1, 4)
+    return g
+
+
+class TestCheckFloor(unittest.TestCase):
+    def test_good_corridor(self):
+        rep = check_floor(_corridor(), (1, 1))
+        self.assertEqual(rep.failures, ())
+        self.assertEqual(rep.path_len, 6)
+        self.assertEqual(rep.chest_detour, 0)
+        self.assertEqual(rep.dead_end_pct, 25)   # both corridor ends, out of 7 cells
+
+    def test_broken_floors_are_named(self):
+        g = _corridor()
+        g[1][5] = "#"                            # cuts the exit off
+        g.entities.add("chest", 1, 1)            # and a chest on the spawn
+        rep = check_floor(g, (1, 1))
+        for name in ("perfect_maze", "exit_reachable", "spawn_clear", "chest_count"):
+            self.assertIn(name, rep.failures)
+
+    def test_loop_is_not_a_perfect_maze(self):
+        g = FloorGrid([["#"] * 5, ["#", ".", ".", ".", "#"], ["#", ".", "#", ".", "#"],
+                       ["#", ".", ".", ".", "#"], ["#"] * 5])
+        g.entities.add("exit", 3, 3)
+        g.entities.add("chest", 1, 3)
+        rep = check_floor(g, (1, 1), min_exit_distance=1)
+        self.assertEqual(rep.failures, ("perfect_maze",))
+
+
+class TestSeeds(unittest.TestCase):
+    def test_generated_floors_pass(self):
+        for seed in range(200):
+            self.assertEqual(check_seed(seed).failures, (), seed)
+
+    def test_batch_and_corpus(self):
+        s = run_batch(40, start=5, workers=1)
+        for m in METRICS:
+            self.assertEqual(sum(s["histograms"][m].values()), 40)
+        self.assertEqual(s["failing_seeds"], [])
+
+        old = CFG["treasure"]["chest_per_floor"]
+        try:
+            CFG["treasure"]["chest_per_floor"] = 2
+            with patch("world._chest_count", return_value=1):   # a generator that places too few
+                s = run_batch(6, workers=1)
+            self.assertEqual(s["failures"], {"chest_count": 6})
+            with tempfile.TemporaryDirectory() as tmp:
+                path = write_corpus(s["failing_seeds"], os.path.join(tmp, "corpus.jsonl"))
+                with patch("world._chest_count", return_value=1):
+                    self.assertEqual([r.seed for r in recheck(path)], list(range(6)))
+                self.assertEqual(recheck(path), [])      # fixed generator: corpus passes
+        finally:
+            CFG["treasure"]["chest_per_floor"] = old
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+# tests/test_fog.py
+"""
+Tests for fog of war: line of sight, incremental updates, the packed
+explored bitmap in saves, and fogged rendering.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import messages
+from config import CFG
+from entities import EntityLayer, FloorGrid
+from fog import FOG_GLYPH, Fog, fog_of, look, pack_bits, sight_table, unpack_bits
+from models import Player
+from roaming import RoamingPack
+from save_load import load_game, save_game
+from world import compose_rows, render, try_move
+
+#            0123456789
+CORRIDOR = ["##########",
+            "#........#",
+            "#####.####",
+            "#........#",
+            "##########"]
+
+
+def _grid():
+    return FloorGrid([list(row) for row in CORRIDOR], EntityLayer())
+
+
+class TestSight(unittest.TestCase):
+    def test_table_is_a_disk_nearest_first(self):
+        rays = sight_table(3)
+        self.assertEqual(rays[0][:2], (0, 0))
+        self.assertTrue(all(dr * dr + dc * dc <= 9 for dr, dc, _ in rays))
+        self.assertIn((3, 0, ((1, 0), (2, 0))), rays)
+
+    def test_walls_block_line_of_sight(self):
+        g = _grid()
+        fog = Fog(len(g), len(g[0]), 3)
+        seen = fog.visible_from(g, 1, 1)
+        w = len(g[0])
+        self.assertIn(1 * w + 4, seen)        # along the corridor
+        self.assertIn(2 * w + 1, seen)        # the wall itself is seen
+        self.assertNotIn(3 * w + 1, seen)     # behind the wall
+        self.assertNotIn(1 * w + 5, seen)     # out of radius
+
+    def test_update_reports_only_new_cells(self):
+        g = _grid()
+        fog = Fog(len(g), len(g[0]), 3)
+        first = fog.update(g, 1, 1)
+        self.assertEqual(sorted(first), sorted(fog.visible))
+        self.assertEqual(fog.update(g, 1, 1), [])             # no move, no work
+        before = bytes(fog.explored)
+        fresh = fog.update(g, 1, 2)
+        self.assertTrue(fresh)
+        self.assertEqual(sorted(fresh), [i for i, (a, b) in enumerate(zip(before, fog.explored)) if a != b])
+        fog.update(g, 1, 1)
+        self.assertEqual(fog.update(g, 1, 2), [])             # nothing new the second time
+        self.assertEqual(sum(fog.explored), len(set().union(fog.visible, fresh, first)))
+
+    def test_view_keeps_what_was_seen(self):
+        g = _grid()
+        fog = Fog(len(g), len(g[0]), 2)
+        fog.update(g, 1, 1)
+        fog.update(g, 1, 8)
+        self.assertEqual(fog.view[1][1], ".")                 # remembered, out of sight
+        self.assertEqual(fog.view[3][8], FOG_GLYPH)           # never seen
+        self.assertFalse(fog.is_visible(1, 1))
+
+
+class TestPacking(unittest.TestCase):
+    def test_roundtrip(self):
+        flags = bytearray([1, 0, 0, 1, 1, 0, 1, 0, 1, 1, 0])
+        packed = pack_bits(flags)
+        self.assertEqual(len(packed), 2)
+        self.assertEqual(unpack_bits(packed, len(flags)), flags)
+
+    def test_save_and_load_keep_explored(self):
+        g = _grid()
+        fog = fog_of(g)
+        fog.update(g, 1, 1)
+        p = Player(row=1, col=1)
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "save.json")
+            with patch("builtins.print"):
+                save_game(p, 1, g, path)
+                _p, _floor, loaded = load_game(path)
+        self.assertEqual(loaded.fog.explored, fog.explored)
+        self.assertEqual(loaded.fog.view, fog.view)
+
+
+class TestFoggedRender(unittest.TestCase):
+    def test_hidden_cells_entities_and_monsters(self):
+        g = _grid()
+        g.entities.add("exit", 3, 8)
+        g.entities.add("chest", 1, 3)
+        g.monsters = RoamingPack(len(g[0]))
+        g.monsters.add(1, 4, 0, 1, False)
+        g.monsters.add(3, 1, 0, 1, False)
+        look(g, 1, 1)
+        rows = compose_rows(g, Player(row=1, col=1))
+        self.assertEqual(rows[1][:5], "#@.CM")
+        self.assertEqual(rows[3][8], FOG_GLYPH)               # exit not explored yet
+        self.assertEqual(rows[3][1], FOG_GLYPH)               # monster out of sight
+
+    def test_drawing_does_not_explore(self):
+        g = _grid()
+        rows = compose_rows(g, Player(row=1, col=1))
+        self.assertIsNone(g.fog)
+        self.assertEqual(rows[1], FOG_GLYPH + "@" + FOG_GLYPH * 8)
+
+    def test_moving_explores_without_output(self):
+        g, p = _grid(), Player(row=1, col=1)
+        with messages.quiet():
+            render(g, p, 1)
+            try_move(g, p, "d")
+        self.assertTrue(g.fog.is_explored(1, 4))
+        self.assertEqual(g.fog.origin, (1, 2))
+
+    def test_fog_off_draws_everything(self):
+        g = _grid()
+        g.entities.add("exit", 3, 8)
+        with patch.dict(CFG["world"], {"fog": False}):
+            rows = compose_rows(g, Player(row=1, col=1))
+        self.assertIsNone(g.fog)
+        self.assertEqual(rows[3][8], "E")
+
+
+if __name__ == "__main__":
+    unittest.main()
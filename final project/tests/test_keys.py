@@ -0,0 +1,78 @@
+# tests/test_keys.py
+"""
+Tests for keystroke input and batched moves in the exploration loop.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import unittest
+from unittest.mock import patch
+
+import batch
+import main
+from entities import FloorGrid
+from keys import read_command, split_moves
+from models import Player
+from tiles import TileContext, REGISTRY, resolve_step, set_encounter_policy, clear_encounter_policies
+from world import DIRS
+
+
+class TestReadCommand(unittest.TestCase):
+    def test_split_moves(self):
+        self.assertEqual(split_moves("ddw", DIRS), ["d", "d", "w"])
+        self.assertEqual(split_moves("d", DIRS), ["d"])
+        self.assertEqual(split_moves("u3", DIRS), ["u3"])
+        self.assertEqual(split_moves("ddq", DIRS), ["ddq"])
+
+    def test_line_fallback(self):
+        with patch("builtins.input", return_value="  DDW \n"):
+            self.assertEqual(read_command("> "), "ddw")
+
+    @unittest.skipUnless(os.name == "posix", "termios only")
+    def test_raw_reads_keystroke_and_typed_ahead(self):
+        import pty, select, tty
+        master, slave = pty.openpty()
+        tty_in = os.fdopen(slave, "r")
+        try:
+            # cbreak before writing: a canonical pty would hold the keys until Enter
+            tty.setcbreak(slave)
+            os.write(master, b"dDw")
+            if not select.select([slave], [], [], 2)[0]:
+                self.skipTest("pty did not deliver input")
+            with patch("sys.stdin", tty_in), patch("builtins.print"):
+                self.assertEqual(read_command("> "), "ddw")
+        finally:
+            tty_in.close()
+            os.close(master)
+
+
+class TestBatchedMoves(unittest.TestCase):
+    def tearDown(self):
+        clear_encounter_policies()
+
+    def test_resolve_step_reports_events(self):
+        set_encounter_policy(lambda ctx: None)
+        g = FloorGrid([["#"] * 5, ["#", ".", ".", ".", "#"], ["#"] * 5])
+        g.entities.add("exit", 1, 3)
+        ctx = TileContext(player=Player(row=1, col=2), floor=1, grid=g)
+        self.assertFalse(resolve_step(ctx, registry=REGISTRY))
+        ctx.player.col = 3
+        self.assertTrue(resolve_step(ctx, registry=REGISTRY))
+        self.assertEqual(ctx.floor, 2)
+
+    def test_batch_renders_once(self):
+        corridor = FloorGrid([["#"] * 9, ["#"] + ["."] * 7 + ["#"], ["#"] * 9])
+        corridor.entities.add("exit", 1, 7)
+        with patch.object(main, "load_floor", return_value=corridor), \
+             patch.object(main, "choose_spawn", return_value=(1, 1)):
+            res = batch.run_script(["ddd", "dddddd", "q"],
+                                   overrides={"encounters": {"rate": 0.0}, "world": {"fog": False}})
+        frames = [line for line in res.transcript.splitlines() if "@" in line]
+        # one render per command line; the second batch stops on the exit (col 7)
+        self.assertEqual(res.outcome, "quit")
+        self.assertEqual(len(frames), 3)
+        self.assertEqual([f.index("@") for f in frames[:2]], [1, 4])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+# tests/test_maze_stream.py
+"""
+Tests for the row-streaming (Eller's algorithm) maze generator.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import random
+import tempfile
+import tracemalloc
+import unittest
+from itertools import islice
+
+from config import CFG
+from world import iter_eller_rows, write_maze, load_floor, choose_spawn
+
+
+def _is_perfect_maze(g) -> bool:
+    """Every cell reachable and passages form a tree (edges == cells - 1)."""
+    cells = [(r, c) for r in range(1, len(g) - 1, 2) for c in range(1, len(g[0]) - 1, 2)]
+    edges = 0
+    for r, c in cells:
+        if c + 2 < len(g[0]) - 1 and g[r][c + 1] == ".":
+            edges += 1
+        if r + 2 < len(g) - 1 and g[r + 1][c] == ".":
+            edges += 1
+    seen, stack = {cells[0]}, [cells[0]]
+    while stack:
+        r, c = stack.pop()
+        for dr, dc in ((0, 1), (0, -1), (1, 0), (-1, 0)):
+            if g[r + dr][c + dc] == "." and (r + 2 * dr, c + 2 * dc) not in seen:
+                seen.add((r + 2 * dr, c + 2 * dc))
+                stack.append((r + 2 * dr, c + 2 * dc))
+    return len(seen) == len(cells) and edges == len(cells) - 1
+
+
+class TestEller(unittest.TestCase):
+    def test_perfect_maze_of_requested_size(self):
+        rng = random.Random(4)
+        for w, h in ((11, 11), (21, 9), (5, 41), (12, 12)):
+            g = list(iter_eller_rows(w, h, rng))
+            self.assertEqual((len(g), len(g[0])), (h, w))
+            self.assertTrue(_is_perfect_maze(g), (w, h))
+
+    def test_memory_does_not_grow_with_height(self):
+        def peak(rows):
+            tracemalloc.start()
+            for _ in islice(iter_eller_rows(41, None, random.Random(1)), rows):
+                pass
+            p = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return p
+        self.assertLess(peak(4000), peak(400) * 1.5 + 1024)
+
+    def test_write_maze_streams_to_file(self):
+        fd, path = tempfile.mkstemp(suffix=".txt")
+        os.close(fd)
+        try:
+            self.assertEqual(write_maze(path, 15, None, rows=301, rng=random.Random(2)), 301)
+            with open(path, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            self.assertEqual(len(lines), 301)
+            self.assertTrue(all(len(line) == 15 for line in lines))
+        finally:
+            os.remove(path)
+
+    def test_load_floor_with_eller_generator(self):
+        old = CFG["world"]["generator"]
+        try:
+            CFG["world"]["generator"] = "eller"
+            g = load_floor(1, seed=5)
+            self.assertTrue(_is_perfect_maze(g))
+            choose_spawn(g)
+            self.assertEqual(len(g.entities.of_kind("exit")), 1)
+        finally:
+            CFG["world"]["generator"] = old
+
+
+if __name__ == "__main__":
+    unittest.main()
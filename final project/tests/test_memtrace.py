@@ -0,0 +1,49 @@
+# tests/test_memtrace.py
+"""
+Tests for the opt-in tracemalloc accounting.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import tempfile
+import unittest
+
+import memtrace
+from models import Player
+from world import load_floor, choose_spawn
+
+
+class TestMemtrace(unittest.TestCase):
+    def tearDown(self):
+        memtrace.stop()
+
+    def test_disabled_mark_is_noop(self):
+        memtrace.mark("floor_start", 1)
+        self.assertFalse(memtrace.enabled())
+        self.assertIsNone(memtrace.write_report())
+
+    def test_floor_attribution_and_report(self):
+        memtrace.start()
+        memtrace.mark("floor_start", 1)
+        grid = load_floor(1, seed=5)
+        player = Player(row=1, col=1)
+        player.row, player.col = choose_spawn(grid)
+        memtrace.mark("floor_end", 1)
+
+        floor = memtrace.ACCOUNTANT.floors[1]
+        self.assertGreater(floor["subsystems"].get("grid", 0), 0)
+        self.assertGreaterEqual(floor["peak"], floor["subsystems"]["grid"])
+
+        with tempfile.TemporaryDirectory() as d:
+            path = memtrace.write_report(os.path.join(d, "mem.json"))
+            with open(path, encoding="utf-8") as f:
+                report = json.load(f)
+        self.assertIn("1", report["floors"])
+        self.assertGreater(report["session"]["peak"], 0)
+        self.assertEqual(report["marks"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+# tests/test_messages.py
+"""
+Tests for the leveled message layer: sinks, lazy formatting and
+per-session routing.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import io
+import json
+import threading
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+import messages
+from messages import Messages, BufferSink, JsonlSink, TerminalSink, INFO, WARN
+from models import Player
+from world import render
+
+
+class TestSinks(unittest.TestCase):
+    def test_null_sink_never_formats(self):
+        calls = []
+        with messages.quiet():
+            messages.info(lambda: calls.append(1) or "frame")
+            render([["."] * 3] * 3, Player(row=1, col=1), 1)
+        self.assertEqual(calls, [])
+
+    def test_buffer_formats_on_read_and_filters_levels(self):
+        buf = BufferSink(level=INFO)
+        with messages.use(Messages([buf])):
+            messages.debug("hidden {}", 1)
+            messages.info("You hit the {} for {} damage.", "Slime", 4)
+            messages.warn("careful", end="!\n")
+        self.assertEqual(buf.lines(), ["You hit the Slime for 4 damage.", "careful!"])
+        self.assertEqual(buf.lines(WARN), ["careful!"])
+
+    def test_terminal_sink_uses_current_print(self):
+        seen = []
+        with messages.use(Messages([TerminalSink()])), \
+             patch("builtins.print", side_effect=lambda *a, **k: seen.append(a[0])):
+            messages.info("{} EXP", 7)
+        self.assertEqual(seen, ["7 EXP"])
+        out = io.StringIO()
+        with redirect_stdout(out):
+            messages.info("to stdout")
+        self.assertEqual(out.getvalue(), "to stdout\n")
+
+    def test_jsonl_sink(self):
+        stream = io.StringIO()
+        with messages.use(Messages([JsonlSink(stream, level=WARN)])):
+            messages.info("skipped")
+            messages.warn("[Load] Failed to load save: {}", "bad json")
+        rows = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual([(r["level"], r["text"]) for r in rows],
+                         [("warn", "[Load] Failed to load save: bad json")])
+
+
+class TestSessions(unittest.TestCase):
+    def test_each_thread_routes_its_own_session(self):
+        bufs = [BufferSink() for _ in range(4)]
+
+        def session(i):
+            with messages.use(Messages([bufs[i]])):
+                for k in range(50):
+                    messages.info("session {} line {}", i, k)
+
+        threads = [threading.Thread(target=session, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for i, buf in enumerate(bufs):
+            self.assertEqual(len(buf.records), 50)
+            self.assertTrue(all(line.startswith(f"session {i} ") for line in buf.lines()))
+
+
+if __name__ == "__main__":
+    unittest.main()
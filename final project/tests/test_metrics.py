@@ -0,0 +1,61 @@
+# tests/test_metrics.py
+"""
+Tests for the metrics surface: recording only while enabled, and the
+Prometheus / JSON exports.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import metrics
+from models import Player
+from world import load_floor, choose_spawn, try_move, render
+
+
+class TestMetrics(unittest.TestCase):
+    def tearDown(self):
+        metrics.disable()
+        metrics.reset()
+
+    def test_disabled_records_nothing(self):
+        metrics.disable()
+        load_floor(1, seed=3)
+        metrics.incr("x")
+        self.assertEqual(metrics.snapshot(), {"counters": {}, "histograms": {}})
+
+    def test_hot_paths_are_recorded(self):
+        metrics.enable()
+        grid = load_floor(1, seed=3)
+        p = Player(row=1, col=1)
+        p.row, p.col = choose_spawn(grid)
+        for cmd in "wasd":
+            try_move(grid, p, cmd)
+        with patch("builtins.print"):
+            render(grid, p, 1)
+        hist = metrics.snapshot()["histograms"]
+        self.assertEqual(hist["world.carve_maze"]["count"], 1)
+        self.assertEqual(hist["world.try_move"]["count"], 4)
+        self.assertEqual(hist["world.render"]["count"], 1)
+
+    def test_exports(self):
+        metrics.enable()
+        metrics.incr("battle.win", 2)
+        metrics.observe("battle.turn", 0.003)
+        text = metrics.to_prometheus()
+        self.assertIn("drpg_battle_win_total 2", text)
+        self.assertIn('drpg_battle_turn_seconds_bucket{le="+Inf"} 1', text)
+        self.assertIn("drpg_battle_turn_seconds_count 1", text)
+        with tempfile.TemporaryDirectory() as d:
+            metrics.write_reports(d)
+            with open(os.path.join(d, "metrics.json"), encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["counters"]["battle.win"], 2)
+            self.assertTrue(os.path.exists(os.path.join(d, "metrics.prom")))
+
+
+if __name__ == "__main__":
+    unittest.main()
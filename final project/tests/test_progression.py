@@ -0,0 +1,66 @@
+# tests/test_progression.py
+"""
+Tests for the progression tables and the bulk EXP API.
+
+The bulk path is checked against a straightforward one-level-at-a-time
+reference implementation of the original gain_exp loop.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import unittest
+from unittest.mock import patch
+
+import progression
+from models import Player
+
+
+def _reference_gain(p: Player, amount: int) -> None:
+    """The original loop: one level-up per iteration."""
+    p.exp += amount
+    while p.exp >= 10 * p.level:
+        p.exp -= 10 * p.level
+        p.level += 1
+        p.hp_max += 5; p.sp_max += 8
+        p.atk_min += 3; p.atk_max += 4
+        p.crit_chance = min(p.crit_chance + 0.03, 1)
+        p.hp, p.sp = p.hp_max, p.sp_max
+
+
+class TestProgression(unittest.TestCase):
+    def test_level_for_total_exp_matches_thresholds(self):
+        for total in range(0, 20000, 7):
+            L = progression.level_for_total_exp(total)
+            self.assertLessEqual(progression.cum_exp(L), total)
+            self.assertGreater(progression.cum_exp(L + 1), total)
+
+    def test_bulk_matches_reference(self):
+        for start_exp, amount in [(0, 5), (0, 10), (3, 57), (9, 1), (0, 123456)]:
+            a, b = Player(row=1, col=1), Player(row=1, col=1)
+            a.exp = b.exp = start_exp
+            a.hp = b.hp = 4
+            delta = a.gain_exp(amount)
+            _reference_gain(b, amount)
+            for k in ("level", "exp", "hp", "hp_max", "sp", "sp_max", "atk_min", "atk_max"):
+                self.assertEqual(getattr(a, k), getattr(b, k), k)
+            self.assertAlmostEqual(a.crit_chance, b.crit_chance)
+            self.assertEqual(delta.levels, a.level - 1)
+
+    def test_gain_exp_is_silent(self):
+        p = Player(row=1, col=1)
+        with patch("builtins.print") as mock_print:
+            delta = p.gain_exp(1000)
+        mock_print.assert_not_called()
+        self.assertTrue(delta)
+        self.assertIn(f"Level {p.level}", progression.format_level_up(delta))
+
+    def test_advance_to_level(self):
+        p = Player(row=1, col=1)
+        p.advance_to_level(10)
+        self.assertEqual((p.level, p.exp, p.hp_max), (10, 0, 15 + 45))
+        self.assertFalse(p.advance_to_level(5))  # never goes down
+
+
+if __name__ == "__main__":
+    unittest.main()
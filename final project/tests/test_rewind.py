@@ -0,0 +1,129 @@
+# tests/test_rewind.py
+"""
+Tests for rewind snapshots: structural sharing and in-place restore.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import random
+import unittest
+from unittest.mock import patch
+
+from entities import FloorGrid, take
+from models import Player
+from rewind import History, take_snapshot
+from roaming import RoamingPack
+from tiles import TileContext, REGISTRY, resolve_step, set_encounter_policy, clear_encounter_policies
+from world import load_floor, choose_spawn
+
+
+def _session(seed: int = 2) -> TileContext:
+    random.seed(seed)
+    g = load_floor(1)
+    p = Player(row=1, col=1)
+    p.row, p.col = choose_spawn(g)
+    return TileContext(player=p, floor=1, grid=g)
+
+
+class TestSnapshots(unittest.TestCase):
+    def test_unchanged_map_is_shared(self):
+        ctx = _session()
+        a = take_snapshot(ctx)
+        ctx.player.hp -= 3
+        b = take_snapshot(ctx)
+        self.assertIs(a.terrain, b.terrain)
+        self.assertIs(a.entities, b.entities)
+        self.assertNotEqual(a.player, b.player)
+
+    def test_set_tile_copies_only_its_row(self):
+        g = FloorGrid([["."] * 4 for _ in range(3)])
+        before = g.freeze()
+        g.set_tile(1, 2, "#")
+        after = g.freeze()
+        self.assertIs(before[0], after[0])
+        self.assertIs(before[2], after[2])
+        self.assertEqual(after[1], (".", ".", "#", "."))
+        g.thaw(before)
+        self.assertEqual(g[1], ["."] * 4)
+
+
+class TestHistory(unittest.TestCase):
+    def tearDown(self):
+        clear_encounter_policies()
+
+    def test_rewind_restores_player_chest_and_floor(self):
+        ctx = _session()
+        h = History(depth=5)
+        h.record(ctx)
+        chest = ctx.grid.entities.of_kind("chest")[0]
+        start = (ctx.player.row, ctx.player.col, ctx.player.hp)
+
+        # turn 1: open the chest and lose some HP
+        take(ctx.grid, "chest", chest.row, chest.col)
+        ctx.player.hp -= 4
+        h.record(ctx)
+        h.record(ctx, kind="battle")  # battle turns in between are skipped
+        # turn 2: take the stairs
+        set_encounter_policy(lambda c: None)
+        exit_ = ctx.grid.entities.of_kind("exit")[0]
+        ctx.player.row, ctx.player.col = exit_.row, exit_.col
+        resolve_step(ctx, registry=REGISTRY)
+        self.assertEqual(ctx.floor, 2)
+        h.record(ctx)
+
+        self.assertEqual(h.rewind(ctx, 1), 1)
+        self.assertEqual(ctx.floor, 1)
+        self.assertEqual(ctx.player.hp, start[2] - 4)
+        self.assertIsNone(ctx.grid.entities.first(chest.row, chest.col))
+
+        self.assertEqual(h.rewind(ctx, 5), 1)  # only one older turn is left
+        self.assertEqual((ctx.player.row, ctx.player.col, ctx.player.hp), start)
+        self.assertIsNotNone(ctx.grid.entities.first(chest.row, chest.col, "chest"))
+        self.assertEqual(h.rewind(ctx), 0)
+
+    def test_depth_limit_and_monsters(self):
+        ctx = _session()
+        ctx.grid.monsters = RoamingPack(len(ctx.grid[0]))
+        ctx.grid.monsters.add(1, 1, 0, 1, False)
+        h = History(depth=2)
+        for col in range(4):
+            ctx.player.potions = col
+            ctx.grid.monsters.pos[0] = 11 + col
+            h.record(ctx)
+        self.assertEqual(len(h), 3)
+        self.assertEqual(h.rewind(ctx, 10), 2)
+        self.assertEqual(ctx.player.potions, 1)
+        self.assertEqual(ctx.grid.monsters.pos[0], 12)
+
+    def test_battle_turns_do_not_evict_moves(self):
+        ctx = _session()
+        h = History(depth=5)
+        for potions in range(3):
+            ctx.player.potions = potions
+            h.record(ctx)
+        for _ in range(60):
+            h.record(ctx, kind="battle")
+        ctx.player.potions = 9
+        h.record(ctx)
+        self.assertEqual(h.rewind(ctx, 2), 2)
+        self.assertEqual(ctx.player.potions, 1)
+        self.assertEqual(h.rewind(ctx, 1, kind="battle"), 0)  # newer battle turns were dropped
+
+
+class TestBattleHook(unittest.TestCase):
+    @patch("time.sleep", lambda *_: None)
+    def test_on_turn_runs_each_resolved_turn(self):
+        from battle import battle
+        from monsters import Monster
+        p = Player(row=1, col=1)
+        m = Monster(name="Dummy", level=1, hp=30, atk_min=0, atk_max=0)
+        turns = []
+        with patch("builtins.input", side_effect=["i", "a", "a", "r"]), \
+             patch("builtins.print"), patch("random.random", return_value=0.0):
+            battle(p, m, on_turn=lambda pl, mo: turns.append(mo.hp))
+        self.assertEqual(len(turns), 2)  # "i" is free, "r" ends the battle
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+# tests/test_roaming.py
+"""
+Tests for roaming monsters: flow-field chasing, collisions and the
+config switch between random and roaming encounters.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import io
+import random
+import unittest
+from unittest.mock import patch
+from contextlib import redirect_stdout
+
+from config import CFG
+from entities import FloorGrid
+from models import Player
+from roaming import FlowField, RoamingPack, RoamingEncounters, spawn_pack
+from tiles import (TileContext, RandomEncounter, configure_encounters,
+                   encounter_policy, clear_encounter_policies)
+from world import render
+
+
+def _open_floor(h: int, w: int) -> FloorGrid:
+    """A walled rectangle with an open interior."""
+    return FloorGrid([["#"] * w] + [["#"] + ["."] * (w - 2) + ["#"] for _ in range(h - 2)] + [["#"] * w])
+
+
+class TestFlowField(unittest.TestCase):
+    def test_monsters_close_in_within_radius_only(self):
+        g = _open_floor(12, 30)
+        field = FlowField(g, radius=6)
+        pack = RoamingPack(30)
+        pack.add(5, 5, 0, 1, False)    # 4 steps away: chases
+        pack.add(5, 25, 0, 1, False)   # 16 steps away: idle
+        target = 5 * 30 + 9
+        pack.tick(field, target)
+        self.assertEqual(list(pack.cells()), [(5, 6), (5, 25)])
+        for _ in range(3):
+            pack.tick(field, target)
+        self.assertEqual(list(pack.cells())[0], (5, 9))
+
+    def test_field_work_is_bounded_by_radius(self):
+        # timing lives in benchmarks/bench_suite.py (roaming_tick_500)
+        random.seed(1)
+        g = _open_floor(200, 200)
+        pack = spawn_pack(g, 3, 500, (100, 100))
+        field = FlowField(g, radius=8)
+        for k in range(20):
+            pack.tick(field, 100 * 200 + 100 + k, wander=150)
+            self.assertLessEqual(len(field._touched), 2 * 8 * 8 + 2 * 8 + 1)
+        step = field.step
+        touched = field._touched
+        pack.tick(field, 100 * 200 + 119)      # same target: no rebuild
+        self.assertIs(field._touched, touched)
+        self.assertIs(field.step, step)
+        self.assertEqual(len(pack), 500)
+
+
+class TestRoamingEncounters(unittest.TestCase):
+    def test_collision_starts_battle_and_defeat_removes_monster(self):
+        g = _open_floor(5, 8)
+        ctx = TileContext(player=Player(row=1, col=1), floor=1, grid=g)
+        policy = RoamingEncounters(per_floor=0, chase_radius=4, wander_rate=0.0)
+        self.assertIsNone(policy(ctx))           # sets up the (empty) floor
+        policy.pack.add(1, 3, 0, 1, False)
+        ctx.player.col = 2
+        m = policy(ctx)                          # monster steps onto the player
+        self.assertIsNotNone(m)
+        policy.resolved(ctx, m, "win")
+        self.assertEqual(len(policy.pack), 0)
+        self.assertIsNone(policy(ctx))
+
+    def test_rewind_across_floors_keeps_restored_monsters(self):
+        from rewind import History
+        random.seed(3)
+        first, second = _open_floor(12, 30), _open_floor(12, 30)
+        ctx = TileContext(player=Player(row=1, col=1), floor=1, grid=first)
+        policy = RoamingEncounters(per_floor=6, chase_radius=1, wander_rate=0.0)
+        history = History(depth=5)
+        policy(ctx)
+        history.record(ctx)
+        before = list(first.monsters.pos)
+        ctx.grid, ctx.floor = second, 2
+        policy(ctx)
+        history.record(ctx)
+        self.assertEqual(history.rewind(ctx, 1), 1)
+        self.assertIs(ctx.grid, first)
+        policy(ctx)                              # the next step on the old floor
+        self.assertIs(policy.pack, first.monsters)
+        self.assertEqual(list(first.monsters.pos), before)
+
+    def test_render_draws_monsters(self):
+        g = _open_floor(5, 8)
+        g.monsters = RoamingPack(8)
+        g.monsters.add(3, 6, 0, 1, False)
+        out = io.StringIO()
+        with redirect_stdout(out), patch.dict(CFG["world"], {"fog": False}):
+            render(g, Player(row=1, col=1), 1)
+        self.assertEqual(out.getvalue().splitlines()[3][6], "M")
+
+    def test_configure_from_config(self):
+        old = dict(CFG["encounters"])
+        try:
+            self.assertIsInstance(configure_encounters(), RandomEncounter)
+            CFG["encounters"]["mode"] = "roaming"
+            configure_encounters()
+            self.assertIsInstance(encounter_policy(1), RoamingEncounters)
+        finally:
+            CFG["encounters"] = old
+            clear_encounter_policies()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+# tests/test_sampler.py
+"""
+Tests for the built-in sampling profiler.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import tempfile
+import time
+import unittest
+
+import world
+from sampler import Sampler
+
+
+class TestSampler(unittest.TestCase):
+    def test_collapsed_stacks_attribute_world(self):
+        with Sampler(interval=0.002) as prof:
+            deadline = time.perf_counter() + 0.3
+            while time.perf_counter() < deadline:
+                world._carve_maze(41, 41)
+        self.assertGreater(prof.samples, 0)
+        text = prof.collapsed()
+        self.assertIn("world:_carve_maze", text)
+        for line in text.splitlines():
+            stack, count = line.rsplit(" ", 1)
+            self.assertTrue(count.isdigit())
+        mods = prof.by_module()
+        self.assertEqual(max(mods, key=mods.get), "world")
+        self.assertIn("world", prof.format_summary())
+
+        with tempfile.TemporaryDirectory() as d:
+            path = prof.write_collapsed(os.path.join(d, "p.folded"))
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), text)
+
+
+if __name__ == "__main__":
+    unittest.main()
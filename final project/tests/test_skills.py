@@ -0,0 +1,48 @@
+# tests/test_skills.py
+"""
+Tests for the interned skill registry and the slotted models.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pickle
+import unittest
+
+from models import Player
+from monsters import Monster
+from skills import ALL_SKILLS, Skill, skill_by_id, skill_by_name
+
+
+class TestSkillRegistry(unittest.TestCase):
+    def test_skills_are_interned(self):
+        sk = ALL_SKILLS[0]
+        again = Skill(sk.name, sk.cost, sk.multiplier, sk.desc, sk.stun)
+        self.assertIs(again, sk)
+        self.assertIs(skill_by_id(sk.id), sk)
+        self.assertIs(skill_by_name(sk.name), sk)
+        self.assertIs(pickle.loads(pickle.dumps(sk)), sk)
+
+    def test_conflicting_definition_rejected(self):
+        with self.assertRaises(ValueError):
+            Skill(ALL_SKILLS[0].name, 99, 1.0)
+
+    def test_skills_are_immutable(self):
+        with self.assertRaises(AttributeError):
+            ALL_SKILLS[0].cost = 0
+
+    def test_player_stores_skill_ids(self):
+        p = Player(row=1, col=1)
+        self.assertEqual(list(p.skills), ALL_SKILLS)
+        self.assertIsInstance(p.skill_ids, tuple)
+        p.skills = [ALL_SKILLS[2]]
+        p2 = Player.from_dict(p.to_dict())
+        self.assertEqual(p2.skill_ids, (ALL_SKILLS[2].id,))
+
+    def test_models_have_no_instance_dict(self):
+        self.assertFalse(hasattr(Player(row=1, col=1), "__dict__"))
+        self.assertFalse(hasattr(Monster("Slime", 1, 5, 1, 2), "__dict__"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+# tests/test_startup.py
+"""
+Import-cost tests for the headless entry point.
+
+Each check runs in a fresh interpreter so modules already imported by
+other tests do not hide a regression.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import subprocess
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _run(code: str) -> str:
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+    return proc.stdout.strip()
+
+
+class TestHeadlessStartup(unittest.TestCase):
+    def test_headless_skips_terminal_stack(self):
+        """Importing the rules must not load battle, fx or colorama."""
+        out = _run("import sys, headless; "
+                   "print(sorted(m for m in ('battle', 'fx', 'colorama', 'events') if m in sys.modules))")
+        self.assertEqual(out, "[]")
+
+    def test_config_is_read_lazily(self):
+        """config.json is only read when CFG is first accessed."""
+        out = _run("import headless; from config import CFG; "
+                   "before = CFG.is_loaded(); CFG['treasure']; print(before, CFG.is_loaded())")
+        self.assertEqual(out, "False True")
+
+    def test_events_import_is_lazy(self):
+        """events should not import battle until a chest is opened."""
+        out = _run("import sys, events; print('battle' in sys.modules)")
+        self.assertEqual(out, "False")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+# tests/test_tiles.py
+"""
+Tests for the tile-event registry and encounter policies.
+
+Custom registries and policies are used so the built-in handlers and
+the global default policy are left untouched.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import unittest
+from unittest.mock import patch
+
+from models import Player
+from tiles import (TileContext, TileRegistry, REGISTRY, resolve_step,
+                   set_encounter_policy, clear_encounter_policies)
+
+
+def _ctx(tile: str, floor: int = 1) -> TileContext:
+    grid = [["#", "#", "#"], ["#", tile, "#"], ["#", "#", "#"]]
+    return TileContext(player=Player(row=1, col=1), floor=floor, grid=grid, prev_pos=(1, 1))
+
+
+class TestTileRegistry(unittest.TestCase):
+    def tearDown(self):
+        clear_encounter_policies()
+
+    def test_custom_tile_handler_and_stats(self):
+        """A registered trap runs on its tile, ends the turn and is counted."""
+        reg = TileRegistry()
+        hits = []
+
+        @reg.register("^", name="trap")
+        def trap(ctx):
+            hits.append(ctx.floor)
+            ctx.player.hp -= 2
+            return True
+
+        ctx = _ctx("^", floor=3)
+        resolve_step(ctx, registry=reg)
+        resolve_step(ctx, registry=reg)
+        self.assertEqual(hits, [3, 3])
+        self.assertEqual(ctx.player.hp, 11)
+        stats = reg.stats()
+        self.assertEqual(stats["trap"]["calls"], 2)
+        self.assertNotIn("encounter", stats)  # turn ended before the encounter roll
+        self.assertIn("trap", reg.dump_stats())
+
+    def test_per_floor_encounter_policy(self):
+        """Floor 2 never spawns; the default policy is consulted elsewhere."""
+        calls = []
+        set_encounter_policy(lambda ctx: calls.append("default"))
+        set_encounter_policy(lambda ctx: calls.append("floor2"), floor=2)
+        resolve_step(_ctx(".", floor=1), registry=TileRegistry())
+        resolve_step(_ctx(".", floor=2), registry=TileRegistry())
+        self.assertEqual(calls, ["default", "floor2"])
+
+    def test_exit_after_encounter(self):
+        """Stepping on the exit loads the next floor when no monster appears."""
+        set_encounter_policy(lambda ctx: None)
+        ctx = _ctx("E", floor=1)
+        resolve_step(ctx, registry=REGISTRY)
+        self.assertEqual(ctx.floor, 2)
+        self.assertFalse(ctx.game_over)
+        self.assertIn(ctx.grid[ctx.player.row][ctx.player.col], ".C")
+
+    def test_exit_on_final_floor_ends_game(self):
+        set_encounter_policy(lambda ctx: None)
+        ctx = _ctx("E", floor=5)
+        with patch("builtins.print"):
+            resolve_step(ctx, registry=REGISTRY)
+        self.assertTrue(ctx.game_over)
+
+
+if __name__ == "__main__":
+    unittest.main()
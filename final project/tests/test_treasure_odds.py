@@ -0,0 +1,68 @@
+# tests/test_treasure_odds.py
+"""
+Tests for the exact chest-boost distribution analyzer.
+
+The exact marginals are checked for consistency and against a seeded
+Monte Carlo run of events._roll_permanent_boosts.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import random
+import unittest
+from fractions import Fraction
+from unittest.mock import patch
+
+from models import Player
+from events import _roll_permanent_boosts
+from treasure_odds import boost_distribution, STAT_KEYS, _realize, player_stats
+
+TREASURE = {
+    "chest_per_floor": 1, "mimic_chance": 0.30, "heal_rate": 0.30,
+    "gamble_attr_count_min": 1, "gamble_attr_count_max": 3,
+    "backfire_prob": 0.20, "mimic_boost_bias": 0.20,
+}
+
+
+class TestTreasureOdds(unittest.TestCase):
+    def test_probabilities_sum_to_one(self):
+        for is_mimic in (False, True):
+            dist = boost_distribution(is_mimic, treasure=TREASURE)
+            self.assertEqual(sum(dist.joint.values()), Fraction(1))
+            for k in STAT_KEYS:
+                self.assertEqual(sum(dist.marginals[k].values()), Fraction(1))
+
+    def test_mimic_never_backfires(self):
+        dist = boost_distribution(True, treasure=TREASURE)
+        for out in dist.joint:
+            self.assertTrue(all(v >= 0 for v in out))
+
+    def test_results_are_cached(self):
+        a = boost_distribution(False, treasure=TREASURE)
+        b = boost_distribution(False, treasure=dict(TREASURE))
+        self.assertIs(a, b)
+        c = boost_distribution(False, treasure=dict(TREASURE, backfire_prob=0.5))
+        self.assertNotEqual(a.config_hash, c.config_hash)
+
+    def test_matches_sampling(self):
+        """Exact expectations agree with 20k seeded samples of the real roller."""
+        dist = boost_distribution(False, treasure=TREASURE)
+        stats = player_stats(Player(row=0, col=0))
+        rng_state = random.getstate()
+        random.seed(1234)
+        n = 20000
+        totals = [0.0] * len(STAT_KEYS)
+        with patch.dict("config.CFG", {"treasure": TREASURE}):
+            for _ in range(n):
+                out = _realize(stats, _roll_permanent_boosts(is_mimic=False))
+                for i, v in enumerate(out):
+                    totals[i] += v
+        random.setstate(rng_state)
+        for i, k in enumerate(STAT_KEYS):
+            tol = 0.001 if k == "crit_chance" else 0.08
+            self.assertAlmostEqual(totals[i] / n, dist.expected[k], delta=tol)
+
+
+if __name__ == "__main__":
+    unittest.main()
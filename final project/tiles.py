@@ -0,0 +1,275 @@
+"""
+Tile-event dispatch for the exploration loop.
+
+Handlers are registered per tile character (the glyph of the entity on
+the cell, else the terrain tile) and looked up with a single dict access,
+so new tile types (traps, shops, ...) need no new branch in main.game_loop.
+Each step runs in three phases:
+  1) the "before" handler of the tile (e.g. chest); returning True ends the turn
+  2) the floor's encounter policy (default: flat 25% random encounter)
+  3) the "after" handler of the tile (e.g. exit), only if the player stayed
+Every handler, and the encounter phase, records call counts and cumulative
+latency; see stats() / dump_stats().
+"""
+
+import json
+import random
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, Dict, Optional, Tuple
+
+import memtrace
+from config import CFG
+from models import Player
+from monsters import Monster, generate_monster, generate_encounter
+from entities import tile_at
+from world import CHEST_TILE, load_floor, choose_spawn
+
+EXIT_TILE = "E"
+FINAL_FLOOR = 5
+ENCOUNTER_RATE = 0.25  # default chance of a random encounter after each move
+
+
+@dataclass
+class TileContext:
+    """Session state shared by the game loop and the tile handlers."""
+    player: Player
+    floor: int
+    grid: list
+    tip: str = ""
+    prev_pos: Tuple[int, int] = (0, 0)
+    game_over: bool = False
+    # fight(player, monster) -> "win" | "lose" | "escape"; None = interactive battle()
+    fight: Optional[Callable[[Player, Monster], str]] = None
+    # choose_chest(player) -> "heal" | "gamble"; None = ask at the terminal
+    choose_chest: Optional[Callable[[Player], str]] = None
+    battles: int = 0  # encounters fought this session
+    cleared: bool = False  # reached the final exit
+
+
+Handler = Callable[[TileContext], bool]
+
+
+class HandlerStats:
+    """Call count and cumulative wall time of one handler."""
+    __slots__ = ("calls", "total_s")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_s = 0.0
+
+
+class TileRegistry:
+    """Maps tile characters to handlers for the before/after-encounter phases."""
+
+    def __init__(self):
+        self._before: Dict[str, Tuple[str, Handler]] = {}
+        self._after: Dict[str, Tuple[str, Handler]] = {}
+        self._stats: Dict[str, HandlerStats] = {}
+
+    def register(self, tile: str, handler: Optional[Handler] = None, *,
+                 name: Optional[str] = None, before_encounter: bool = True):
+        """
+        Register handler(ctx) -> bool for a tile; True means the turn is over.
+        Usable directly or as a decorator. Re-registering a tile replaces it.
+        """
+        def deco(fn: Handler) -> Handler:
+            label = name or fn.__name__
+            table = self._before if before_encounter else self._after
+            table[tile] = (label, fn)
+            self._stats.setdefault(label, HandlerStats())
+            return fn
+        return deco(handler) if handler is not None else deco
+
+    def handles(self, tile: str, before_encounter: bool = True) -> bool:
+        return tile in (self._before if before_encounter else self._after)
+
+    def unregister(self, tile: str) -> None:
+        self._before.pop(tile, None)
+        self._after.pop(tile, None)
+
+    def dispatch(self, tile: str, ctx: TileContext, before_encounter: bool = True) -> bool:
+        """Run the handler for `tile` in the given phase; False if none is registered."""
+        entry = (self._before if before_encounter else self._after).get(tile)
+        if entry is None:
+            return False
+        label, fn = entry
+        return self.timed(label, fn, ctx)
+
+    def timed(self, label: str, fn: Handler, ctx: TileContext) -> bool:
+        """Call fn(ctx) and record its latency under `label`."""
+        st = self._stats.get(label)
+        if st is None:
+            st = self._stats[label] = HandlerStats()
+        t0 = time.perf_counter()
+        try:
+            return bool(fn(ctx))
+        finally:
+            st.calls += 1
+            st.total_s += time.perf_counter() - t0
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Snapshot: {label: {"calls", "total_ms", "mean_ms"}}."""
+        out = {}
+        for label, st in self._stats.items():
+            out[label] = {
+                "calls": st.calls,
+                "total_ms": st.total_s * 1000,
+                "mean_ms": (st.total_s * 1000 / st.calls) if st.calls else 0.0,
+            }
+        return out
+
+    def dump_stats(self, path: Optional[str] = None) -> str:
+        """Return a readable table of handler stats; also write JSON to `path` if given."""
+        snap = self.stats()
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(snap, f, indent=2)
+        lines = [f"{'handler':<16}{'calls':>8}{'total ms':>12}{'mean ms':>10}"]
+        for label, s in sorted(snap.items(), key=lambda kv: -kv[1]["total_ms"]):
+            lines.append(f"{label:<16}{s['calls']:>8}{s['total_ms']:>12.2f}{s['mean_ms']:>10.3f}")
+        return "\n".join(lines)
+
+    def reset_stats(self) -> None:
+        for st in self._stats.values():
+            st.calls, st.total_s = 0, 0.0
+
+
+# =========================
+# Encounter policies
+# =========================
+class RandomEncounter:
+    """Flat per-step encounter chance; `spawn(floor)` builds the monster (or group)."""
+
+    def __init__(self, rate: float = ENCOUNTER_RATE, spawn: Callable[[int], Monster] = generate_monster):
+        self.rate = rate
+        self.spawn = spawn
+
+    def __call__(self, ctx: TileContext) -> Optional[Monster]:
+        if random.random() < self.rate:
+            return self.spawn(ctx.floor)
+        return None
+
+
+# policy(ctx) -> Monster or None. A policy may also define
+# resolved(ctx, monster, outcome), called right after the battle.
+EncounterPolicy = Callable[[TileContext], Optional[Monster]]
+
+_default_policy: EncounterPolicy = RandomEncounter()
+_floor_policies: Dict[int, EncounterPolicy] = {}
+
+
+def set_encounter_policy(policy: EncounterPolicy, floor: Optional[int] = None) -> None:
+    """Install a policy for one floor, or the default for all floors when floor is None."""
+    global _default_policy
+    if floor is None:
+        _default_policy = policy
+    else:
+        _floor_policies[floor] = policy
+
+
+def clear_encounter_policies() -> None:
+    """Back to the built-in flat 25% policy on every floor."""
+    global _default_policy
+    _default_policy = RandomEncounter()
+    _floor_policies.clear()
+
+
+def encounter_policy(floor: int) -> EncounterPolicy:
+    return _floor_policies.get(floor, _default_policy)
+
+
+def configure_encounters() -> EncounterPolicy:
+    """Install the default policy described by the config "encounters" section."""
+    E = CFG["encounters"]
+    if E["mode"] == "roaming":
+        from roaming import RoamingEncounters
+        policy = RoamingEncounters(int(E["roaming_per_floor"]), int(E["chase_radius"]),
+                                   float(E["wander_rate"]))
+    else:
+        group_max = int(E["group_max"])
+        policy = RandomEncounter(float(E["rate"]), partial(generate_encounter, group_max=group_max))
+    set_encounter_policy(policy)
+    return policy
+
+
+def _encounter(ctx: TileContext) -> bool:
+    """Roll the floor's policy and fight; True if the turn ends here."""
+    policy = encounter_policy(ctx.floor)
+    monster = policy(ctx)
+    if monster is None:
+        return False
+    fight = ctx.fight
+    if fight is None:
+        from battle import battle as fight  # lazy: keeps the terminal stack out of headless imports
+
+    ctx.battles += 1
+    memtrace.mark("battle_start", ctx.floor)
+    outcome = fight(ctx.player, monster)  # "win" | "lose" | "escape"
+    memtrace.mark("battle_end", ctx.floor)
+    resolved = getattr(policy, "resolved", None)
+    if resolved is not None:
+        resolved(ctx, monster, outcome)
+    if outcome == "lose":
+        ctx.game_over = True
+        return True
+    if outcome == "escape":
+        # Do not consume the step: revert to previous tile, skip exit check
+        ctx.player.row, ctx.player.col = ctx.prev_pos
+        ctx.tip = "You escaped and returned to your previous position."
+        return True
+    ctx.tip = "You won the battle."
+    return False
+
+
+# =========================
+# Built-in tile handlers
+# =========================
+REGISTRY = TileRegistry()
+
+
+@REGISTRY.register(CHEST_TILE, name="chest")
+def _chest_tile(ctx: TileContext) -> bool:
+    """Resolve the chest first and skip encounter & exit this turn."""
+    from events import chest_event
+
+    p = ctx.player
+    ctx.tip, _consumed = chest_event(p, ctx.floor, ctx.grid, p.row, p.col,
+                                     fight=ctx.fight, choose=ctx.choose_chest)
+    if not p.is_alive():
+        ctx.game_over = True
+    return True
+
+
+@REGISTRY.register(EXIT_TILE, name="exit", before_encounter=False)
+def _exit_tile(ctx: TileContext) -> bool:
+    """Descend to the next floor, or end the game after the last one."""
+    if ctx.floor < FINAL_FLOOR:
+        memtrace.mark("floor_end", ctx.floor)
+        ctx.floor += 1
+        ctx.grid = load_floor(ctx.floor)
+        ctx.player.row, ctx.player.col = choose_spawn(ctx.grid)
+        ctx.tip = f"You have entered Floor {ctx.floor}."
+        memtrace.mark("floor_start", ctx.floor)
+    else:
+        ctx.cleared = True
+        ctx.game_over = True
+    return True
+
+
+def resolve_step(ctx: TileContext, registry: TileRegistry = REGISTRY) -> bool:
+    """
+    Run all tile events for the tile the player just stepped on.
+    Returns True if anything happened (a tile handler ran or a battle was
+    fought), which is where a batch of queued moves should stop.
+    """
+    tile = tile_at(ctx.grid, ctx.player.row, ctx.player.col)
+    if registry.dispatch(tile, ctx, before_encounter=True):
+        return True
+    battles = ctx.battles
+    if registry.timed("encounter", _encounter, ctx):
+        return True
+    after = registry.handles(tile, before_encounter=False)
+    registry.dispatch(tile, ctx, before_encounter=False)
+    return after or registry.handles(tile, before_encounter=True) or ctx.battles != battles
@@ -0,0 +1,167 @@
+"""
+Exact outcome distribution of chest stat boosts.
+
+events._roll_permanent_boosts can only be sampled; this module enumerates
+every branch it can take instead:
+- k = random.randint(kmin, kmax)
+- random.sample over BOOST_CANDIDATES (every k-subset is equally likely)
+- the per-attribute base ranges and the mimic bias
+- the per-attribute backfire sign (never for Mimic rewards)
+Each raw delta is then run through Player.apply_permanent_boosts, so the
+result reflects the clamping a real player would see.
+
+Probabilities are exact Fractions (config floats are read as the decimal
+value they print as). Results are cached per (config hash, mimic, stats).
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from fractions import Fraction
+from functools import lru_cache
+from itertools import combinations, product
+from math import comb
+from typing import Dict, Optional, Tuple
+
+from config import CFG
+from events import BOOST_CANDIDATES
+from models import Player
+
+STAT_KEYS = ('hp_max', 'sp_max', 'atk_min', 'atk_max', 'crit_chance')
+
+# Base ranges mirrored from _roll_permanent_boosts: (values, floor at 1?)
+_INT_BASES = {
+    'hp_max':  (range(3, 8), False),
+    'sp_max':  (range(2, 6), False),
+    'atk_min': ((1, 2), True),
+    'atk_max': ((1, 2, 3), True),
+}
+_CRIT_BASE = 0.02
+_CRIT_DIGITS = 10  # crit deltas are floats; round keys so equal outcomes merge
+
+
+@dataclass(frozen=True)
+class BoostDistribution:
+    """Exact distribution of realized stat changes for one kind of chest."""
+    config_hash: str
+    is_mimic: bool
+    stats: Tuple                    # player stats the clamping was applied to
+    joint: Dict[Tuple, Fraction]    # (d_hp_max, d_sp_max, d_atk_min, d_atk_max, d_crit) -> P
+    marginals: Dict[str, Dict]      # stat -> {delta: P}
+    expected: Dict[str, float]      # stat -> E[delta]
+
+
+def _exact(x) -> Fraction:
+    return Fraction(repr(float(x)))
+
+
+def config_hash(treasure: Optional[dict] = None) -> str:
+    """Stable hash of the treasure config section."""
+    T = CFG["treasure"] if treasure is None else treasure
+    blob = json.dumps(dict(T), sort_keys=True)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def player_stats(player) -> Tuple:
+    """The stat tuple the clamping depends on."""
+    return tuple(getattr(player, k) for k in STAT_KEYS)
+
+
+def _signed_values(key: str, is_mimic: bool, bias: float, p_keep: Fraction):
+    """List of (delta, P) for one picked attribute."""
+    if key == 'crit_chance':
+        values = [(_CRIT_BASE * (1.0 + bias), Fraction(1))]
+    else:
+        bases, floor_one = _INT_BASES[key]
+        p = Fraction(1, len(bases))
+        values = []
+        for b in bases:
+            v = int(b * (1.0 + bias))
+            values.append((max(1, v) if floor_one else v, p))
+    if is_mimic:
+        return values
+    out = []
+    for v, p in values:
+        out.append((v, p * p_keep))
+        out.append((-v, p * (1 - p_keep)))
+    return out
+
+
+def _realize(stats: Tuple, delta: dict) -> Tuple:
+    """Apply delta with Player's clamping and return the actual stat changes."""
+    p = Player(row=0, col=0)
+    for k, v in zip(STAT_KEYS, stats):
+        setattr(p, k, v)
+    p.apply_permanent_boosts(delta)
+    out = tuple(getattr(p, k) - v for k, v in zip(STAT_KEYS, stats))
+    return out[:4] + (round(out[4], _CRIT_DIGITS),)
+
+
+@lru_cache(maxsize=256)
+def _analyze(cfg_key: str, is_mimic: bool, stats: Tuple) -> BoostDistribution:
+    T = json.loads(cfg_key)
+    kmin = int(T["gamble_attr_count_min"])
+    kmax = int(T["gamble_attr_count_max"])
+    if not (0 <= kmin <= kmax <= len(BOOST_CANDIDATES)):
+        raise ValueError(f"gamble_attr_count range {kmin}..{kmax} is not samplable")
+    bias = float(T["mimic_boost_bias"]) if is_mimic else 0.0
+    p_keep = 1 - _exact(T["backfire_prob"])
+
+    per_key = {k: _signed_values(k, is_mimic, bias, p_keep) for k in BOOST_CANDIDATES}
+    joint: Dict[Tuple, Fraction] = {}
+    p_k = Fraction(1, kmax - kmin + 1)
+    for k in range(kmin, kmax + 1):
+        p_subset = p_k / comb(len(BOOST_CANDIDATES), k)
+        for keys in combinations(BOOST_CANDIDATES, k):
+            for choice in product(*(per_key[key] for key in keys)):
+                p = p_subset
+                delta = {}
+                for key, (v, pv) in zip(keys, choice):
+                    delta[key] = v
+                    p *= pv
+                out = _realize(stats, delta)
+                joint[out] = joint.get(out, 0) + p
+
+    marginals = {k: {} for k in STAT_KEYS}
+    for out, p in joint.items():
+        for k, v in zip(STAT_KEYS, out):
+            marginals[k][v] = marginals[k].get(v, 0) + p
+    expected = {k: float(sum(v * p for v, p in dist.items())) for k, dist in marginals.items()}
+    return BoostDistribution(
+        config_hash=hashlib.sha1(cfg_key.encode("utf-8")).hexdigest(),
+        is_mimic=is_mimic, stats=stats, joint=joint,
+        marginals=marginals, expected=expected,
+    )
+
+
+def boost_distribution(is_mimic: bool, player=None, treasure: Optional[dict] = None) -> BoostDistribution:
+    """
+    Exact distribution of permanent stat changes from one chest reward.
+    - is_mimic: reward after beating a Mimic (biased, never backfires)
+    - player: stats the clamping is applied to (default: a fresh Player)
+    - treasure: config section to analyze (default: CFG["treasure"])
+    """
+    T = CFG["treasure"] if treasure is None else treasure
+    cfg_key = json.dumps(dict(T), sort_keys=True)
+    stats = player_stats(player if player is not None else Player(row=0, col=0))
+    return _analyze(cfg_key, bool(is_mimic), stats)
+
+
+def compare_chests(player=None, treasure: Optional[dict] = None) -> Dict[str, Dict[str, float]]:
+    """Expected stat change of a gamble chest vs. a Mimic win."""
+    return {
+        "gamble": boost_distribution(False, player, treasure).expected,
+        "mimic": boost_distribution(True, player, treasure).expected,
+    }
+
+
+def clear_cache() -> None:
+    _analyze.cache_clear()
+
+
+if __name__ == "__main__":
+    table = compare_chests()
+    print(f"config {config_hash()[:12]}")
+    print(f"{'stat':<12}{'gamble':>10}{'mimic':>10}")
+    for k in STAT_KEYS:
+        print(f"{k:<12}{table['gamble'][k]:>10.4f}{table['mimic'][k]:>10.4f}")
@@ -1,7 +1,11 @@
 import random
-from typing import List, Tuple
+from typing import Iterator, List, Optional, Tuple
+import messages
 from models import Player
 from config import CFG
+from metrics import timed
+from entities import FloorGrid, layer_of, place, tile_at
+from fog import Fog, fog_enabled, fog_radius, look
 
 
 
@@ -10,7 +14,8 @@ from config import CFG
 # Configuration
 # =========================
 CHEST_TILE = "C"  # tile used to draw a chest
-CHEST_COUNT = int(CFG["treasure"]["chest_per_floor"])
+MONSTER_TILE = "M"  # tile used to draw a roaming monster
+# CHEST_COUNT is resolved lazily from config (see __getattr__ below).
 
 
 MAP_W, MAP_H = 11, 11  # Use odd numbers for cleaner maze layout
@@ -23,6 +28,16 @@ DIRS = {
     "d": ( 0, 1),
 }
 
+def _chest_count() -> int:
+    """Chests per floor, read from config on demand."""
+    return int(CFG["treasure"]["chest_per_floor"])
+
+def __getattr__(name: str):
+    """Lazy module constants (PEP 562): avoid reading config at import."""
+    if name == "CHEST_COUNT":
+        return _chest_count()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # =========================
 # Maze Generation
 # =========================
@@ -38,6 +53,7 @@ def _neighbors_2step(r: int, c: int) -> List[Tuple[int,int]]:
     """Return cells 2 steps away (used for DFS maze carving)."""
     return [(r-2,c), (r+2,c), (r,c-2), (r,c+2)]
 
+@timed("world.carve_maze")
 def _carve_maze(w: int, h: int) -> List[List[str]]:
     """Generate a random maze using recursive backtracking (DFS)."""
     g = _blank_grid(w, h, "#")
@@ -61,6 +77,93 @@ def _carve_maze(w: int, h: int) -> List[List[str]]:
         stack.append((nr, nc))
     return g
 
+def iter_eller_rows(w: int, h: Optional[int] = None, rng=random) -> Iterator[List[str]]:
+    """
+    Yield a perfect maze one grid row at a time (Eller's algorithm).
+    Same layout as _carve_maze: walls '#', cells on odd rows/columns.
+    Only the current row's set labels are kept, so memory is O(w) for any
+    height. h=None streams rows forever (every prefix is a valid maze up
+    to its last row; the finite version joins everything on the last row).
+    """
+    n = (w - 1) // 2                      # cells per row
+    cell_rows = None if h is None else (h - 1) // 2
+    sets: List[Optional[int]] = [None] * n
+    next_id = 0
+    yield ["#"] * w
+    emitted = 1
+    i = 0
+    while cell_rows is None or i < cell_rows:
+        last = cell_rows is not None and i == cell_rows - 1
+        # Fresh set for every cell that was not carried down from the row above
+        members = {}
+        for col in range(n):
+            if sets[col] is None:
+                sets[col] = next_id
+                next_id += 1
+            members.setdefault(sets[col], []).append(col)
+
+        row = ["#"] * w
+        for col in range(n):
+            row[2 * col + 1] = "."
+        # Join neighbours in different sets (always on the last row)
+        for col in range(n - 1):
+            a, b = sets[col], sets[col + 1]
+            if a != b and (last or rng.random() < 0.5):
+                row[2 * col + 2] = "."
+                if len(members[a]) < len(members[b]):
+                    a, b = b, a
+                for k in members[b]:
+                    sets[k] = a
+                members[a].extend(members.pop(b))
+        yield row
+        emitted += 1
+        if last:
+            break
+
+        # Every set continues down through at least one cell
+        below = ["#"] * w
+        down: List[Optional[int]] = [None] * n
+        for sid, cols in members.items():
+            picks = [k for k in cols if rng.random() < 0.5] or [rng.choice(cols)]
+            for k in picks:
+                down[k] = sid
+                below[2 * k + 1] = "."
+        yield below
+        emitted += 1
+        sets = down
+        i += 1
+    if h is not None:
+        for _ in range(h - emitted):
+            yield ["#"] * w   # bottom border (plus padding for even heights)
+
+@timed("world.carve_maze_eller")
+def carve_maze_eller(w: int, h: int) -> List[List[str]]:
+    """Whole-grid version of iter_eller_rows, a drop-in for _carve_maze."""
+    return list(iter_eller_rows(w, h))
+
+def write_maze(path: str, w: int, h: Optional[int], rows: Optional[int] = None, rng=random) -> int:
+    """
+    Stream an Eller maze to a text file, one grid row per line, without ever
+    holding more than one row. With h=None, `rows` limits the output.
+    Returns the number of rows written.
+    """
+    from itertools import islice
+    it = iter_eller_rows(w, h, rng)
+    if rows is not None:
+        it = islice(it, rows)
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for row in it:
+            f.write("".join(row))
+            f.write("\n")
+            count += 1
+    return count
+
+MAZE_GENERATORS = {
+    "dfs": _carve_maze,
+    "eller": carve_maze_eller,
+}
+
 def _random_free_cell(g: List[List[str]]) -> Tuple[int,int]:
     """Pick a random floor cell ('.') as players' start point."""
     free = [(r,c) for r in range(1, len(g)-1)
@@ -68,30 +171,34 @@ def _random_free_cell(g: List[List[str]]) -> Tuple[int,int]:
                   if g[r][c] == "."]
     return random.choice(free)
 
-def _farthest_from(g: List[List[str]], start: Tuple[int,int]) -> Tuple[int,int]:
-    """Find the farthest reachable cell from start using BFS."""
+def _distances_from(g: List[List[str]], start: Tuple[int,int]) -> List[List[int]]:
+    """BFS walking distance from start to every cell (-1 = unreachable)."""
     from collections import deque
+    g = list(g)  # plain list: indexing a list subclass (FloorGrid) misses the fast path
     h, w = len(g), len(g[0])
     sr, sc = start
     dist = [[-1]*w for _ in range(h)]
     dq = deque([(sr,sc)])
     dist[sr][sc] = 0
-    far = (sr, sc)
     while dq:
         r,c = dq.popleft()
-        if dist[r][c] > dist[far[0]][far[1]]:
-            far = (r,c)
         for dr,dc in [(-1,0),(1,0),(0,-1),(0,1)]:
             nr, nc = r+dr, c+dc
             if _in_bounds(g,nr,nc) and g[nr][nc] == "." and dist[nr][nc] == -1:
                 dist[nr][nc] = dist[r][c] + 1
                 dq.append((nr,nc))
-    return far
+    return dist
+
+def _farthest_from(g: List[List[str]], start: Tuple[int,int]) -> Tuple[int,int]:
+    """Find the farthest reachable cell from start using BFS."""
+    dist = _distances_from(g, start)
+    return max(((r, c) for r in range(len(dist)) for c in range(len(dist[0]))),
+               key=lambda rc: dist[rc[0]][rc[1]])
 
 def _place_exit_on_edge(g: List[List[str]], from_cell: Tuple[int,int]) -> Tuple[int,int]:
-    """Place exit 'E' on the farthest edge cell from spawn."""
+    """Place the exit entity ('E') on the edge cell farthest (by walking) from spawn."""
     h, w = len(g), len(g[0])
-    far_r, far_c = _farthest_from(g, from_cell)
+    dist = _distances_from(g, from_cell)
     candidates = []
     for c in range(1, w-1):
         if g[1][c] == ".":     candidates.append((1,c))
@@ -99,17 +206,19 @@ def _place_exit_on_edge(g: List[List[str]], from_cell: Tuple[int,int]) -> Tuple[
     for r in range(1, h-1):
         if g[r][1] == ".":     candidates.append((r,1))
         if g[r][w-2] == ".":   candidates.append((r,w-2))
+    candidates = [rc for rc in candidates if dist[rc[0]][rc[1]] > 0]
     if candidates:
-        candidates.sort(key=lambda rc: abs(rc[0]-far_r)+abs(rc[1]-far_c), reverse=True)
-        er, ec = candidates[0]
+        # walking distance, not Manhattan: through a maze wall a "far" edge cell
+        # can be next to the spawn (found by floorqa.py)
+        er, ec = max(candidates, key=lambda rc: dist[rc[0]][rc[1]])
     else:
-        er, ec = far_r, far_c
-    g[er][ec] = "E"
+        er, ec = _farthest_from(g, from_cell)
+    place(g, "exit", er, ec)
     return (er, ec)
 
 def _place_chests(grid, n: int, forbidden: set[tuple[int, int]] | None = None) -> None:
     """
-    Randomly place n chests ('C') on walkable tiles ('.').
+    Randomly place n chest entities ('C') on free walkable tiles ('.').
     - Skips any coordinates listed in `forbidden` (e.g., spawn, exit).
     - Uses a simple retry loop with an upper bound to avoid infinite loops.
     """
@@ -117,60 +226,103 @@ def _place_chests(grid, n: int, forbidden: set[tuple[int, int]] | None = None) -
     h, w = len(grid), len(grid[0])
     placed, tries = 0, 0
     forbidden = forbidden or set()
+    layer = layer_of(grid)
 
     while placed < n and tries < 300:
         tries += 1
         r = random.randint(1, h - 2)
         c = random.randint(1, w - 2)
 
-        # Must be floor, not a wall, not an exit, and not forbidden
-        if grid[r][c] != ".": 
+        # Must be floor, not a wall, not an exit/chest, and not forbidden
+        if grid[r][c] != ".":
+            continue
+        if layer is not None and layer.first(r, c) is not None:
             continue
         if (r, c) in forbidden:
             continue
 
-        grid[r][c] = CHEST_TILE
+        place(grid, "chest", r, c)
         placed += 1
 
 
 # =========================
 # Public API
 # =========================
-def load_floor(floor: int, seed: int | None = None) -> List[List[str]]:
+def load_floor(floor: int, seed: int | None = None) -> FloorGrid:
     """
     Generate a floor:
-    - A random DFS maze
-    - Player spawn at random floor cell
-    - Exit placed on far edge
+    - A random maze (terrain) with an empty entity layer; the generator
+      is config "world.generator": "dfs" (default) or "eller"
+    - choose_spawn() then places the spawn, the exit and the chests
     """
     if seed is not None:
         random.seed(seed)
-    g = _carve_maze(MAP_W, MAP_H)
+    carve = MAZE_GENERATORS[CFG["world"]["generator"]]
+    g = FloorGrid(carve(MAP_W, MAP_H))
     return g
 
 
+@timed("world.choose_spawn")
 def choose_spawn(g: List[List[str]]) -> Tuple[int,int]:
     """Choose a random spawn and place exit far from it."""
     spawn = _random_free_cell(g)
     _place_exit_on_edge(g, spawn)
 
     # --- place chests after spawn/exit are decided, avoid the spawn tile ---
-    _place_chests(g, CHEST_COUNT, forbidden={spawn})
+    _place_chests(g, _chest_count(), forbidden={spawn})
 
     return spawn
     
 
+@timed("world.render")
 def render(grid: List[List[str]], player: Player, floor: int, msg: str="") -> None:
-    """Render the map with player and status info."""
-    g = [row[:] for row in grid]
+    """Render the map with player and status info (built only if a message sink shows it)."""
+    messages.info(render_text, grid, player, floor, msg)
+
+
+def render_text(grid: List[List[str]], player: Player, floor: int, msg: str="") -> str:
+    """The frame render() shows: map, separator, status line, tip and key hints."""
+    lines = compose_rows(grid, player)
+    lines.append("-" * len(lines[0]))
+    lines.append(status_line(player, floor))
+    if msg: lines.append(msg)
+    lines.append("[WASD] move  [Q] quit  [L] legend [T] Save [U] Rewind")
+    return "\n".join(lines)
+
+
+def compose_rows(grid: List[List[str]], player: Player) -> List[str]:
+    """
+    The map as displayed: terrain, then entities, roaming monsters and the
+    player on top. With fog of war the terrain is the fog's remembered view,
+    entities show on explored cells and monsters only in sight. Read-only:
+    the fog is updated by fog.look() when the player moves.
+    """
+    fog = getattr(grid, "fog", None)
+    if fog is None and hasattr(grid, "fog") and fog_enabled():
+        fog = Fog(len(grid), len(grid[0]), fog_radius())   # nothing explored yet
+    if fog is not None:
+        g = [row[:] for row in fog.view]
+    else:
+        g = [row[:] for row in grid]
+    layer = getattr(grid, "entities", None)
+    if layer is not None:
+        for (r, c), e in layer.top():
+            if fog is None or fog.is_explored(r, c):
+                g[r][c] = e.glyph
+    pack = getattr(grid, "monsters", None)
+    if pack is not None:
+        for r, c in pack.cells():
+            if fog is None or fog.is_visible(r, c):
+                g[r][c] = MONSTER_TILE
     g[player.row][player.col] = "@"
-    print("\n".join("".join(row) for row in g))
-    print("-" * len(g[0]))
-    print(f"Floor {floor} | HP {player.hp}/{player.hp_max} | SP {player.sp}/{player.sp_max} | ATK {player.atk_min}-{player.atk_max} | Crit {player.crit_chance:.2f}| LV {player.level} EXP {player.exp}/{player.exp_to_next()}")
-    if msg: print(msg)
-    print("[WASD] move  [Q] quit  [L] legend [T] Save")
+    return ["".join(row) for row in g]
+
+
+def status_line(player: Player, floor: int) -> str:
+    return f"Floor {floor} | HP {player.hp}/{player.hp_max} | SP {player.sp}/{player.sp_max} | ATK {player.atk_min}-{player.atk_max} | Crit {player.crit_chance:.2f}| LV {player.level} EXP {player.exp}/{player.exp_to_next()}"
 
 
+@timed("world.try_move")
 def try_move(grid: List[List[str]], player: Player, cmd: str) -> Tuple[bool,str,bool]:
     """
     Try to move player based on input command.
@@ -183,4 +335,5 @@ def try_move(grid: List[List[str]], player: Player, cmd: str) -> Tuple[bool,str,
     if not _in_bounds(grid, nr, nc) or grid[nr][nc] == "#":
         return False, "You hit a wall.", False
     player.row, player.col = nr, nc
-    return True, "You moved one step.", (grid[nr][nc] == "E")
+    look(grid, nr, nc)
+    return True, "You moved one step.", (tile_at(grid, nr, nc) == "E")